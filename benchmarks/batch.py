@@ -0,0 +1,62 @@
+"""
+Batch evaluation benchmark: ObjectiveEngine.evaluate vs. one objective call per portfolio.
+
+Run from the repository root:
+    python -m benchmarks.batch --assets 20 --portfolios 100 1000 10000
+"""
+
+import argparse
+import time
+import numpy as np
+from benchmarks.objectives import synthetic_optimizer
+from utils.providers import SyntheticProvider, set_provider
+
+
+def loop_evaluate(optimizer, weights):
+    # the single-vector objectives, called once per portfolio
+    rows = []
+    for w in weights:
+        annualReturn, volatility = optimizer.portfolioPerformance(w)
+        rows.append((
+            annualReturn,
+            volatility,
+            -optimizer.sharpe(w),
+            -optimizer.sortino(w),
+            optimizer.trackingError(w),
+            -optimizer.informationRatio(w),
+            optimizer.conditionalVar(w),
+        ))
+    return np.array(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--assets", type=int, default=20)
+    parser.add_argument("--portfolios", type=int, nargs="+", default=[100, 1000, 10000])
+    args = parser.parse_args()
+
+    set_provider(SyntheticProvider())
+    optimizer = synthetic_optimizer(args.assets)
+    rng = np.random.default_rng(0)
+
+    print(f"{'portfolios':>10} {'loop (s)':>9} {'batch (s)':>10} {'speedup':>8} {'max |diff|':>11}")
+    for numPortfolios in args.portfolios:
+        weights = rng.random((numPortfolios, args.assets))
+        weights /= weights.sum(axis=1, keepdims=True)
+
+        start = time.perf_counter()
+        loop = loop_evaluate(optimizer, weights)
+        loopTime = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batch = optimizer.evaluatePortfolios(weights).to_numpy()
+        batchTime = time.perf_counter() - start
+
+        print(
+            f"{numPortfolios:>10} {loopTime:>9.3f} {batchTime:>10.3f} "
+            f"{loopTime / batchTime:>7.1f}x {np.max(np.abs(loop - batch)):>11.1e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
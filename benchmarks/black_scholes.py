@@ -0,0 +1,100 @@
+"""
+Black-Scholes page benchmark: vectorized model vs. one scalar model per point.
+
+Times the numbers behind one render of the calculator page (greek summary, both
+sensitivity heatmaps and the ten greek curves), without drawing the charts.
+
+Run from the repository root:
+    python -m benchmarks.black_scholes --repeat 10
+"""
+
+import argparse
+import time
+import numpy as np
+from scipy.stats import norm
+from utils.black_scholes import GREEKS, greek_curve, greek_summary, sensitivity_grid
+
+
+class LegacyBlackScholesModel:
+    # the previous scalar model of the calculator page
+    def __init__(self, r, S, K, T, sigma):
+        self.r, self.S, self.K, self.T, self.sigma = r, S, K, T, sigma
+
+    def calculate_ds(self):
+        d1 = (np.log(self.S/self.K) + (self.r + 0.5*(self.sigma**2))*self.T)/(self.sigma*np.sqrt(self.T))
+        return d1, d1 - self.sigma*np.sqrt(self.T)
+
+    def black_scholes(self, type):
+        d1, d2 = self.calculate_ds()
+        if type == "Call":
+            price = self.S*norm.cdf(d1, 0, 1) - self.K*np.exp(-self.r*self.T)*norm.cdf(d2, 0, 1)
+        else:
+            price = self.K*np.exp(-self.r*self.T)*norm.cdf(-d2, 0, 1) - self.S*norm.cdf(-d1, 0, 1)
+        return round(price, 3)
+
+    def greeks(self, type):
+        d1, d2 = self.calculate_ds()
+        gamma = (norm.pdf(d1, 0, 1))/(self.S*self.sigma*np.sqrt(self.T))
+        vega = self.S*norm.pdf(d1, 0, 1)*np.sqrt(self.T)
+        if type == "Call":
+            delta = norm.cdf(d1, 0, 1)
+            theta = -self.S*norm.pdf(d1, 0, 1)*self.sigma/(2*np.sqrt(self.T)) - self.r*self.K*np.exp(-self.r*self.T)*norm.cdf(d2, 0, 1)
+            rho = self.K*self.T*np.exp(-self.r*self.T)*norm.cdf(d2, 0, 1)
+        else:
+            delta = -norm.cdf(-d1, 0, 1)
+            theta = -self.S*norm.pdf(d1, 0, 1)*self.sigma/(2*np.sqrt(self.T)) + self.r*self.K*np.exp(-self.r*self.T)*norm.cdf(-d2, 0, 1)
+            rho = -self.K*self.T*np.exp(-self.r*self.T)*norm.cdf(-d2, 0, 1)
+        return {'delta': round(delta, 3), 'gamma': gamma, 'theta': round(theta/365, 4), 'vega': round(vega*0.01, 3), 'rho': round(rho*0.01, 3)}
+
+
+def legacy_page(r, spot, strike, T, sigma):
+    summary = [LegacyBlackScholesModel(r, spot, strike, T, sigma).greeks(type)[greek] for type in ("Call", "Put") for greek in GREEKS]
+    grids = []
+    for type, (low, high) in (("Call", (1.0, 1.05)), ("Put", (0.95, 1.0))):
+        volatilities = [round(v, 3) for v in np.linspace(0.01, 0.60, 10)]
+        spots = [int(s) for s in np.linspace(spot * low, spot * high, 10)]
+        grids.append([[round(LegacyBlackScholesModel(r, s, strike, T, v).black_scholes(type), 1) for v in volatilities] for s in spots])
+    curves = []
+    for greek in GREEKS:
+        for type in ("Call", "Put"):
+            spots = np.linspace(spot * 0.92, spot * 1.09, 200)
+            curves.append([LegacyBlackScholesModel(r, s, strike, T, sigma).greeks(type)[greek] for s in spots])
+            curves[-1].append(LegacyBlackScholesModel(r, spot, strike, T, sigma).greeks(type)[greek])
+    return np.array(summary), np.array(grids), np.array(curves)
+
+
+def vectorized_page(r, spot, strike, T, sigma):
+    summary = greek_summary(r, spot, strike, T, sigma).to_numpy().T.ravel()
+    grids = [sensitivity_grid(r, spot, strike, T, type).to_numpy().T for type in ("Call", "Put")]
+    curves = []
+    for greek in GREEKS:
+        for type in ("Call", "Put"):
+            spots, values, current = greek_curve(r, spot, strike, T, sigma, type, greek)
+            curves.append(np.append(values, current))
+    return summary.astype("float64"), np.array(grids), np.array(curves)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    inputs = (0.06731, 5000.0, 5100.0, 15 / 365, 0.4)
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        legacy = legacy_page(*inputs)
+    legacyTime = (time.perf_counter() - start) / args.repeat
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        vectorized = vectorized_page(*inputs)
+    vectorizedTime = (time.perf_counter() - start) / args.repeat
+
+    difference = max(np.max(np.abs(a - b)) for a, b in zip(legacy, vectorized))
+    print(f"legacy:     {legacyTime * 1000:8.2f} ms per page")
+    print(f"vectorized: {vectorizedTime * 1000:8.2f} ms per page ({legacyTime / vectorizedTime:.1f}x)")
+    print(f"max |difference|: {difference:.1e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Fundamentals clustering benchmark: full vs. MiniBatch K-Means, automatic k, cluster metrics.
+
+Fundamentals are random. Reports the time of one fit per mode, of choosing k over
+CLUSTER_K_RANGE, and of the cluster statistics computed with separate groupby passes
+(as the page used to) vs. the single aggregation.
+
+Run from the repository root:
+    python -m benchmarks.clustering --tickers 6000 50000
+"""
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from config import fundamental_columns
+from utils.fundamentals import Fundamentals
+
+
+def separate_passes(raw_data):
+    grouped = raw_data.groupby("cluster")["Last Price"]
+    metrics = pd.DataFrame()
+    metrics["mean_last_price"] = grouped.mean()
+    metrics["median_last_price"] = grouped.median()
+    metrics["num_stocks"] = grouped.count()
+    metrics["highest_last_price"] = grouped.max()
+    metrics["lowest_last_price"] = grouped.min()
+    metrics["ticker_highest_last_price"] = grouped.idxmax().apply(lambda x: raw_data.loc[x, "ticker"])
+    metrics["ticker_lowest_last_price"] = grouped.idxmin().apply(lambda x: raw_data.loc[x, "ticker"])
+    return metrics
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tickers", type=int, nargs="+", default=[6000, 50000])
+    parser.add_argument("--clusters", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    # import scikit-learn before timing
+    Fundamentals([]).select_n_clusters(pd.DataFrame(rng.normal(size=(50, 3))), [2])
+    print(f"{'tickers':>8} {'run':<26} {'time (s)':>9}")
+    for n in args.tickers:
+        scaled = pd.DataFrame(rng.normal(size=(n, len(fundamental_columns))), columns=fundamental_columns)
+        rows = {
+            f"fit, {mode}": (lambda mode=mode: Fundamentals([], clustering=mode).apply_kmeans(scaled, args.clusters))
+            for mode in ("full", "minibatch")
+        }
+        rows["choose k, auto"] = lambda: Fundamentals([]).select_n_clusters(scaled)
+        for name, run in rows.items():
+            _, seconds = timed(run)
+            print(f"{n:>8} {name:<26} {seconds:>9.3f}")
+
+        _, labels = Fundamentals([]).apply_kmeans(scaled, args.clusters)
+        raw_data = pd.DataFrame({
+            "ticker": [f"T{i}" for i in range(n)], "cluster": labels, "Last Price": rng.lognormal(4, 1, n)
+        })
+        for name, run in {
+            "metrics, separate passes": lambda: separate_passes(raw_data),
+            "metrics, one aggregation": lambda: Fundamentals([]).cluster_statistics(raw_data),
+        }.items():
+            _, seconds = timed(run)
+            print(f"{n:>8} {name:<26} {seconds:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
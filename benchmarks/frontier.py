@@ -0,0 +1,75 @@
+"""
+Efficient frontier benchmark: critical line engine vs. one cold SLSQP solve per target.
+
+Run from the repository root:
+    python -m benchmarks.frontier --assets 10 50 200 --points 100 --legacy-points 10
+
+With --legacy-points the legacy path solves only that many of the targets, evenly
+spaced, and its time is scaled to the full grid (marked *), which keeps the 200 asset
+run short. The warm-started SLSQP column is the
+engine's fallback for branches the critical line algorithm cannot trace.
+"""
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from utils.frontier import efficient_frontier
+from utils.portfolio_optimizer import PortfolioOptimizer
+from utils.providers import SyntheticProvider
+
+
+def synthetic_moments(numAssets, start="2021-01-01", end="2024-01-01"):
+    tickers = [f"SYN{i:03d}" for i in range(numAssets)]
+    histories = SyntheticProvider().history(tickers, start, end)
+    prices = pd.DataFrame({ticker: histories[ticker]["Close"] for ticker in tickers})
+    returns = prices.pct_change().dropna()
+    return returns.mean(), returns.cov()
+
+
+def legacy_frontier(meanReturns, covMatrix, targetReturns):
+    # the previous code path: PortfolioOptimizer.efficientOpt once per target
+    optimizer = PortfolioOptimizer.__new__(PortfolioOptimizer)
+    optimizer.meanReturns, optimizer.covMatrix = meanReturns, covMatrix
+    return np.array([optimizer.efficientOpt(target)["fun"] for target in targetReturns])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--assets", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--points", type=int, default=100)
+    parser.add_argument("--legacy-points", type=int, default=None,
+                        help="targets the legacy path solves, its time scaled to --points")
+    args = parser.parse_args()
+
+    print(f"{'assets':>6} {'legacy (s)':>11} {'slsqp (s)':>10} {'engine (s)':>11} {'speedup':>8} "
+          f"{'engine ok':>10} {'max |dvol|':>11}")
+    for numAssets in args.assets:
+        meanReturns, covMatrix = synthetic_moments(numAssets)
+        annual = meanReturns.to_numpy() * 252
+        targetReturns = np.linspace(np.percentile(annual, 10), np.percentile(annual, 90), args.points)
+        legacyPoints = min(args.legacy_points or args.points, args.points)
+        sampled = np.unique(np.linspace(0, args.points - 1, legacyPoints).round().astype(int))
+
+        start = time.perf_counter()
+        legacy = legacy_frontier(meanReturns, covMatrix, targetReturns[sampled])
+        legacyTime = (time.perf_counter() - start) * args.points / len(sampled)
+
+        start = time.perf_counter()
+        efficient_frontier(meanReturns, covMatrix, targetReturns, method="slsqp")
+        slsqpTime = time.perf_counter() - start
+
+        start = time.perf_counter()
+        engine = efficient_frontier(meanReturns, covMatrix, targetReturns)
+        engineTime = time.perf_counter() - start
+
+        scaled = "*" if len(sampled) < args.points else " "
+        print(
+            f"{numAssets:>6} {legacyTime:>10.3f}{scaled} {slsqpTime:>10.3f} {engineTime:>11.3f} "
+            f"{legacyTime / engineTime:>7.1f}x {engine['success'].mean():>10.0%} "
+            f"{np.max(np.abs(legacy - engine['volatility'][sampled])):>11.2e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Fundamentals store benchmark: writing, reading and exporting a universe-wide snapshot.
+
+The store is filled with synthetic statements and info in a temporary directory.
+Reports the time to write every ticker, to read them back one by one, and to export
+the metrics of all of them with one bulk read (load_data.fundamentals_snapshot).
+
+Run from the repository root:
+    python -m benchmarks.fundamentals_store --tickers 3000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from utils.fundamentals_store import FundamentalsStore, fiscal_period
+from utils.providers import SyntheticProvider
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=3000)
+    args = parser.parse_args()
+
+    provider = SyntheticProvider()
+    tickers = ["".join(chr(65 + int(digit)) for digit in f"{i:04d}") for i in range(args.tickers)]
+    data = {ticker: (provider.statements(ticker), provider.info(ticker), provider.last_price(ticker)) for ticker in tickers}
+
+    with tempfile.TemporaryDirectory() as directory:
+        # the module level store of load_data is created at import, so point it here first
+        os.environ["QUANT_CACHE_DIR"] = directory
+        from utils import load_data
+
+        store = FundamentalsStore(os.path.join(directory, "fundamentals.sqlite"))
+        load_data.fundamentals_store = store
+
+        def write():
+            for ticker, (statements, info, last_price) in data.items():
+                store.write(ticker, fiscal_period(info), info, statements, last_price)
+
+        runs = {
+            "write": write,
+            "read, per ticker": lambda: [store.read(ticker) for ticker in tickers],
+            "read, bulk": lambda: store.read_many(tickers),
+            "export snapshot": lambda: load_data.fundamentals_snapshot(tickers),
+        }
+        print(f"{args.tickers} tickers")
+        print(f"{'run':<20} {'time (s)':>9}")
+        for name, run in runs.items():
+            _, seconds = timed(run)
+            print(f"{name:<20} {seconds:>9.3f}")
+        print(f"store size {os.path.getsize(store.path) / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Implied volatility benchmark: vectorized safeguarded Newton vs. a per-option brentq loop.
+
+Prices a random chain of calls and puts at known volatilities, solves them back and
+reports time, convergence and the largest volatility error on quotes with vega above
+1e-3 (below it the price barely depends on volatility).
+
+Run from the repository root:
+    python -m benchmarks.implied_volatility --quotes 1000 10000
+"""
+
+import argparse
+import time
+import numpy as np
+from scipy.optimize import brentq
+from utils.black_scholes import BlackScholesModel, implied_volatility
+
+
+def option_chain(quotes, seed=0):
+    rng = np.random.default_rng(seed)
+    r, spot = 0.05, 5000.0
+    strikes = rng.uniform(0.6, 1.4, quotes) * spot
+    maturities = rng.uniform(1 / 365, 2, quotes)
+    volatilities = rng.uniform(0.05, 1.5, quotes)
+    types = np.where(rng.random(quotes) < 0.5, "Call", "Put")
+    results = BlackScholesModel(r, spot, strikes, maturities, volatilities).evaluate()
+    prices = np.where(types == "Call", results["Call"]["price"], results["Put"]["price"])
+    return r, spot, strikes, maturities, volatilities, types, prices, results["Call"]["vega"] * 100
+
+
+def brentq_loop(prices, r, spot, strikes, maturities, types):
+    volatilities = np.full(len(prices), np.nan)
+    for i in range(len(prices)):
+        def error(sigma):
+            return BlackScholesModel(r, spot, strikes[i], maturities[i], sigma).evaluate()[types[i]]["price"] - prices[i]
+        try:
+            volatilities[i] = brentq(error, 1e-4, 5.0, xtol=1e-12)
+        except ValueError:
+            pass
+    return volatilities
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--quotes", type=int, nargs="+", default=[1000, 10000])
+    args = parser.parse_args()
+
+    print(f"{'quotes':>7} {'method':<11} {'time (s)':>9} {'solved':>7} {'max |vol error|':>16} {'mean iter':>9}")
+    for quotes in args.quotes:
+        r, spot, strikes, maturities, volatilities, types, prices, vega = option_chain(quotes)
+        sensitive = vega > 1e-3
+
+        start = time.perf_counter()
+        looped = brentq_loop(prices, r, spot, strikes, maturities, types)
+        loopTime = time.perf_counter() - start
+        loopError = np.nanmax(np.abs(looped - volatilities)[sensitive])
+        print(f"{quotes:>7} {'brentq':<11} {loopTime:>9.3f} {np.isfinite(looped).mean():>7.1%} {loopError:>16.1e} {'':>9}")
+
+        start = time.perf_counter()
+        solved = implied_volatility(prices, r, spot, strikes, maturities, types)
+        vectorTime = time.perf_counter() - start
+        vectorError = np.nanmax(np.abs(solved["volatility"] - volatilities)[sensitive])
+        print(f"{quotes:>7} {'vectorized':<11} {vectorTime:>9.3f} {solved['converged'].mean():>7.1%} "
+              f"{vectorError:>16.1e} {solved['iterations'].mean():>9.1f}  ({loopTime / vectorTime:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
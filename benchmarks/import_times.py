@@ -0,0 +1,87 @@
+"""
+Import time benchmark: cost of the modules the pages import, cold and warm.
+
+Every module is imported in fresh interpreters. "cold" is the first of them (bytecode
+compiled, files not yet in the OS cache), "warm" the median of the following runs,
+"rerun" the import repeated in the same interpreter, which is what a Streamlit rerun
+of a page pays. Modules that are not installed are listed as such.
+
+Run from the repository root:
+    python -m benchmarks.import_times --repeat 3
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+MODULES = [
+    "streamlit",
+    "numpy",
+    "pandas",
+    "scipy.optimize",
+    "scipy.stats",
+    "matplotlib.pyplot",
+    "seaborn",
+    "plotly.express",
+    "yfinance",
+    "sklearn.cluster",
+    "sklearn.decomposition",
+    "openai",
+    "streamlit_shadcn_ui",
+    # no longer imported by pages/3_fundamental_data.py
+    "riskfolio",
+    "quantstats",
+    "neuralprophet",
+    "ydata_profiling",
+    "streamlit_pandas_profiling",
+    # the app's own modules, with their dependencies
+    "utils.portfolio_optimizer",
+    "utils.risk",
+    "utils.fundamentals",
+    "utils.black_scholes",
+]
+
+SCRIPT = """
+import importlib, json, sys, time
+start = time.perf_counter()
+try:
+    importlib.import_module(sys.argv[1])
+except ImportError as error:
+    print(json.dumps({"error": str(error)}))
+    raise SystemExit
+first = time.perf_counter() - start
+start = time.perf_counter()
+importlib.import_module(sys.argv[1])
+print(json.dumps({"first": first, "rerun": time.perf_counter() - start}))
+"""
+
+
+def import_time(module):
+    result = subprocess.run([sys.executable, "-c", SCRIPT, module], capture_output=True, text=True)
+    lines = result.stdout.strip().splitlines()
+    if not lines:
+        return {"error": result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "no output"}
+    return json.loads(lines[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="warm runs per module")
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    args = parser.parse_args()
+
+    print(f"{'module':<28} {'cold (s)':>9} {'warm (s)':>9} {'rerun (us)':>11}")
+    for module in args.modules:
+        runs = [import_time(module) for _ in range(1 + args.repeat)]
+        if "error" in runs[0]:
+            print(f"{module:<28} {'not installed' if 'No module' in runs[0]['error'] else runs[0]['error']}")
+            continue
+        warm = statistics.median(run["first"] for run in runs[1:])
+        rerun = statistics.median(run["rerun"] for run in runs)
+        print(f"{module:<28} {runs[0]['first']:>9.3f} {warm:>9.3f} {rerun * 1e6:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
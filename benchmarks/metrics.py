@@ -0,0 +1,88 @@
+"""
+Portfolio metrics benchmark: single-pass kernel vs. the former per-metric methods.
+
+Run from the repository root:
+    python -m benchmarks.metrics --days 252 1260 5040 --repeat 20
+"""
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+from scipy.stats import kurtosis, skew
+from utils.performance import performance_metrics
+
+
+def legacy_metrics(portfolio, benchmark, riskFreeRate):
+    # the previous MetricsCalculator: every metric on its own, beta from an OLS fit
+    # (fitted three times), the drawdown twice and the portfolio returns recomputed
+    portfolio = portfolio.reshape(-1, 1)
+
+    def beta():
+        data = pd.DataFrame({"Portfolio": portfolio.flatten(), "Benchmark": benchmark}).dropna()
+        model = sm.OLS(data["Portfolio"], sm.add_constant(data["Benchmark"])).fit()
+        return model.params["Benchmark"]
+
+    def maxDrawdown():
+        cumulative = np.cumprod(1 + portfolio) - 1
+        return np.min(cumulative - np.maximum.accumulate(cumulative))
+
+    def trackingError():
+        return (np.array(portfolio).flatten() - benchmark).std(ddof=1) * np.sqrt(252)
+
+    annualReturn = portfolio.mean() * 252
+    annualStd = portfolio.std(ddof=1) * np.sqrt(252)
+    downside = portfolio[portfolio < 0].std(ddof=1) * np.sqrt(252)
+    return {
+        "annualReturn": annualReturn,
+        "annualStd": annualStd,
+        "downsideDeviation": downside,
+        "maxDrawdown": maxDrawdown(),
+        "beta": beta(),
+        "alpha": annualReturn - (riskFreeRate + beta() * (benchmark.mean() * 252 - riskFreeRate)),
+        "sharpe": (annualReturn - riskFreeRate) / annualStd,
+        "sortino": (annualReturn - riskFreeRate) / downside,
+        "treynor": (annualReturn - riskFreeRate) / beta(),
+        "calmar": (annualReturn - riskFreeRate) / -maxDrawdown(),
+        "trackingError": trackingError(),
+        "informationRatio": (np.array(portfolio).flatten().mean() - benchmark.mean()) * 252 / trackingError(),
+        "skewness": skew(portfolio)[0],
+        "kurtosis": kurtosis(portfolio)[0],
+        "positivePeriods": len(portfolio[portfolio > 0]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days", type=int, nargs="+", default=[252, 1260, 5040])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'days':>6} {'legacy (ms)':>12} {'kernel (ms)':>12} {'speedup':>8} {'max rel diff':>13}")
+    for days in args.days:
+        benchmark = rng.normal(0.0003, 0.011, days)
+        portfolio = 0.9 * benchmark + rng.normal(0.0002, 0.008, days)
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            legacy = legacy_metrics(portfolio, benchmark, 0.05)
+        legacyTime = (time.perf_counter() - start) / args.repeat
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            kernel = performance_metrics(portfolio, benchmark, 0.05).iloc[0]
+        kernelTime = (time.perf_counter() - start) / args.repeat
+
+        difference = max(
+            abs(kernel[name] - value) / max(abs(value), 1e-12) for name, value in legacy.items()
+        )
+        print(
+            f"{days:>6} {legacyTime * 1000:>12.2f} {kernelTime * 1000:>12.2f} "
+            f"{legacyTime / kernelTime:>7.1f}x {difference:>13.1e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Optimizer objective benchmark: SLSQP with analytic gradients vs. finite differences.
+
+Run from the repository root:
+    python -m benchmarks.objectives --assets 50
+"""
+
+import argparse
+import contextlib
+import datetime as dt
+import io
+import time
+from utils.analysis import AnalysisContext
+from utils.portfolio_optimizer import PortfolioOptimizer
+from utils.providers import SyntheticProvider, set_provider
+
+
+def synthetic_optimizer(numAssets, start=dt.date(2021, 1, 1), end=dt.date(2023, 1, 1)):
+    # tickers must be capital letters: AAA, AAB, ...
+    stocks = ["".join(chr(65 + int(digit)) for digit in f"{i:03d}") for i in range(numAssets)]
+    context = AnalysisContext(stocks, start, end, None, riskFreeRate=0.05)
+    optimizer = PortfolioOptimizer.__new__(PortfolioOptimizer)
+    optimizer.context = context
+    optimizer.stocks, optimizer.start, optimizer.end = context.stocks, context.start, context.end
+    optimizer.riskFreeRate = context.riskFreeRate
+    with contextlib.redirect_stdout(io.StringIO()):
+        optimizer.meanReturns, optimizer.covMatrix = optimizer.getData()
+        optimizer.benchmark = optimizer.benchmarkReturns()
+    return optimizer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--assets", type=int, default=50)
+    parser.add_argument("--check", action="store_true", help="also compare analytic and numerical gradients")
+    args = parser.parse_args()
+
+    set_provider(SyntheticProvider())
+    optimizer = synthetic_optimizer(args.assets)
+    if args.check:
+        print(optimizer.checkGradients(), end="\n\n")
+
+    print(f"{'criterion':<36} {'nfev fd':>8} {'nfev jac':>9} {'fd (s)':>8} {'jac (s)':>8} {'|dfun|':>9}")
+    for criterion in optimizer.objectives:
+        optimizer.optimization_criterion = criterion
+        runs = []
+        for useGradients in (False, True):
+            start = time.perf_counter()
+            result = optimizer.optimization_function(useGradients=useGradients)
+            runs.append((result, time.perf_counter() - start))
+        (numerical, numericalTime), (analytic, analyticTime) = runs
+        print(
+            f"{criterion:<36} {numerical.nfev:>8} {analytic.nfev:>9} {numericalTime:>8.2f} "
+            f"{analyticTime:>8.2f} {abs(numerical.fun - analytic.fun):>9.1e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
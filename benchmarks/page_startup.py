@@ -0,0 +1,81 @@
+"""
+Page startup benchmark: load and rerun time of every page, checked against budgets.
+
+Each page runs in a fresh interpreter under Streamlit's AppTest with the synthetic data
+provider: "load" is the first run (module imports included, Streamlit itself excluded),
+"rerun" a second run, which any widget interaction costs at least. Exits with status 1
+when a page raises or exceeds its budget, so it can run in CI.
+
+Run from the repository root:
+    python -m benchmarks.page_startup
+    python -m benchmarks.page_startup --pages pages/3_fundamental_data.py --scale 2
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# seconds allowed for (load, rerun) of each page
+BUDGETS = {
+    "Welcome.py": (1.0, 0.5),
+    "pages/1_Portfolio_Analysis.py": (8.0, 1.0),
+    "pages/2_quant_gpt.py": (3.0, 0.5),
+    "pages/3_fundamental_data.py": (5.0, 1.0),
+    "pages/4_Black_Scholes_Calculator.py": (8.0, 4.0),
+}
+
+SCRIPT = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+app = AppTest.from_file(sys.argv[1], default_timeout=120)
+app.run()
+load = time.perf_counter() - start
+start = time.perf_counter()
+app.run()
+rerun = time.perf_counter() - start
+print(json.dumps({"load": load, "rerun": rerun, "errors": [error.message for error in app.exception]}))
+"""
+
+
+def page_startup(page, provider):
+    env = dict(os.environ, QUANT_DATA_PROVIDER=provider)
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT, os.path.abspath(page)], capture_output=True, text=True, env=env
+    )
+    lines = result.stdout.strip().splitlines()
+    if not lines:
+        stderr = result.stderr.strip().splitlines()
+        return {"load": None, "rerun": None, "errors": [stderr[-1] if stderr else "no output"]}
+    return json.loads(lines[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", nargs="+", default=list(BUDGETS))
+    parser.add_argument("--provider", default="synthetic", help="QUANT_DATA_PROVIDER of the runs")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every budget, for slower machines")
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'page':<38} {'load (s)':>9} {'budget':>7} {'rerun (s)':>10} {'budget':>7}  result")
+    for page in args.pages:
+        loadBudget, rerunBudget = (budget * args.scale for budget in BUDGETS.get(page, (float("inf"),) * 2))
+        timing = page_startup(page, args.provider)
+        if timing["errors"]:
+            result = "error: " + "; ".join(timing["errors"])[:80]
+        elif timing["load"] > loadBudget or timing["rerun"] > rerunBudget:
+            result = "over budget"
+        else:
+            result = "ok"
+        failed |= result != "ok"
+        load = "-" if timing["load"] is None else f"{timing['load']:.2f}"
+        rerun = "-" if timing["rerun"] is None else f"{timing['rerun']:.2f}"
+        print(f"{page:<38} {load:>9} {loadBudget:>7.1f} {rerun:>10} {rerunBudget:>7.1f}  {result}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Piotroski scoring benchmark: one Python evaluation per ticker vs. the columnar scores.
+
+Fundamentals are random, with --missing of the values absent. "per ticker" evaluates
+the nine signals of every ticker's dict the way the score used to be computed; the
+columnar runs score a DataFrame, alone and including its construction from the dicts.
+
+Run from the repository root:
+    python -m benchmarks.piotroski --tickers 3000
+"""
+
+import argparse
+import operator
+import time
+import numpy as np
+import pandas as pd
+from config import fundamental_columns
+from utils.piotroski import PIOTROSKI_SIGNALS, piotroski_scores
+
+OPERATORS = {">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le}
+
+
+def per_ticker(fundamentals):
+    scores = {}
+    for ticker, financials in fundamentals.items():
+        score = {}
+        for component, left, comparison, right in PIOTROSKI_SIGNALS.values():
+            value = financials[right] if isinstance(right, str) else right
+            score[component] = score.get(component, 0) + OPERATORS[comparison](financials[left], value)
+        score["PE Ratio"] = financials["PE Ratio"]
+        score["Piotroski Score"] = sum(v for k, v in score.items() if k != "PE Ratio")
+        scores[ticker] = score
+    return pd.DataFrame(scores).T
+
+
+def best(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=3000)
+    parser.add_argument("--missing", type=float, default=0.05, help="share of missing values")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(rng.normal(size=(args.tickers, len(fundamental_columns))), columns=fundamental_columns)
+    frame = frame.mask(rng.random(frame.shape) < args.missing)
+    frame.index = [f"T{i}" for i in range(args.tickers)]
+    fundamentals = frame.to_dict(orient="index")
+
+    runs = {
+        "per ticker": lambda: per_ticker(fundamentals),
+        "columnar, from dicts": lambda: piotroski_scores(pd.DataFrame.from_dict(fundamentals, orient="index")),
+        "columnar, from frame": lambda: piotroski_scores(frame),
+    }
+    print(f"{args.tickers} tickers")
+    print(f"{'run':<22} {'time (ms)':>10}")
+    for name, run in runs.items():
+        print(f"{name:<22} {best(run, args.repeat) * 1e3:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
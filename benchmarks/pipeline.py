@@ -0,0 +1,114 @@
+"""
+Portfolio Analysis run benchmark: sequential stages vs. the staged pipeline of the page.
+
+Data comes from the synthetic provider with a fixed delay per download, standing in for
+network latency. Reports the time until the Summary tab can render and until every
+stage has finished, without drawing any charts.
+
+Run from the repository root:
+    python -m benchmarks.pipeline --assets 30 --latency 1.0
+"""
+
+import argparse
+import contextlib
+import datetime as dt
+import io
+import time
+from config import ANALYSIS_PROCESSES, ROLLING_WINDOWS
+from utils.frontier import frontier_task
+from utils.load_data import load_stock_data, load_stocks_data, price_cache
+from utils.metrics import MetricsCalculator
+from utils.pipeline import StagePipeline, process_pool
+from utils.portfolio_optimizer import PortfolioOptimizer
+from utils.providers import SyntheticProvider, set_provider
+from utils.risk import RiskMetrics
+
+
+class SlowProvider(SyntheticProvider):
+    # synthetic data behind a fixed download delay
+    def __init__(self, latency):
+        super().__init__()
+        self.latency = latency
+
+    def history(self, tickers, start, end):
+        time.sleep(self.latency)
+        return super().history(tickers, start, end)
+
+
+def sequential(inputs):
+    start = time.perf_counter()
+    optimizer = PortfolioOptimizer(*inputs)
+    metrics = MetricsCalculator.from_context(optimizer.context)
+    metrics.rollingMetrics(ROLLING_WINDOWS)
+    summary = time.perf_counter() - start
+    RiskMetrics.from_context(optimizer.context).varCvar("historical", 1)
+    return summary, time.perf_counter() - start
+
+
+def staged(inputs, processes):
+    start = time.perf_counter()
+    stocks, startDate, endDate = inputs[:3]
+
+    def optimize(prices, benchmark):
+        optimizer = PortfolioOptimizer(*inputs, frontier=False, stockData=prices, benchmarkData=benchmark)
+        optimizer.objectiveEngine
+        return optimizer
+
+    def build_metrics(optimizer):
+        metrics = MetricsCalculator.from_context(optimizer.context)
+        metrics.rollingMetrics(ROLLING_WINDOWS)
+        return metrics
+
+    pipeline = StagePipeline(processes=processes)
+    pipeline.add("prices", load_stocks_data, stocks, startDate, endDate)
+    pipeline.add("benchmark", load_stock_data, "^GSPC", startDate, endDate)
+    pipeline.add("optimize", optimize, after=("prices", "benchmark"))
+    pipeline.add("problem", lambda o: (o.meanReturns, o.covMatrix, o.frontierTargets()), after=("optimize",))
+    pipeline.add("frontier", frontier_task, after=("problem",), kind="process")
+    pipeline.add("metrics", build_metrics, after=("optimize",))
+    pipeline.add("risk", lambda o: RiskMetrics.from_context(o.context).varCvar("historical", 1), after=("optimize",))
+
+    summary = None
+    for stage, result in pipeline.run():
+        if stage == "optimize":
+            optimizer = result
+        elif stage == "frontier":
+            optimizer.frontierResults(result)
+        elif stage == "metrics":
+            summary = time.perf_counter() - start
+    return summary, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--assets", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=1.0, help="seconds per download")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    set_provider(SlowProvider(args.latency))
+    stocks = ["".join(chr(65 + int(digit)) for digit in f"{i:03d}") for i in range(args.assets)]
+    inputs = (stocks, dt.date(2021, 1, 1), dt.date(2023, 1, 1), "Maximize Sharpe Ratio", 0.05)
+
+    runs = {
+        "sequential": lambda: sequential(inputs),
+        "staged, threads": lambda: staged(inputs, 0),
+    }
+    if ANALYSIS_PROCESSES:
+        runs[f"staged, {ANALYSIS_PROCESSES} processes"] = lambda: staged(inputs, ANALYSIS_PROCESSES)
+        # spawn the shared workers before timing
+        process_pool(ANALYSIS_PROCESSES).submit(int).result()
+
+    print(f"{'run':<22} {'summary (s)':>11} {'all stages (s)':>14}")
+    for name, run in runs.items():
+        times = []
+        for _ in range(args.repeat):
+            price_cache.invalidate()
+            with contextlib.redirect_stdout(io.StringIO()):
+                times.append(run())
+        summary, total = (min(column) for column in zip(*times))
+        print(f"{name:<22} {summary:>11.3f} {total:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Reference data benchmark: parsing sample.csv vs. the Parquet reference dataset.
+
+The sample is repeated to --rows rows and converted with build_reference in a temporary
+directory. Reports the time to get the column list (what the fundamentals page needs
+on every rerun) and to load the data, with and without the text columns.
+
+Run from the repository root:
+    python -m benchmarks.reference_data --rows 5000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import pandas as pd
+from config import REFERENCE_SOURCE
+from utils.reference import ReferenceDataset, build_reference
+
+
+def best(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        sample = pd.read_csv(REFERENCE_SOURCE)
+        source = os.path.join(directory, "reference.csv")
+        path = os.path.join(directory, "reference.parquet")
+        sample.iloc[[i % len(sample) for i in range(args.rows)]].to_csv(source, index=False)
+        build_reference(source, path)
+
+        runs = {
+            "csv, columns": lambda: pd.read_csv(source).set_index("symbol").columns,
+            "schema, columns": lambda: ReferenceDataset(path).columns(),
+            "parquet, without text": lambda: ReferenceDataset(path).frame(),
+            "parquet, all columns": lambda: ReferenceDataset(path).frame(text=True),
+        }
+        shared = ReferenceDataset(path)
+        shared.frame()
+        runs["parquet, loaded"] = shared.frame
+
+        print(f"{args.rows} rows, csv {os.path.getsize(source) / 1e6:.1f} MB, parquet {os.path.getsize(path) / 1e6:.1f} MB")
+        print(f"{'run':<24} {'time (ms)':>10}")
+        for name, run in runs.items():
+            print(f"{name:<24} {best(run, args.repeat) * 1e3:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Rolling analytics benchmark: running-sum engine vs. window-by-window pandas rolling.
+
+Run from the repository root:
+    python -m benchmarks.rolling --years 5 10 20
+"""
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from config import ROLLING_WINDOWS
+from utils.rolling import rolling_metrics
+
+
+def naive_rolling(portfolio, benchmark, windows, riskFreeRate):
+    # every statistic recomputed over each full window, O(n * w)
+    p, b = pd.Series(portfolio), pd.Series(benchmark)
+    wealth = (1 + p).cumprod()
+    columns = {}
+    for window in windows:
+        volatility = p.rolling(window).std() * np.sqrt(252)
+        excessReturn = p.rolling(window).mean() * 252 - riskFreeRate
+        downside = p.rolling(window).apply(lambda x: x[x < 0].std(ddof=1), raw=True) * np.sqrt(252)
+        columns[("volatility", window)] = volatility
+        columns[("sharpe", window)] = excessReturn / volatility
+        columns[("sortino", window)] = excessReturn / downside
+        columns[("beta", window)] = p.rolling(window).cov(b) / b.rolling(window).var()
+        columns[("drawdown", window)] = wealth / wealth.rolling(window).max() - 1
+    return pd.DataFrame(columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--years", type=int, nargs="+", default=[5, 10, 20])
+    parser.add_argument("--windows", type=int, nargs="+", default=ROLLING_WINDOWS)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'days':>6} {'naive (ms)':>11} {'engine (ms)':>12} {'speedup':>8} {'max |diff|':>11}")
+    for years in args.years:
+        days = years * 252
+        benchmark = rng.normal(0.0003, 0.011, days)
+        portfolio = 0.9 * benchmark + rng.normal(0.0002, 0.008, days)
+
+        start = time.perf_counter()
+        naive = naive_rolling(portfolio, benchmark, args.windows, 0.05)
+        naiveTime = time.perf_counter() - start
+
+        start = time.perf_counter()
+        engine = rolling_metrics(portfolio, benchmark, args.windows, 0.05)
+        engineTime = time.perf_counter() - start
+
+        difference = np.nanmax(np.abs(engine[naive.columns].to_numpy() - naive.to_numpy()))
+        print(
+            f"{days:>6} {naiveTime * 1000:>11.1f} {engineTime * 1000:>12.1f} "
+            f"{naiveTime / engineTime:>7.1f}x {difference:>11.1e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
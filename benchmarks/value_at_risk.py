@@ -0,0 +1,46 @@
+"""
+VaR benchmark: time of every RiskMetrics VaR method, simulated ones at 1M scenarios.
+
+Run from the repository root:
+    python -m benchmarks.value_at_risk --horizons 1 10 --scenarios 1000000
+"""
+
+import argparse
+import time
+import numpy as np
+from utils.value_at_risk import cornish_fisher, filtered_bootstrap, horizon_returns, monte_carlo, tail_risk
+
+LEVELS = [0.9, 0.95, 0.99]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--horizons", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--scenarios", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=1260)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    covMatrix = np.array([[1.0, 0.3], [0.3, 1.5]]) * 1e-4
+    meanReturns = np.array([0.0004, 0.0005])
+    weights = np.array([0.6, 0.4])
+    returns = rng.multivariate_normal(meanReturns, covMatrix, args.days) @ weights
+
+    methods = {
+        "historical": lambda h: tail_risk(horizon_returns(returns, h), LEVELS),
+        "cornish-fisher": lambda h: cornish_fisher(returns, LEVELS, h),
+        "bootstrap": lambda h: tail_risk(filtered_bootstrap(returns, h, args.scenarios), LEVELS),
+        "monte-carlo": lambda h: tail_risk(monte_carlo(meanReturns, covMatrix, weights, h, args.scenarios), LEVELS),
+    }
+
+    print(f"{'method':<15} {'horizon':>7} {'time (s)':>9}  VaR 90/95/99 (%)")
+    for horizon in args.horizons:
+        for name, method in methods.items():
+            start = time.perf_counter()
+            var, cvar = method(horizon)
+            elapsed = time.perf_counter() - start
+            print(f"{name:<15} {horizon:>7} {elapsed:>9.3f}  {np.round(var * 100, 2)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,66 @@
+import os
+
+# market data provider: yfinance, local (files under LOCAL_DATA_DIR) or synthetic
+DATA_PROVIDER = os.environ.get("QUANT_DATA_PROVIDER", "yfinance")
+LOCAL_DATA_DIR = os.environ.get("QUANT_LOCAL_DATA_DIR", os.path.join("data", "local"))
+SYNTHETIC_SEED = int(os.environ.get("QUANT_SYNTHETIC_SEED", "0"))
+
+# local storage for downloaded market data (not tracked by git)
+CACHE_DIR = os.environ.get("QUANT_CACHE_DIR", ".cache")
+PRICE_STORE_PATH = os.path.join(CACHE_DIR, "prices.sqlite")
+FUNDAMENTALS_STORE_PATH = os.path.join(CACHE_DIR, "fundamentals.sqlite")
+FUNDAMENTALS_CHECK_INTERVAL = 24 * 60 * 60  # seconds stored fundamentals are served before mostRecentQuarter is checked
+
+# in-memory caches of loaded data
+PRICE_CACHE_MAX_BYTES = 256 * 1024 ** 2
+FUNDAMENTALS_CACHE_MAX_BYTES = 32 * 1024 ** 2
+HISTORY_TTL = 24 * 60 * 60  # seconds, for ranges ending before today
+QUOTE_TTL = 15 * 60  # seconds, for ranges that include today
+FUNDAMENTALS_TTL = 6 * 60 * 60
+ANALYSIS_CACHE_MAX_BYTES = 256 * 1024 ** 2  # computed Portfolio Analysis runs
+SPOT_QUOTE_TTL = 60  # seconds a spot price is shared before it is downloaded again
+SPOT_QUOTE_MAX_AGE = 24 * 60 * 60  # seconds a last good spot price covers for failed downloads
+
+# concurrent fundamentals fetching
+FUNDAMENTALS_MAX_WORKERS = 8
+FUNDAMENTALS_RATE_LIMIT = 10  # ticker fetches started per second
+FUNDAMENTALS_TIMEOUT = 30  # seconds per ticker
+
+# K-Means clustering of fundamentals
+CLUSTER_MINIBATCH_ROWS = 10_000  # rows from which "auto" clustering uses MiniBatchKMeans
+CLUSTER_BATCH_SIZE = 2048
+CLUSTER_K_RANGE = range(2, 11)  # cluster counts tried when n_clusters is "auto"
+CLUSTER_MAX_WORKERS = 4  # cluster counts fitted concurrently
+CLUSTER_SILHOUETTE_SAMPLE = 2000  # rows the silhouette score of a cluster count is computed on
+
+# S&P 500 constituents: snapshot shipped with the repo, refreshed copies under CACHE_DIR
+UNIVERSE_SNAPSHOT = os.path.join("data", "sp500_constituents.csv")
+UNIVERSE_CACHE_PATH = os.path.join(CACHE_DIR, "sp500_constituents.csv")
+UNIVERSE_URL = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
+UNIVERSE_MAX_AGE = 7 * 24 * 60 * 60  # seconds before a background refresh is started
+UNIVERSE_REFRESH = os.environ.get("QUANT_UNIVERSE_REFRESH", "1") == "1"
+
+# reference fundamentals (one yfinance info record per ticker), built from sample.csv
+REFERENCE_SOURCE = "sample.csv"
+REFERENCE_PATH = os.path.join("data", "fundamentals_reference.parquet")
+REFERENCE_TEXT_MIN_LENGTH = 256  # mean characters that make a column free text, read only on request
+
+# staged Portfolio Analysis runs: threads for downloads and light stages, spawned
+# processes shared by all sessions for the efficient frontier (0 runs it on a thread)
+ANALYSIS_THREADS = 4
+ANALYSIS_PROCESSES = int(os.environ.get("QUANT_ANALYSIS_PROCESSES", min(4, (os.cpu_count() or 1) - 1)))
+
+# batch portfolio evaluation: float64 values held per chunk of portfolios
+BATCH_MAX_ELEMENTS = 4_000_000
+
+# simulated VaR methods (filtered bootstrap and Monte Carlo)
+VAR_SCENARIOS = 1_000_000
+VAR_CHUNK_SIZE = 250_000
+VAR_SEED = 0
+
+# rolling analytics of the Portfolio Returns tab, in trading days
+ROLLING_WINDOWS = [21, 63, 126, 252]
+
 '''
 financials = {
         "net_income": net_income,
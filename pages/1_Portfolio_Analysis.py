@@ -1,22 +1,93 @@
 
 import datetime as dt
+import time
 import pandas as pd
 import streamlit as st
 import plotly.express as px
 import streamlit_shadcn_ui as ui
 from PIL import Image
 from utils.interpretations import metric_info, var_info, optimization_strategies_info, appinfo
+from utils.analysis import analysis_key, cached_analysis, store_analysis
+from utils.frontier import frontier_task
+from utils.load_data import load_stock_data, load_stocks_data
+from utils.pipeline import StagePipeline
 from utils.portfolio_optimizer import PortfolioOptimizer
 from utils.metrics import MetricsCalculator
-from utils.risk import RiskMetrics
+from utils.risk import RiskMetrics, VAR_METHODS
+from utils.universe import get_universe
+from config import ROLLING_WINDOWS
 
-@st.cache_data
-def get_stocks_list(url):
-    
-    tables = pd.read_html(url) # Returns list of all tables on page
-    df = tables[0]
-    stocks = df.Symbol.values.tolist()
-    return stocks
+def summary_tab(optimizer, metrics, start_date, end_date):
+    # the context shares the raw weights with the other views, format a copy
+    allocation = optimizer.optimized_allocation.copy()
+    allocation.index = [
+        stock.replace("", "")
+        for stock in allocation.index
+    ]
+    allocation.columns = ["Allocation (%)"]
+    allocation["Allocation (%)"] = [
+        round(i * 100, 2)
+        for i in allocation["Allocation (%)"]
+    ]
+
+    st.markdown("#### Optimized Portfolio Performance")
+    col1, col2 = st.columns(2)
+    col1.markdown(f"**Returns**: {optimizer.optimized_returns}%")
+    col1.markdown(f"**Volatility**: {optimizer.optimized_std}%")
+    sharpe = (
+        optimizer.optimized_returns - (optimizer.riskFreeRate * 100)
+    ) / optimizer.optimized_std
+    col1.markdown(f"**Sharpe Ratio**: {round(sharpe, 2)}")
+    col1.markdown(f"**Sortino Ratio**: {round(metrics.MSortinoRatio(), 2)}")
+    col2.markdown(f"**Time Period**: {(end_date - start_date).days} days")
+    st.markdown("#### Optimized Portfolio Allocation")
+    alocCol, pieCol = st.columns(2)
+    with alocCol:
+        allocations = allocation.copy()
+        allocations["Tickers"] = allocations.index
+        allocations = allocations[["Tickers", "Allocation (%)"]]
+        ui.table(allocations)
+    with pieCol:
+        sharpeChart = allocation[
+            allocation["Allocation (%)"] != 0
+        ]
+        fig = px.pie(
+            sharpeChart, values="Allocation (%)", names=sharpeChart.index
+        )
+        fig.update_layout(
+            width=180,
+            height=200,
+            showlegend=False,
+            margin=dict(t=20, b=0, l=0, r=0),
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+def frontier_tab(optimizer):
+    st.markdown("#### Efficient Frontier Assets")
+    frontierAssets, matrix = optimizer.frontierStats()
+    ui.table(frontierAssets)
+    st.markdown("#### Asset Correlations")
+    ui.table(matrix)
+    st.markdown("*(Higher Value Represents Higher Correlation)*")
+    st.markdown("#### Efficient Frontier Graph")
+    optimizer.EF_graph()
+
+def metrics_tab(metrics):
+    metric_df = metrics.metricDf()
+    metric_df = pd.DataFrame(list(metric_df.items()))
+    metric_df.columns = ["Metric", "Value"]
+    st.markdown("#### Risk and Return Metrics")
+    ui.table(metric_df)
+    with st.expander("Metric Interpretations:"):
+        metric_info()
+
+def risk_tab(riskM, varMethod, varHorizon):
+    var = riskM.riskTable(varMethod, varHorizon)
+    ui.table(var)
+    with st.expander("VaR and CVar Interpretation"):
+        var_info()
+    st.markdown("#### VaR Breaches")
+    riskM.varXReturns(varMethod)
 
 def main():
     im = Image.open("./media/EfficientFrontier.png")
@@ -40,7 +111,7 @@ def main():
     cont1 = st.container(border=True)
     cont1.markdown("### Input Parameters")
     
-    stocks = get_stocks_list(r"https://en.wikipedia.org/wiki/List_of_S%26P_500_companies")
+    stocks = get_universe().symbols()
 
     # select multiple stocks
     stocks = cont1.multiselect(
@@ -87,68 +158,17 @@ def main():
 
     st.session_state.stocks_list = stocks[:]
 
+    # results stay on screen across reruns (tab widgets) until the inputs change
+    inputs = (st.session_state.stocks_list, start_date, end_date, optimization_criterion, riskFreeRate)
     if calc:
-        try:
-            with st.spinner("Buckle Up! Financial Wizardry in Progress...."):
-                stocks_list = st.session_state.stocks_list
-                optimizer = PortfolioOptimizer(
-                    stocks_list,
-                    start_date,
-                    end_date,
-                    optimization_criterion,
-                    riskFreeRate,
-                )
-                optimizer.optimized_allocation.index = [
-                    stock.replace("", "")
-                    for stock in optimizer.optimized_allocation.index
-                ]
-                missing_tickers = False
-                ret, std = optimizer.basicMetrics()
-                if not (len(ret.columns) == len(stocks_list)):
-                    missing_tickers = set(stocks_list) - set(ret.columns)
-                    missing_tickers = [str(ticker) for ticker in missing_tickers]
-                    # raise ValueError(
-                    #     f"Data for the following tickers could not be retrieved: {', '.join(missing_tickers)}"
-                    # )
-
-                optimizer.optimized_allocation.columns = ["Allocation (%)"]
-                optimizer.optimized_allocation["Allocation (%)"] = [
-                    round(i * 100, 2)
-                    for i in optimizer.optimized_allocation["Allocation (%)"]
-                ]
+        st.session_state.analysis_key = analysis_key(*inputs)
+    show = st.session_state.get("analysis_key") == analysis_key(*inputs)
 
-                metrics = MetricsCalculator(
-                    stocks_list,
-                    start_date,
-                    end_date,
-                    optimization_criterion,
-                    riskFreeRate,
-                )
-                
-                metric_df = metrics.metricDf()
-                metric_df = pd.DataFrame(list(metric_df.items()))
-                metric_df.columns = ["Metric", "Value"]
-
-                riskM = RiskMetrics(
-                    stocks_list,
-                    start_date,
-                    end_date,
-                    optimization_criterion,
-                    riskFreeRate,
-                )
-        except Exception as e:
-            raise ValueError(str(e))
-        
-        if missing_tickers:
-            st.info(f"Data for the following tickers could not be retrieved: {', '.join(missing_tickers)}")
-
-        # except ValueError as e:
-        #     print(str(e))
-        #     st.error("Unable to download data for one or more tickers!")
-        #     return
-        # except Exception as e:
-        #     st.error(str(e))
-        #     return
+    if show:
+        stocks_list = st.session_state.stocks_list
+        context = cached_analysis(*inputs)
+        cache_hit = context is not None
+        status = st.empty()
 
         with st.container(border=True):
             tab1, tab2, tab3, tab4, tab5 = st.tabs(
@@ -160,67 +180,128 @@ def main():
                     "Risk Analysis",
                 ]
             )
-            with tab1:
-                st.markdown("#### Optimized Portfolio Performance")
-                col1, col2 = st.columns(2)
-                col1.markdown(f"**Returns**: {optimizer.optimized_returns}%")
-                col1.markdown(f"**Volatility**: {optimizer.optimized_std}%")
-                sharpe = (
-                    optimizer.optimized_returns - (optimizer.riskFreeRate * 100)
-                ) / optimizer.optimized_std
-                col1.markdown(f"**Sharpe Ratio**: {round(sharpe, 2)}")
-                col1.markdown(f"**Sortino Ratio**: {round(metrics.MSortinoRatio(), 2)}")
-                col2.markdown(f"**Time Period**: {(end_date - start_date).days} days")
-                st.markdown("#### Optimized Portfolio Allocation")
-                alocCol, pieCol = st.columns(2)
-                with alocCol:
-                    allocations = optimizer.optimized_allocation
-                    allocations["Tickers"] = allocations.index
-                    allocations = allocations[["Tickers", "Allocation (%)"]]
-                    ui.table(allocations)
-                with pieCol:
-                    sharpeChart = optimizer.optimized_allocation[
-                        optimizer.optimized_allocation["Allocation (%)"] != 0
-                    ]
-                    fig = px.pie(
-                        sharpeChart, values="Allocation (%)", names=sharpeChart.index
-                    )
-                    fig.update_layout(
-                        width=180,
-                        height=200,
-                        showlegend=False,
-                        margin=dict(t=20, b=0, l=0, r=0),
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
-
-            with tab2:
-                st.markdown("#### Efficient Frontier Assets")
-                frontierAssets, matrix = optimizer.frontierStats()
-                ui.table(frontierAssets)
-                st.markdown("#### Asset Correlations")
-                ui.table(matrix)
-                st.markdown("*(Higher Value Represents Higher Correlation)*")
-                st.markdown("#### Efficient Frontier Graph")
-                optimizer.EF_graph()
-
-            with tab3:
-                st.markdown("#### Risk and Return Metrics")
-                ui.table(metric_df)
-                with st.expander("Metric Interpretations:"):
-                    metric_info()
-
+            # widgets first, so the stages know which windows and VaR method to compute
             with tab4:
                 st.markdown("#### Cumulative Portfolio Returns")
-                metrics.portfolioReturnsGraph()
-
+                returnsSlot = st.empty()
+                st.markdown("#### Rolling Metrics")
+                metricCol, windowCol = st.columns(2)
+                rollingMetric = metricCol.selectbox(
+                    "Metric",
+                    ["sharpe", "volatility", "sortino", "beta", "drawdown"],
+                    format_func=lambda x: {
+                        "sharpe": "Sharpe Ratio",
+                        "volatility": "Volatility",
+                        "sortino": "Sortino Ratio",
+                        "beta": "Beta vs. S&P 500",
+                        "drawdown": "Drawdown",
+                    }[x],
+                )
+                rollingWindows = windowCol.multiselect(
+                    "Windows (trading days)", options=ROLLING_WINDOWS, default=ROLLING_WINDOWS
+                )
+                rollingSlot = st.empty()
             with tab5:
                 st.markdown("#### VaR and CVaR")
-                var = riskM.riskTable()
-                ui.table(var)
-                with st.expander("VaR and CVar Interpretation"):
-                    var_info()
-                st.markdown("#### VaR Breaches")
-                riskM.varXReturns()
+                methodCol, horizonCol = st.columns(2)
+                varMethod = methodCol.selectbox(
+                    "Method", list(VAR_METHODS), format_func=lambda x: VAR_METHODS[x]
+                )
+                varHorizon = horizonCol.selectbox("Horizon (trading days)", [1, 5, 10, 21])
+                riskSlot = st.empty()
+            summarySlot, frontierSlot, metricsSlot = tab1.empty(), tab2.empty(), tab3.empty()
+            for slot in (summarySlot, frontierSlot, metricsSlot, returnsSlot, riskSlot):
+                slot.markdown("*Buckle Up! Financial Wizardry in Progress....*")
+
+        # downloads run side by side, the views of the optimal portfolio after it, and
+        # the efficient frontier on a worker process; each tab fills in as its stage ends
+        def optimize(prices, benchmark):
+            # the downloaded frames go straight in, so nothing is fetched a second time
+            optimizer = PortfolioOptimizer(
+                stocks_list,
+                start_date,
+                end_date,
+                optimization_criterion,
+                riskFreeRate,
+                frontier=False,
+                stockData=prices,
+                benchmarkData=benchmark,
+            )
+            optimizer.objectiveEngine  # built once, before the stages share it
+            return optimizer
+
+        def build_metrics(optimizer):
+            metrics = MetricsCalculator.from_context(optimizer.context)
+            if rollingWindows:
+                metrics.rollingMetrics(sorted(rollingWindows))
+            return metrics
+
+        def build_risk(optimizer):
+            riskM = RiskMetrics.from_context(optimizer.context)
+            riskM.varCvar(varMethod, varHorizon)
+            riskM.varCvar(varMethod, 1)
+            return riskM
+
+        def frontier_problem(optimizer):
+            return optimizer.meanReturns, optimizer.covMatrix, optimizer.frontierTargets()
+
+        pipeline = StagePipeline()
+        if cache_hit:
+            pipeline.add("optimize", PortfolioOptimizer.from_context, context)
+        else:
+            computeStart = time.perf_counter()
+            pipeline.add("prices", load_stocks_data, stocks_list, start_date, end_date)
+            pipeline.add("benchmark", load_stock_data, "^GSPC", start_date, end_date)
+            pipeline.add("optimize", optimize, after=("prices", "benchmark"))
+            pipeline.add("problem", frontier_problem, after=("optimize",))
+            pipeline.add("frontier", frontier_task, after=("problem",), kind="process")
+        pipeline.add("metrics", build_metrics, after=("optimize",))
+        pipeline.add("risk", build_risk, after=("optimize",))
+
+        try:
+            for stage, result in pipeline.run():
+                if stage == "optimize":
+                    optimizer = result
+                    ret, std = optimizer.basicMetrics()
+                    if not (len(ret.columns) == len(stocks_list)):
+                        missing_tickers = set(stocks_list) - set(ret.columns)
+                        missing_tickers = [str(ticker) for ticker in missing_tickers]
+                        status.info(f"Data for the following tickers could not be retrieved: {', '.join(missing_tickers)}")
+                    if cache_hit:
+                        with frontierSlot.container():
+                            frontier_tab(optimizer)
+                elif stage == "frontier":
+                    optimizer.frontierResults(result)
+                    with frontierSlot.container():
+                        frontier_tab(optimizer)
+                elif stage == "metrics":
+                    metrics = result
+                    with summarySlot.container():
+                        summary_tab(optimizer, metrics, start_date, end_date)
+                    with metricsSlot.container():
+                        metrics_tab(metrics)
+                    with returnsSlot.container():
+                        metrics.portfolioReturnsGraph()
+                    with rollingSlot.container():
+                        if rollingWindows:
+                            metrics.rollingMetricsGraph(rollingMetric, sorted(rollingWindows))
+                elif stage == "risk":
+                    with riskSlot.container():
+                        risk_tab(result, varMethod, varHorizon)
+        except Exception as e:
+            raise ValueError(str(e))
+
+        if cache_hit:
+            age = int(time.time() - optimizer.context.created_at)
+            tab1.caption(
+                f"Cached result: computed {age // 60} min {age % 60} s ago in "
+                f"{optimizer.context.compute_seconds:.1f} s, shared by every run with these inputs."
+            )
+        else:
+            optimizer.context.compute_seconds = time.perf_counter() - computeStart
+            tab1.caption(f"Computed in {optimizer.context.compute_seconds:.1f} s and cached for repeat runs.")
+            # after the stages have filled the context with the cloud, metrics and VaR
+            store_analysis(optimizer.context)
 
 
 if __name__ == "__main__":
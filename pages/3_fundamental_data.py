@@ -1,37 +1,44 @@
 import numpy as np
-import riskfolio as rp
-import yfinance as yf 
+import matplotlib as mpl
 import matplotlib.pyplot as plt 
 import pandas as pd 
 import streamlit as st
-import plotly.graph_objs as go
 import plotly.express as px
-import quantstats as qs
 import warnings
-import datetime 
 warnings.filterwarnings("ignore")
 
-from neuralprophet import NeuralProphet
-from ydata_profiling import ProfileReport
-from streamlit_pandas_profiling import st_profile_report
+# Streamlit re-runs this script on every interaction: keep module-level imports light
+# and import heavy libraries (scikit-learn) inside the functions that need them.
 
-from pylab import plt, mpl
 plt.style.use('seaborn-v0_8-whitegrid')
 mpl.rcParams['savefig.dpi'] = 300
 mpl.rcParams['font.family'] = 'serif'
 np.set_printoptions(precision=5, suppress=True,formatter={'float': lambda x: f'{x:6.3f}'})
-import yfinance as yf
 
 from utils.interpretations import fundamentals_info
 from utils.fundamentals import Fundamentals
+from utils.load_data import fundamentals_due, fundamentals_snapshot
+from utils.providers import get_provider
+from utils.reference import get_reference
+from utils.universe import get_universe
 
 from config import fundamental_columns
-from sklearn.decomposition import PCA
 
 @st.cache_data
 def load_data(ticker: str):
 
-    return yf.Ticker(ticker).info
+    return get_provider().info(ticker)
+
+def screen_data(tickers: list):
+    """
+    Fundamentals of the tickers read from the fundamentals store in one pass; only the
+    tickers it does not hold yet or that are due for a check are fetched first.
+    None when the provider does not keep a store, so the screen fetches them itself.
+    """
+    if not get_provider().cache_on_disk:
+        return None
+    Fundamentals(fundamentals_due(tickers)).get_fundamentals()
+    return fundamentals_snapshot(tickers)
 
 def visualize_clusters_with_pca(df, clusters, n_components=2):
     """
@@ -42,6 +49,8 @@ def visualize_clusters_with_pca(df, clusters, n_components=2):
     clusters (array): Cluster labels.
     n_components (int): Number of PCA components.
     """
+    from sklearn.decomposition import PCA
+
     # Apply PCA
     pca = PCA(n_components=n_components)
     pca_result = pca.fit_transform(df.select_dtypes(include=["float64", "int64"]))
@@ -88,10 +97,7 @@ def visualize_clusters_with_pca(df, clusters, n_components=2):
 
     return fig
 
-url = r'https://en.wikipedia.org/wiki/List_of_S%26P_500_companies'
-tables = pd.read_html(url) # Returns list of all tables on page
-df = tables[0]
-stocks = df['Symbol'].values.tolist()
+stocks = get_universe().symbols()
 
 st.subheader("Fundamental Data:")
 
@@ -104,15 +110,15 @@ col1, col2 = cont1.columns(2)
 
 options = col1.multiselect("Select Stocks For Portfolio", stocks)
 
-df = pd.read_csv('sample.csv')
+# column names come from the reference dataset's schema, no data is read
+reference_columns = get_reference().columns()
 
 filter = col2.radio("Filter Columns:", ("All","Custom"))
-df.set_index('symbol',inplace=True)
 
 if filter == "Custom":
-    columns = cont1.multiselect("Columns:",sorted(df.columns))
+    columns = cont1.multiselect("Columns:",sorted(reference_columns))
 else:
-    columns = df.columns
+    columns = reference_columns
 
 if(cont1.button("Get Fundamental Data")):
     
@@ -151,7 +157,10 @@ if(analysis_type == "K-Means Clustering"):
     else:
         k_means_columns = "All"
     
-    n_clusters = cont2.number_input("Number of Clusters", min_value=2, max_value=10, value=3)
+    if cont2.checkbox("Choose the number of clusters automatically"):
+        n_clusters = "auto"
+    else:
+        n_clusters = cont2.number_input("Number of Clusters", min_value=2, max_value=10, value=3)
     n_components = cont2.number_input("Number of Components", min_value=2, max_value=10, value=3)
 
 calc = cont2.button("Calculate")
@@ -159,12 +168,14 @@ calc = cont2.button("Calculate")
 if calc:
     
     if analysis_type == "Piotroski Score":
-        fund = Fundamentals(stocks_list, analysis_type)
+        fund = Fundamentals(stocks_list, analysis_type, data=screen_data(stocks_list))
         data = fund.start_analysis()
         st.write(data)
+        if fund.failed_tickers:
+            st.info(f"Data for the following tickers could not be retrieved: {', '.join(fund.failed_tickers)}")
     elif analysis_type == "K-Means Clustering":
         
-        fund = Fundamentals(stocks_list, analysis_type, custom_columns=k_means_columns, n_clusters=n_clusters, n_components=n_components)
+        fund = Fundamentals(stocks_list, analysis_type, custom_columns=k_means_columns, n_clusters=n_clusters, n_components=n_components, data=screen_data(stocks_list))
         data = fund.start_analysis()
         fig = visualize_clusters_with_pca(data['raw_data'], data['cluster_labels'], n_components)
 
@@ -176,6 +187,11 @@ if calc:
         else:
             st.plotly_chart(fig)
 
+        if data['k_selection'] is not None:
+            st.write(f"Number of clusters with the highest silhouette score: {data['n_clusters']}")
+            st.write(data['k_selection'])
         st.write(data['cluster_metrics'])
+        if fund.failed_tickers:
+            st.info(f"Data for the following tickers could not be retrieved: {', '.join(fund.failed_tickers)}")
 
 ### ADD KNN MODEL NEXT
\ No newline at end of file
@@ -2,88 +2,15 @@ import streamlit as st
 import pandas as pd
 from datetime import date, datetime, timedelta
 import numpy as np
-from scipy.stats import norm
 from matplotlib import pyplot as plt
 import seaborn as sns
-import yfinance as yf
+from utils.quotes import get_quote_service
+from utils.black_scholes import BlackScholesModel, greek_curve, greek_summary, implied_volatility, sensitivity_grid
 import plotly.graph_objs as go
 
 
-class BlackScholesModel:
-    def __init__(self, r, S, K, T, sigma):
-        self.r = r # Risk Free Rate 
-        self.S = S # Current Stock Price
-        self.K = K # Strike Price
-        self.T = T # Time to maturity in years
-        self.sigma = sigma # Volatility
-
-    def calculate_ds(self):
-        d1 = (np.log(self.S/self.K) + (self.r + 0.5*(self.sigma**2))*self.T)/(self.sigma*np.sqrt(self.T))
-        d2 = d1 - self.sigma*np.sqrt(self.T)
-        return d1, d2
-
-    def black_scholes(self, type):
-        d1, d2 = self.calculate_ds()
-        try:
-            if type == "Call":
-                price = self.S*norm.cdf(d1, 0, 1) - self.K*np.exp(-self.r*self.T)*norm.cdf(d2, 0, 1)
-            elif type == "Put":
-                price = self.K*np.exp(-self.r*self.T)*norm.cdf(-d2, 0, 1) - self.S*norm.cdf(-d1, 0, 1)
-            return round(price, 3)
-        except:
-            return 0.0
-    
-    def greeks(self, type):
-        d1, d2 = self.calculate_ds()
-        try:
-            if type == "Call":
-                delta = norm.cdf(d1, 0, 1)
-                gamma = (norm.pdf(d1, 0, 1))/(self.S*self.sigma*np.sqrt(self.T)) 
-                vega = self.S*norm.pdf(d1, 0, 1)*np.sqrt(self.T)
-                theta = -self.S*norm.pdf(d1, 0, 1)*self.sigma/(2*np.sqrt(self.T)) - self.r*self.K*np.exp(-self.r*self.T)*norm.cdf(d2, 0, 1)
-                rho = self.K*self.T*np.exp(-self.r*self.T)*norm.cdf(d2, 0, 1)
-            elif type == "Put":
-                delta = -norm.cdf(-d1, 0, 1)
-                gamma = (norm.pdf(d1, 0, 1))/(self.S*self.sigma*np.sqrt(self.T)) 
-                vega = self.S*norm.pdf(d1, 0, 1)*np.sqrt(self.T)
-                theta = -self.S*norm.pdf(d1, 0, 1)*self.sigma/(2*np.sqrt(self.T)) + self.r*self.K*np.exp(-self.r*self.T)*norm.cdf(-d2, 0, 1)
-                rho = -self.K*self.T*np.exp(-self.r*self.T)*norm.cdf(-d2, 0, 1)
-
-            return {
-                'delta': round(delta, 3), 'gamma': gamma, 'theta': round(theta/365, 4), 'vega': round(vega*0.01, 3), 'rho': round(rho*0.01, 3)
-            }
-        
-        except:
-            return 0
-
-def greek_summary(r, S, K, T, sigma):
-    greeks_list = ['delta', 'gamma', 'vega', 'theta', 'rho']
-    call_greeks = [BlackScholesModel(r, S, K, T, sigma).greeks('Call')[greek] for greek in greeks_list]
-    put_greeks = [BlackScholesModel(r, S, K, T, sigma).greeks('Put')[greek] for greek in greeks_list]
-    summary = {'Call Greeks' : call_greeks,
-                'Put Greeks': put_greeks}
-    df = pd.DataFrame(summary, index = ['Delta', 'Gamma', 'Vega', 'Theta', 'Rho'])
-    return df
-
 def volatility_sensitivity(r, spot, strike, T, sigma, type):
-    min_v = 0.01
-    max_v = 0.60
-    if type == 'Call':
-        min_s = spot * (1.0)
-        max_s = spot * (1.05)
-    elif type == 'Put':
-        min_s = spot * (0.95)
-        max_s = spot * (1.0)
-    volatility_values = np.linspace(min_v, max_v, 10)
-    spot_values = np.linspace(min_s, max_s, 10)
-    spot_values = [int(i) for i in spot_values]
-    volatility_values = [round(i, 3) for i in volatility_values]
-    sensitivity_data = {}
-    for value in spot_values:
-        column_prices = [round(BlackScholesModel(r, value, strike, T, sigma).black_scholes(type), 1) for sigma in volatility_values]
-        sensitivity_data.update({value : column_prices})
-    
-    df = pd.DataFrame(data = sensitivity_data, index = volatility_values)
+    df = sensitivity_grid(r, spot, strike, T, type)
     fig, ax = plt.subplots(figsize = (10, 8))
     heatmap = sns.heatmap(ax = ax, data = df, cmap = 'viridis_r', annot = True, fmt = "0.1f", annot_kws = {'fontsize': 11})
     ax.set_xlabel('Spot', size = 14)
@@ -96,16 +23,10 @@ def greek_visualisation(r, spot, strike, T, sigma, type, greek):
     fig = go.Figure()
     if type == 'Call':
         line_color = '#FA7070'
-        min_s = spot * (0.92)
-        max_s = spot * (1.09)
     elif type == 'Put':
         line_color = '#799351'
-        min_s = spot * (0.92)
-        max_s = spot * (1.09)
-    spot_values = np.linspace(min_s, max_s, 200)
 
-    greek_values = [BlackScholesModel(r, spot, strike, T, sigma).greeks(type)[greek] for spot in spot_values]
-    current_greek_value = BlackScholesModel(r, spot, strike, T, sigma).greeks(type)[greek]
+    spot_values, greek_values, current_greek_value = greek_curve(r, spot, strike, T, sigma, type, greek)
 
     fig.add_trace(go.Scatter(x = spot_values, y = greek_values, mode = 'lines', name = f'{greek.capitalize()}', line = dict(color = line_color, width = 3)))
     fig.add_trace(go.Scatter(x = [spot], y = [current_greek_value], mode = 'markers', name = f'Current {greek.capitalize()}', marker = dict(color = 'black', size = 7)))
@@ -117,9 +38,32 @@ def greek_visualisation(r, spot, strike, T, sigma, type, greek):
     return fig
 
 
+def option_chain(r, spot, T, sigma):
+    strikes = np.round(np.linspace(spot * 0.9, spot * 1.1, 21) / 5) * 5
+    model = BlackScholesModel(r, spot, strikes, T, sigma)
+    calls = pd.DataFrame({'Strike': strikes, 'Type': 'Call', 'Price': np.round(model.evaluate()['Call']['price'], 2)})
+    puts = pd.DataFrame({'Strike': strikes, 'Type': 'Put', 'Price': np.round(model.evaluate()['Put']['price'], 2)})
+    return pd.concat([calls, puts], ignore_index = True)
+
+
+def volatility_smile(r, spot, T, chain):
+    solved = implied_volatility(chain['Price'].to_numpy(), r, spot, chain['Strike'].to_numpy(), T, chain['Type'].to_numpy())
+    chain = chain.assign(**{'Implied Volatility (%)': np.round(solved['volatility'] * 100, 2),
+                            'Iterations': solved['iterations'],
+                            'Converged': solved['converged']})
+
+    fig = go.Figure()
+    for type, line_color in (('Call', '#FA7070'), ('Put', '#799351')):
+        quotes = chain[(chain['Type'] == type) & chain['Converged']].sort_values('Strike')
+        fig.add_trace(go.Scatter(x = quotes['Strike'], y = quotes['Implied Volatility (%)'], mode = 'lines+markers', name = type, line = dict(color = line_color, width = 3)))
+    fig.update_layout(title = 'Implied Volatility Smile',
+                      xaxis_title = 'Strike',
+                      yaxis_title = 'Implied Volatility (%)')
+    return chain, fig
+
+
 def fetch_spy():
-    spy_latest = yf.download('^GSPC', interval = '1m', period = '1d')
-    spy_latest = round(spy_latest.Close.values[-1][0], 1)
+    spy_latest = round(get_quote_service().last_price('^GSPC'), 1)
     return spy_latest
 
 def main():
@@ -128,9 +72,10 @@ def main():
 
     ## Side Bar
     st.sidebar.markdown("<h1 style = 'text-align: left;'>Black-Scholes Calculator</h1>", unsafe_allow_html = True)
-    strike_default = (100 - ((fetch_spy()) % 100)) + fetch_spy()
+    spy_latest = fetch_spy()
+    strike_default = (100 - (spy_latest % 100)) + spy_latest
     strike = st.sidebar.number_input("Strike Price", value = strike_default, step = 5.0, format = "%0.1f")
-    spot = st.sidebar.number_input("Spot Price of Underlying (default is SP500)", value = fetch_spy(), step = 5.0, format = "%0.1f")    
+    spot = st.sidebar.number_input("Spot Price of Underlying (default is SP500)", value = spy_latest, step = 5.0, format = "%0.1f")    
     expiry = st.sidebar.date_input('Time to Expiry', min_value = date.today(), value = date.today() + timedelta(days = 15))
     sigma = st.sidebar.number_input('Volatility (%)', min_value = 0.00, max_value = 100.00, step = 1.0, format = "%0.2f", value = 40.00)
     r = st.sidebar.number_input('Risk Free Rate (%)', min_value = 0.00, max_value = 100.00, step = 0.01, format = "%0.2f", value = 6.731)
@@ -196,6 +141,19 @@ def main():
         call_col.plotly_chart(fig_greeks_call)
         put_col.plotly_chart(fig_greeks_put)
 
+    ## Implied Volatility
+    iv_container = st.container(border = True)
+    iv_container.subheader('Implied Volatility', divider = 'gray')
+    iv_container.caption('Edit the prices to quote your own chain; the default chain is priced at the volatility above.')
+    chain_col, smile_col = iv_container.columns(2)
+    chain = chain_col.data_editor(option_chain(r, spot, T, sigma), num_rows = 'dynamic', use_container_width = True)
+    solved_chain, fig_smile = volatility_smile(r, spot, T, chain.dropna())
+    smile_col.plotly_chart(fig_smile)
+    failed = int((~solved_chain['Converged']).sum())
+    if failed:
+        iv_container.warning(f'{failed} quote(s) have no implied volatility (price outside the no-arbitrage range or above 500% volatility).')
+    iv_container.dataframe(solved_chain, use_container_width = True)
+
 
 
 if __name__ == "__main__":
@@ -0,0 +1,148 @@
+import datetime as dt
+import hashlib
+import json
+import threading
+import time
+import pandas as pd
+from .cache import TTLCache
+from .providers import get_provider
+from config import ANALYSIS_CACHE_MAX_BYTES, HISTORY_TTL, QUOTE_TTL
+
+
+class AnalysisContext:
+    """
+    Results of one Portfolio Analysis run that every view shares.
+
+    PortfolioOptimizer fills the context once: price returns, mean returns and
+    covariance, benchmark returns, the optimal allocation and the efficient frontier.
+    MetricsCalculator and RiskMetrics built from the same context reuse all of it
+    instead of downloading, optimizing and simulating again.
+    """
+
+    FIELDS = [
+        "returns",
+        "stdIndividual",
+        "meanReturns",
+        "covMatrix",
+        "benchmark",
+        "optimized_returns",
+        "optimized_std",
+        "optimized_allocation",
+        "efficientList",
+        "targetReturns",
+        "frontierWeights",
+        "objectiveEngine",
+        "performance",
+    ]
+
+    def __init__(self, stocks, start, end, optimization_criterion, riskFreeRate=0.07024):
+        self.stocks = [stock for stock in stocks]
+        self.start = start
+        self.end = end
+        self.optimization_criterion = optimization_criterion
+        self.riskFreeRate = riskFreeRate
+        for field in self.FIELDS:
+            setattr(self, field, None)
+        # (noOfPortfolios, seed) -> (volatility, return, sharpe) of the random portfolio cloud
+        self.simulated_portfolios = {}
+        # (method, horizon) -> VaR and CVaR per confidence level
+        self.var_results = {}
+        # tuple of windows -> rolling metrics frame
+        self.rolling_results = {}
+        self.created_at = time.time()
+        self.compute_seconds = None
+        # held while results are added, so the context can be measured as other sessions add to it
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # the attributes, with copies of the result dicts taken while no results are added
+        with self._lock:
+            state = {name: dict(value) if isinstance(value, dict) else value for name, value in vars(self).items()}
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def is_computed(self) -> bool:
+        return self.optimized_allocation is not None
+
+    @property
+    def key(self) -> str:
+        return analysis_key(self.stocks, self.start, self.end, self.optimization_criterion, self.riskFreeRate)
+
+    def update(self, **fields):
+        """
+        Set fields of a context that may already be shared, and account for its new size
+        in the analysis cache.
+        """
+        with self._lock:
+            for name, value in fields.items():
+                setattr(self, name, value)
+        self.changed()
+
+    def add(self, results: str, key, value):
+        """
+        Add a result to one of the result dicts (simulated_portfolios, var_results,
+        rolling_results) of a context that may already be shared, and account for its
+        new size in the analysis cache.
+        """
+        with self._lock:
+            getattr(self, results)[key] = value
+        self.changed()
+
+    def changed(self):
+        """
+        Call after changing a context that may already be shared, so the analysis cache
+        accounts for its new size. update() and add() call it.
+        """
+        analysis_cache.resize(self.key)
+
+
+def analysis_key(stocks, start, end, optimization_criterion, riskFreeRate) -> str:
+    """
+    Hash of the inputs of an analysis run, the same for every session.
+
+    Tickers keep their order, since weights and labels of the results follow it. Dates
+    are written as ISO dates and the rate as a decimal rounded to 1e-10, so equivalent
+    inputs share one key. The active data provider's cache_key is part of the key.
+    """
+    inputs = {
+        "provider": get_provider().cache_key,
+        "stocks": [str(stock) for stock in stocks],
+        "start": pd.Timestamp(start).date().isoformat(),
+        "end": pd.Timestamp(end).date().isoformat(),
+        "criterion": optimization_criterion,
+        "riskFreeRate": round(float(riskFreeRate), 10),
+    }
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+
+
+def _analysis_ttl(context) -> float:
+    # runs reaching today go stale with the latest quotes
+    if pd.Timestamp(context.end).date() >= dt.date.today():
+        return QUOTE_TTL
+    return HISTORY_TTL
+
+
+# computed contexts shared by every session, bounded by their estimated size
+analysis_cache = TTLCache(ANALYSIS_CACHE_MAX_BYTES)
+
+
+def cached_analysis(stocks, start, end, optimization_criterion, riskFreeRate):
+    """
+    Computed AnalysisContext of earlier runs with the same inputs, or None.
+    """
+    return analysis_cache.get(analysis_key(stocks, start, end, optimization_criterion, riskFreeRate))
+
+
+def store_analysis(context):
+    """
+    Share a computed AnalysisContext with later runs of the same inputs.
+
+    Results the views add later through AnalysisContext.update() and add() are
+    accounted for in the cache.
+    """
+    analysis_cache.set(context.key, context, _analysis_ttl(context))
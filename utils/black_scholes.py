@@ -0,0 +1,225 @@
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr
+
+GREEKS = ["delta", "gamma", "vega", "theta", "rho"]
+
+
+def _norm_pdf(x):
+    return np.exp(-x**2 / 2.0) / np.sqrt(2 * np.pi)
+
+
+class BlackScholesModel:
+    """
+    Black-Scholes prices and greeks of European options.
+
+    Every input may be a scalar or a NumPy array; arrays broadcast against each other,
+    so a whole grid of spots, strikes, maturities, volatilities or rates is priced in
+    one evaluation.
+
+    Parameters:
+        r: Risk free rate.
+        S: Current stock price.
+        K: Strike price.
+        T: Time to maturity in years.
+        sigma: Volatility.
+    """
+
+    def __init__(self, r, S, K, T, sigma):
+        self.r = np.asarray(r, dtype="float64")  # Risk Free Rate
+        self.S = np.asarray(S, dtype="float64")  # Current Stock Price
+        self.K = np.asarray(K, dtype="float64")  # Strike Price
+        self.T = np.asarray(T, dtype="float64")  # Time to maturity in years
+        self.sigma = np.asarray(sigma, dtype="float64")  # Volatility
+        self._results = None
+
+    def calculate_ds(self):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            d1 = (np.log(self.S/self.K) + (self.r + 0.5*(self.sigma**2))*self.T)/(self.sigma*np.sqrt(self.T))
+        d2 = d1 - self.sigma*np.sqrt(self.T)
+        return d1, d2
+
+    def evaluate(self):
+        """
+        Prices and greeks of the call and the put from one pass over d1 and d2.
+
+        Returns:
+            dict: {"Call": {...}, "Put": {...}} with "price" and the GREEKS, unrounded.
+            Theta is per calendar day, vega and rho per percentage point.
+        """
+        if self._results is not None:
+            return self._results
+
+        d1, d2 = self.calculate_ds()
+        sqrtT = np.sqrt(self.T)
+        discount = self.K*np.exp(-self.r*self.T)
+        cdf_d1, cdf_d2 = ndtr(d1), ndtr(d2)
+        cdf_minus_d1, cdf_minus_d2 = ndtr(-d1), ndtr(-d2)
+        pdf_d1 = _norm_pdf(d1)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            gamma = pdf_d1/(self.S*self.sigma*sqrtT)
+            decay = -self.S*pdf_d1*self.sigma/(2*sqrtT)
+        vega = self.S*pdf_d1*sqrtT*0.01
+
+        self._results = {
+            "Call": {
+                "price": self.S*cdf_d1 - discount*cdf_d2,
+                "delta": cdf_d1,
+                "gamma": gamma,
+                "vega": vega,
+                "theta": (decay - self.r*discount*cdf_d2)/365,
+                "rho": self.T*discount*cdf_d2*0.01,
+            },
+            "Put": {
+                "price": discount*cdf_minus_d2 - self.S*cdf_minus_d1,
+                "delta": -cdf_minus_d1,
+                "gamma": gamma,
+                "vega": vega,
+                "theta": (decay + self.r*discount*cdf_minus_d2)/365,
+                "rho": -self.T*discount*cdf_minus_d2*0.01,
+            },
+        }
+        return self._results
+
+    def black_scholes(self, type):
+        if type not in ("Call", "Put"):
+            raise ValueError(f"Unknown option type: {type}")
+        return np.round(self.evaluate()[type]["price"], 3)
+
+    def greeks(self, type):
+        if type not in ("Call", "Put"):
+            raise ValueError(f"Unknown option type: {type}")
+        greeks = self.evaluate()[type]
+        return {
+            'delta': np.round(greeks["delta"], 3),
+            'gamma': greeks["gamma"],
+            'theta': np.round(greeks["theta"], 4),
+            'vega': np.round(greeks["vega"], 3),
+            'rho': np.round(greeks["rho"], 3),
+        }
+
+
+def greek_summary(r, S, K, T, sigma):
+    model = BlackScholesModel(r, S, K, T, sigma)
+    call_greeks, put_greeks = model.greeks('Call'), model.greeks('Put')
+    summary = {'Call Greeks': [call_greeks[greek] for greek in GREEKS],
+               'Put Greeks': [put_greeks[greek] for greek in GREEKS]}
+    return pd.DataFrame(summary, index=['Delta', 'Gamma', 'Vega', 'Theta', 'Rho'])
+
+
+def sensitivity_grid(r, spot, strike, T, type):
+    """
+    Option prices over a grid of spots (columns) and volatilities (rows).
+    """
+    min_v = 0.01
+    max_v = 0.60
+    if type == 'Call':
+        min_s = spot * (1.0)
+        max_s = spot * (1.05)
+    elif type == 'Put':
+        min_s = spot * (0.95)
+        max_s = spot * (1.0)
+    volatility_values = np.round(np.linspace(min_v, max_v, 10), 3)
+    spot_values = [int(i) for i in np.linspace(min_s, max_s, 10)]
+
+    prices = BlackScholesModel(r, np.array(spot_values)[None, :], strike, T, volatility_values[:, None]).black_scholes(type)
+    sensitivity_data = {value: np.round(prices[:, j], 1) for j, value in enumerate(spot_values)}
+    return pd.DataFrame(data=sensitivity_data, index=list(volatility_values))
+
+
+def greek_curve(r, spot, strike, T, sigma, type, greek, points=200):
+    """
+    A greek over spot prices from 92% to 109% of the current spot.
+
+    Returns:
+        np.ndarray, np.ndarray, float: Spot prices, greek values and the greek at the current spot.
+    """
+    spot_values = np.linspace(spot * (0.92), spot * (1.09), points)
+    model = BlackScholesModel(r, np.append(spot_values, spot), strike, T, sigma)
+    greek_values = model.greeks(type)[greek]
+    return spot_values, greek_values[:-1], greek_values[-1]
+
+
+def implied_volatility(price, r, S, K, T, type="Call", tol=1e-8, max_iterations=100, lower=1e-4, upper=5.0):
+    """
+    Implied volatilities of many option quotes at once.
+
+    Every quote runs a safeguarded Newton iteration on the Black-Scholes price: a Newton
+    step with vega when it stays inside the quote's current volatility bracket, a
+    bisection step otherwise. Brackets shrink around the root each iteration and only
+    unconverged quotes are re-priced.
+
+    Parameters:
+        price: Market option prices.
+        r, S, K, T: Risk free rate, spot, strike and years to maturity (broadcast with price).
+        type: "Call", "Put", or an array of both, one per quote.
+        tol (float): Price tolerance, also used on the width of the volatility bracket.
+        max_iterations (int): Iterations allowed per quote.
+        lower, upper (float): Volatility search range.
+
+    Returns:
+        dict: "volatility" (NaN where the solve failed), "iterations" and "converged" per
+        quote, in the shape of the broadcast inputs. A quote fails without iterating when
+        its price needs a volatility outside [lower, upper], e.g. below intrinsic value.
+        Where vega is tiny (deep in the money, near expiry) the price pins down the
+        volatility only loosely.
+    """
+    price, r, S, K, T, type = np.broadcast_arrays(
+        *(np.asarray(x, dtype="float64") for x in (price, r, S, K, T)), np.asarray(type)
+    )
+    shape = price.shape
+    price, r, S, K, T = (np.array(x, dtype="float64").ravel() for x in (price, r, S, K, T))
+    is_call = np.asarray(type).ravel() == "Call"
+
+    def model_price(index, sigma):
+        model = BlackScholesModel(r[index], S[index], K[index], T[index], sigma)
+        results = model.evaluate()
+        value = np.where(is_call[index], results["Call"]["price"], results["Put"]["price"])
+        return value, results["Call"]["vega"] * 100
+
+    volatility = np.full(price.size, np.nan)
+    iterations = np.zeros(price.size, dtype=int)
+    converged = np.zeros(price.size, dtype=bool)
+
+    # the price must lie between the prices at lower and upper volatility, which also
+    # rules out quotes outside the no-arbitrage range
+    index = np.flatnonzero((T > 0) & np.isfinite(price))
+    floor = model_price(index, np.full(index.size, lower))[0]
+    ceiling = model_price(index, np.full(index.size, upper))[0]
+    index = index[(floor - tol <= price[index]) & (price[index] <= ceiling + tol)]
+
+    lo = np.full(price.size, lower)
+    hi = np.full(price.size, upper)
+    # Manaster-Koehler start, the inflection point of price in volatility
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sigma = np.sqrt(2*np.abs(np.log(S/K) + r*T)/T)
+    sigma = np.clip(np.nan_to_num(sigma, nan=0.2), lower, upper)
+    sigma[sigma <= lower] = 0.2
+
+    for iteration in range(max_iterations):
+        if index.size == 0:
+            break
+        value, vega = model_price(index, sigma[index])
+        error = value - price[index]
+        iterations[index] += 1
+
+        done = (np.abs(error) < tol) | (hi[index] - lo[index] < tol)
+        converged[index[done]] = True
+        volatility[index[done]] = sigma[index[done]]
+
+        index, error, vega = index[~done], error[~done], vega[~done]
+        above = error > 0
+        hi[index[above]] = sigma[index[above]]
+        lo[index[~above]] = sigma[index[~above]]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            newton = sigma[index] - error/vega
+        inside = np.isfinite(newton) & (newton > lo[index]) & (newton < hi[index])
+        sigma[index] = np.where(inside, newton, (lo[index] + hi[index])/2)
+
+    return {
+        "volatility": volatility.reshape(shape),
+        "iterations": iterations.reshape(shape),
+        "converged": converged.reshape(shape),
+    }
@@ -0,0 +1,187 @@
+# bounded in-memory caching
+
+import functools
+import sys
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+_MISSING = object()
+
+
+def estimate_size(value) -> int:
+    """
+    Approximate memory footprint of a cached value in bytes.
+
+    DataFrames, Series and indexes are measured with memory_usage(deep=True), arrays by
+    their buffer size, containers by summing their items and other objects by their
+    state (__getstate__, their attributes unless the class says otherwise).
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, pd.Index):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    if hasattr(value, "__dict__") and not isinstance(value, type):
+        getstate = getattr(value, "__getstate__", None)
+        return sys.getsizeof(value) + estimate_size(vars(value) if getstate is None else getstate())
+    return sys.getsizeof(value)
+
+
+class TTLCache:
+    """
+    Least-recently-used cache bounded by memory, with an expiry time per entry.
+
+    Parameters:
+        max_bytes (int): Total estimated size of the cached values. Least recently used
+            entries are evicted to stay below it; values larger than the cap are not cached.
+        default_ttl (float): Seconds an entry lives when set() gets no ttl. None never expires.
+    """
+
+    def __init__(self, max_bytes: int, default_ttl: float = None):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries = OrderedDict()  # key -> (value, size, expires_at)
+        self._lock = threading.RLock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] is not None and entry[2] <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value, ttl: float = None):
+        ttl = self.default_ttl if ttl is None else ttl
+        size = estimate_size(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return
+            self._purge_expired()
+            while self._entries and self.current_bytes + size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+            expires_at = None if ttl is None else time.monotonic() + ttl
+            self._entries[key] = (value, size, expires_at)
+            self.current_bytes += size
+
+    def resize(self, key):
+        """
+        Re-estimate the size of an entry whose value was changed in place.
+
+        The entry keeps its expiry time. Least recently used entries are evicted to stay
+        below max_bytes, and the entry itself is dropped (and counted as an eviction) when
+        it no longer fits. The value is measured outside the cache lock; values other
+        threads keep changing should return a consistent copy from __getstate__.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return
+        size = estimate_size(entry[0])
+        with self._lock:
+            if self._entries.get(key) is not entry:
+                return
+            self.current_bytes += size - entry[1]
+            self._entries[key] = (entry[0], size, entry[2])
+            if size > self.max_bytes:
+                self._remove(key)
+                self.evictions += 1
+                return
+            while self.current_bytes > self.max_bytes:
+                oldest = next(k for k in self._entries if k != key)
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, key=_MISSING):
+        """
+        Drop one entry, or every entry when called without a key.
+        """
+        with self._lock:
+            if key is _MISSING:
+                self._entries.clear()
+                self.current_bytes = 0
+            elif key in self._entries:
+                self._remove(key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def _remove(self, key):
+        value, size, expires_at = self._entries.pop(key)
+        self.current_bytes -= size
+
+    def _purge_expired(self):
+        now = time.monotonic()
+        expired = [key for key, entry in self._entries.items() if entry[2] is not None and entry[2] <= now]
+        for key in expired:
+            self._remove(key)
+            self.expirations += 1
+
+
+def cached(cache: TTLCache, ttl=None):
+    """
+    Memoize a function in a TTLCache.
+
+    Parameters:
+        cache (TTLCache): Cache holding the results.
+        ttl (float | callable): Seconds a result lives, or a function of the call's
+            arguments returning the seconds. None uses the cache's default.
+
+    Several functions may share one cache. The wrapped function gets
+    invalidate(*args, **kwargs) to drop a single result, cache_clear() (which clears
+    the whole cache) and cache_stats().
+    """
+    def decorator(func):
+        def make_key(args, kwargs):
+            return (func.__module__, func.__qualname__, args, tuple(sorted(kwargs.items())))
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = make_key(args, kwargs)
+            value = cache.get(key, _MISSING)
+            if value is _MISSING:
+                value = func(*args, **kwargs)
+                cache.set(key, value, ttl(*args, **kwargs) if callable(ttl) else ttl)
+            return value
+
+        wrapper.cache = cache
+        wrapper.invalidate = lambda *args, **kwargs: cache.invalidate(make_key(args, kwargs))
+        wrapper.cache_clear = cache.invalidate
+        wrapper.cache_stats = cache.stats
+        return wrapper
+
+    return decorator
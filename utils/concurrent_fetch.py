@@ -0,0 +1,108 @@
+# concurrent network fetching
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class RateLimiter:
+    """
+    Token bucket limiting how many calls per second may start.
+
+    Parameters:
+        rate (float): Calls allowed per second.
+        burst (int): Calls that may start back to back before the rate applies.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Block until a call may start.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_time = (1 - self._tokens) / self.rate
+            time.sleep(wait_time)
+
+
+_host_limiters = {}  # (host, rate, burst) -> RateLimiter
+_host_limiters_lock = threading.Lock()
+
+
+def rate_limiter_for(host: str, rate: float, burst: int = 1) -> RateLimiter:
+    """
+    Rate limiter shared by every caller that talks to the same host at the same rate.
+
+    Limiters are keyed on (host, rate, burst): concurrent sessions with the same
+    settings draw from one budget, and a caller with other settings gets a limiter of
+    its own instead of changing theirs.
+    """
+    key = (host, rate, burst)
+    with _host_limiters_lock:
+        if key not in _host_limiters:
+            _host_limiters[key] = RateLimiter(rate, burst)
+        return _host_limiters[key]
+
+
+def fetch_concurrently(fetch, keys, max_workers: int = 8, rate_limiter: RateLimiter = None, timeout: float = None):
+    """
+    Call fetch(key) for every key on a bounded thread pool.
+
+    Parameters:
+        fetch (callable): Function taking a single key.
+        keys (iterable): Keys to fetch, e.g. tickers.
+        max_workers (int): Number of worker threads.
+        rate_limiter (RateLimiter): Optional limiter acquired before every call.
+        timeout (float): Seconds a single call may run before it is given up on.
+
+    Returns:
+        dict, dict: Results per key and the exception per failed key. A call that times out
+        is reported as a TimeoutError; its thread is abandoned rather than interrupted.
+    """
+    keys = list(dict.fromkeys(keys))
+    results, errors = {}, {}
+    started = {}
+
+    def run(key):
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        started[key] = time.monotonic()
+        return fetch(key)
+
+    poll_interval = None if timeout is None else min(timeout / 10, 0.1)
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    futures = {executor.submit(run, key): key for key in keys}
+    pending = set(futures)
+    try:
+        while pending:
+            done, pending = wait(pending, timeout=poll_interval, return_when=FIRST_COMPLETED)
+            for future in done:
+                key = futures[future]
+                try:
+                    results[key] = future.result()
+                except Exception as e:
+                    errors[key] = e
+
+            if timeout is not None:
+                now = time.monotonic()
+                for future in list(pending):
+                    key = futures[future]
+                    if key in started and now - started[key] > timeout:
+                        pending.discard(future)
+                        errors[key] = TimeoutError(f"Fetching {key} took longer than {timeout}s")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return results, errors
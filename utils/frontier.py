@@ -0,0 +1,299 @@
+import numpy as np
+import scipy.optimize as sc
+
+
+def _lambda_in(covMatrix, meanReturns, weights, free, bounded, covarF_inv, lower, upper):
+    # lambda at which every free weight reaches the bound it is moving towards
+    meanF = meanReturns[free]
+    c4 = covarF_inv.sum(axis=1)
+    c2 = covarF_inv @ meanF
+    c1 = c4.sum()
+    c3 = c4 @ meanF
+    c = -c1 * c2 + c3 * c4
+    bi = np.where(c > 0, upper[free], lower[free])
+    if bounded:
+        wB = weights[bounded]
+        l3 = covarF_inv @ (covMatrix[np.ix_(free, bounded)] @ wB)
+        numerator = (1 - wB.sum() + l3.sum()) * c4 - c1 * (bi + l3)
+    else:
+        numerator = c4 - c1 * bi
+    lam = np.full(len(free), np.nan)
+    valid = np.abs(c) > 1e-15
+    lam[valid] = numerator[valid] / c[valid]
+    return lam, bi
+
+
+def _lambda_out(covMatrix, meanReturns, weights, free, bounded, covarF_inv):
+    # lambda at which every bounded weight would become free. Adding asset i to the free
+    # set borders covarF with u = cov[F, i]; the entries of the bordered inverse that are
+    # needed follow from covarF_inv, a = covarF_inv @ u and k = cov[i, i] - u @ a.
+    meanF, meanB, wB = meanReturns[free], meanReturns[bounded], weights[bounded]
+    variances = np.diag(covMatrix)[bounded]
+    U = covMatrix[np.ix_(free, bounded)]
+    A = covarF_inv @ U
+    k = variances - np.einsum("ij,ij->j", U, A)
+    # k = 0: asset i is a combination of the free assets and the bordered matrix is
+    # singular, so it cannot become free; NaN keeps it out without dividing by zero
+    k = np.where(k > 1e-12 * variances, k, np.nan)
+    onesInv = covarF_inv.sum(axis=0)
+    sa = A.sum(axis=0)
+    excessMean = meanB - meanF @ A
+
+    c4 = (1 - sa) / k
+    c2 = excessMean / k
+    c1 = onesInv.sum() + (1 - sa) ** 2 / k
+    c3 = onesInv @ meanF + (1 - sa) * excessMean / k
+    c = -c1 * c2 + c3 * c4
+
+    # covariances with the weights that stay bounded once asset i is free
+    VF = (U @ wB)[:, None] - U * wB
+    vB = covMatrix[np.ix_(bounded, bounded)] @ wB - variances * wB
+    excessV = vB - np.einsum("ij,ij->j", A, VF)
+    l1 = wB.sum() - wB
+    l2 = onesInv @ VF + (1 - sa) * excessV / k
+    l3 = excessV / k
+
+    # c = 0 (a mean tied with the free assets) has no crossing lambda
+    lam = np.full(len(bounded), np.nan)
+    valid = np.abs(c) > 1e-15
+    lam[valid] = ((1 - l1 + l2) * c4 - c1 * (wB + l3))[valid] / c[valid]
+    return lam
+
+
+def _free_weights(covarF_inv, covarFB, meanF, wB, lam):
+    onesF = np.ones(len(meanF))
+    g1 = onesF @ covarF_inv @ meanF
+    g2 = onesF @ covarF_inv @ onesF
+    if wB is None:
+        g, w1 = -lam * g1 / g2 + 1 / g2, 0
+    else:
+        w1 = covarF_inv @ covarFB @ wB
+        g = -lam * g1 / g2 + (1 - np.sum(wB) + np.sum(w1)) / g2
+    return -w1 + g * (covarF_inv @ onesF) + lam * (covarF_inv @ meanF)
+
+
+def critical_line(meanReturns, covMatrix, lower, upper, tol=1e-10):
+    """
+    Turning points of the efficient frontier with Markowitz's critical line algorithm.
+
+    Between two adjacent turning points the optimal weights move linearly with the
+    target return, so the turning points describe the whole frontier exactly.
+
+    Parameters:
+        meanReturns (np.ndarray): Expected return per asset.
+        covMatrix (np.ndarray): Covariance matrix.
+        lower, upper (np.ndarray): Bounds of every weight.
+
+    Returns:
+        np.ndarray: Turning point weights (points x assets), from the highest return
+        portfolio down to the minimum variance portfolio. Empty when the algorithm cannot
+        trace the branch: when another asset's mean ties with the starting asset's (it
+        would have to become free at an infinite lambda), or when rounding makes lambda
+        stop decreasing.
+    """
+    numAssets = len(meanReturns)
+    broken = np.empty((0, numAssets))
+
+    # start from the highest return portfolio: fill the best assets up to their bounds
+    order = np.argsort(meanReturns)
+    weights = lower.astype("float64").copy()
+    i = numAssets
+    while np.sum(weights) < 1 and i > 0:
+        i -= 1
+        weights[order[i]] = upper[order[i]]
+    weights[order[i]] += 1 - np.sum(weights)
+    free = [order[i]]
+    scale = max(np.abs(meanReturns).max(), 1e-12)
+    if np.sum(np.abs(meanReturns - meanReturns[order[i]]) <= 1e-9 * scale) > 1:
+        return broken
+
+    turningPoints, lambdas = [weights.copy()], [None]
+    # the asset that changed side last may not switch back at the same lambda, which
+    # rounding would otherwise allow and which makes the algorithm cycle
+    lastChanged = None
+    while True:
+        bounded = [i for i in range(numAssets) if i not in free]
+        covarF_inv = np.linalg.inv(covMatrix[np.ix_(free, free)])
+
+        # a free weight moves to one of its bounds
+        lambdaIn = None
+        if len(free) > 1:
+            lam, bi = _lambda_in(covMatrix, meanReturns, weights, free, bounded, covarF_inv, lower, upper)
+            lam[np.array(free) == lastChanged] = np.nan
+            if not np.all(np.isnan(lam)):
+                j = np.nanargmax(lam)
+                lambdaIn, iIn, biIn = lam[j], free[j], bi[j]
+
+        # a bounded weight becomes free
+        lambdaOut = None
+        if bounded:
+            lam = _lambda_out(covMatrix, meanReturns, weights, free, bounded, covarF_inv)
+            if lambdas[-1] is not None:
+                lam[lam >= lambdas[-1]] = np.nan
+            lam[np.array(bounded) == lastChanged] = np.nan
+            if not np.all(np.isnan(lam)):
+                j = np.nanargmax(lam)
+                lambdaOut, iOut = lam[j], bounded[j]
+
+        if (lambdaIn is None or lambdaIn < 0) and (lambdaOut is None or lambdaOut < 0):
+            # no more turning points: finish with the minimum variance portfolio
+            lam = 0
+        elif lambdaOut is None or (lambdaIn is not None and lambdaIn > lambdaOut):
+            lam = lambdaIn
+            free.remove(iIn)
+            weights[iIn] = biIn
+            lastChanged = iIn
+        else:
+            lam = lambdaOut
+            free.append(iOut)
+            lastChanged = iOut
+        if lambdas[-1] is not None and lam > lambdas[-1]:
+            return broken
+
+        bounded = [i for i in range(numAssets) if i not in free]
+        covarF_inv = np.linalg.inv(covMatrix[np.ix_(free, free)])
+        covarFB = covMatrix[np.ix_(free, bounded)]
+        wB = weights[bounded] if bounded else None
+        meanF = meanReturns[free] if lam != 0 else np.zeros(len(free))
+        weights[free] = _free_weights(covarF_inv, covarFB, meanF, wB, lam)
+        turningPoints.append(weights.copy())
+        lambdas.append(lam)
+        if lam == 0:
+            break
+
+    # drop points broken by numerical error, then keep returns strictly ordered
+    turningPoints = [
+        w for w in turningPoints
+        if abs(np.sum(w) - 1) <= tol and np.all(w - lower >= -tol) and np.all(w - upper <= tol)
+    ]
+    kept = []
+    for w in turningPoints:
+        while kept and kept[-1] @ meanReturns < w @ meanReturns:
+            kept.pop()
+        kept.append(w)
+    return np.array(kept)
+
+
+def _interpolate(turningPoints, meanReturns, targetReturns):
+    # weights are piecewise linear in the target return between turning points
+    pointReturns = turningPoints @ meanReturns
+    order = np.argsort(pointReturns, kind="stable")
+    return np.column_stack([
+        np.interp(targetReturns, pointReturns[order], turningPoints[order, j])
+        for j in range(turningPoints.shape[1])
+    ])
+
+
+def _warm_started_frontier(mu, sigma, targetReturns, constraintSet):
+    numAssets = len(mu)
+    ones = np.ones(numAssets)
+    bounds = tuple(constraintSet for asset in range(numAssets))
+    weights = np.zeros((len(targetReturns), numAssets))
+    success = np.zeros(len(targetReturns), dtype=bool)
+    x0 = ones / numAssets
+
+    for i in np.argsort(targetReturns):
+        target = targetReturns[i]
+        constraints = (
+            {"type": "eq", "fun": lambda x, target=target: mu @ x - target, "jac": lambda x: mu},
+            {"type": "eq", "fun": lambda x: np.sum(x) - 1, "jac": lambda x: ones},
+        )
+        result = sc.minimize(
+            lambda x: x @ sigma @ x,
+            x0,
+            jac=lambda x: 2 * sigma @ x,
+            method="SLSQP",
+            bounds=bounds,
+            constraints=constraints,
+            options={"ftol": 1e-12, "maxiter": 500},
+        )
+        weights[i] = result["x"]
+        success[i] = result["success"]
+        x0 = result["x"]
+
+    return weights, success
+
+
+def efficient_frontier(meanReturns, covMatrix, targetReturns, constraintSet=(0, 1), method="cla", tol=1e-8):
+    """
+    Minimum volatility portfolios for a grid of annualised target returns.
+
+    With method="cla" the critical line algorithm is run for the returns and for the
+    negated returns, which gives the turning points of the upper and of the lower
+    branch of the minimum variance frontier; every target is then read off by linear
+    interpolation. Targets on a branch the algorithm cannot trace (see critical_line),
+    and targets whose interpolated weights miss the return, the budget or the bounds
+    by more than tol, are solved again with SLSQP. method="slsqp" (also the fallback for a singular
+    covariance matrix) solves the targets in ascending order, warm-starting each SLSQP
+    solve from the previous weights, with analytic gradients.
+
+    Parameters:
+        meanReturns (array-like): Mean daily returns per asset.
+        covMatrix (array-like): Covariance matrix of daily returns.
+        targetReturns (array-like): Annualised target returns.
+        constraintSet (tuple): Lower and upper bound of every weight.
+        method (str): "cla" or "slsqp".
+        tol (float): Tolerance of the checks on the critical line weights.
+
+    Returns:
+        dict: "targetReturns", "volatility" (annualised standard deviation per target),
+        "weights" (targets x assets) and "success" (per target), in the order of targetReturns.
+    """
+    mu = np.asarray(meanReturns, dtype="float64") * 252
+    sigma = np.asarray(covMatrix, dtype="float64") * 252
+    targetReturns = np.asarray(targetReturns, dtype="float64")
+    lower = np.full(len(mu), float(constraintSet[0]))
+    upper = np.full(len(mu), float(constraintSet[1]))
+
+    weights = None
+    if method == "cla":
+        try:
+            upperBranch = critical_line(mu, sigma, lower, upper)
+            lowerBranch = critical_line(-mu, sigma, lower, upper)
+        except np.linalg.LinAlgError:
+            upperBranch = lowerBranch = np.empty((0, len(mu)))
+        if len(upperBranch) or len(lowerBranch):
+            # both branches end at the minimum variance portfolio; a branch the
+            # algorithm could not trace leaves its targets unsolved (NaN) here
+            minVarianceReturn = (upperBranch if len(upperBranch) else lowerBranch)[-1] @ mu
+            unsolved = np.full((len(targetReturns), len(mu)), np.nan)
+            weights = np.where(
+                (targetReturns >= minVarianceReturn)[:, None],
+                _interpolate(upperBranch, mu, targetReturns) if len(upperBranch) else unsolved,
+                _interpolate(lowerBranch, mu, targetReturns) if len(lowerBranch) else unsolved,
+            )
+            # targets the interpolated weights miss (unsolved, outside the frontier, or
+            # turning points lost to rounding) are solved again with SLSQP
+            success = (
+                (np.abs(weights @ mu - targetReturns) <= tol)
+                & (np.abs(weights.sum(axis=1) - 1) <= tol)
+                & np.all(weights >= lower - tol, axis=1)
+                & np.all(weights <= upper + tol, axis=1)
+            )
+            if not success.all():
+                missed = ~success
+                weights[missed], success[missed] = _warm_started_frontier(
+                    mu, sigma, targetReturns[missed], constraintSet
+                )
+
+    if weights is None:
+        weights, success = _warm_started_frontier(mu, sigma, targetReturns, constraintSet)
+
+    volatility = np.sqrt(np.maximum(np.einsum("ij,jk,ik->i", weights, sigma, weights), 0))
+
+    return {
+        "targetReturns": targetReturns,
+        "volatility": volatility,
+        "weights": weights,
+        "success": success,
+    }
+
+
+def frontier_task(problem):
+    """
+    efficient_frontier(*problem), a picklable entry point for worker processes.
+
+    Parameters:
+        problem (tuple): meanReturns, covMatrix and targetReturns.
+    """
+    return efficient_frontier(*problem)
@@ -1,27 +1,83 @@
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from .load_data import fetch_financial_data
-from sklearn.preprocessing import StandardScaler
-from sklearn.cluster import KMeans
+from .concurrent_fetch import fetch_concurrently, rate_limiter_for
+from .providers import get_provider
+from .piotroski import PIOTROSKI_SIGNALS, piotroski_scores
+from config import FUNDAMENTALS_MAX_WORKERS, FUNDAMENTALS_RATE_LIMIT, FUNDAMENTALS_TIMEOUT
+from config import CLUSTER_MINIBATCH_ROWS, CLUSTER_BATCH_SIZE, CLUSTER_K_RANGE, CLUSTER_MAX_WORKERS, CLUSTER_SILHOUETTE_SAMPLE
 
 
 class Fundamentals:
 
     def __init__(self, tickers: list, analysis_type: str = "Piotroski", custom_columns: str | list = "All"
-                 , n_clusters: int = 3, n_components: int = 3):
+                 , n_clusters: int | str = 3, n_components: int = 3, max_workers: int = FUNDAMENTALS_MAX_WORKERS
+                 , rate_limit: float = FUNDAMENTALS_RATE_LIMIT, timeout: float = FUNDAMENTALS_TIMEOUT
+                 , fetcher = fetch_financial_data, signals: dict = PIOTROSKI_SIGNALS, weights: dict = None
+                 , na_policy: str = "zero", clustering: str = "auto", data: pd.DataFrame = None):
         self.tickers = tickers
         self.analysis_type = analysis_type
         self.custom_columns = custom_columns
         self.n_clusters = n_clusters
         self.n_components = n_components
+        self.max_workers = max_workers
+        self.rate_limit = rate_limit
+        self.timeout = timeout
+        self.fetcher = fetcher
+        self.signals = signals
+        self.weights = weights
+        self.na_policy = na_policy
+        self.clustering = clustering
+        self.data = data
+        self.failed_tickers = {}
     
     def get_fundamentals(self) -> dict:
         """
         Get the fundamentals for the given tickers.
+
+        With max_workers > 1 the tickers are fetched concurrently, otherwise one after the
+        other. Tickers that fail, or with concurrency exceed the timeout, are left out of
+        the result and recorded in self.failed_tickers. Providers that download are
+        limited to self.rate_limit fetches started per second, shared with every other
+        session using the same provider and rate.
+        """
+        if self.max_workers <= 1:
+            fundamentals, self.failed_tickers = {}, {}
+            for ticker in dict.fromkeys(self.tickers):
+                try:
+                    fundamentals[ticker] = self.fetcher(ticker)
+                except Exception as e:
+                    self.failed_tickers[ticker] = e
+            return fundamentals
+
+        # only providers that download are throttled, each with its own budget
+        provider = get_provider()
+        rate_limiter = None
+        if self.rate_limit and provider.cache_on_disk:
+            rate_limiter = rate_limiter_for(provider.name, self.rate_limit)
+        results, self.failed_tickers = fetch_concurrently(
+            self.fetcher,
+            self.tickers,
+            max_workers=self.max_workers,
+            rate_limiter=rate_limiter,
+            timeout=self.timeout,
+        )
+        return {ticker: results[ticker] for ticker in self.tickers if ticker in results}
+
+    def fundamentals_frame(self) -> pd.DataFrame:
+        """
+        Fundamentals with one row per ticker.
+
+        Taken from self.data when it was given (e.g. load_data.fundamentals_snapshot()),
+        without downloading; tickers missing from it are recorded in self.failed_tickers.
+        Otherwise fetched with get_fundamentals.
         """
-        fundamentals = {}
-        for ticker in self.tickers:
-            fundamentals[ticker] = fetch_financial_data(ticker)
-        return fundamentals
+        if self.data is None:
+            return pd.DataFrame.from_dict(self.get_fundamentals(), orient="index")
+        self.failed_tickers = {
+            ticker: KeyError(f"{ticker} is not in the fundamentals data") for ticker in self.tickers if ticker not in self.data.index
+        }
+        return self.data.loc[[ticker for ticker in self.tickers if ticker in self.data.index]]
     
     def calculate_piotroski_score(self, financials):
         """
@@ -45,47 +101,23 @@ class Fundamentals:
             - asset_turnover_previous (float): Previous year's asset turnover ratio.
 
         Returns:
-        int: Piotroski Score (range: 0 to 9)
-        """
-        score = 0
-        profitability_score = 0
-        leverage_score = 0
-        operating_efficiency_score = 0
-        pe_ratio = 0
-
-        # Profitability signals
-        if financials['net_income'] > 0:
-            profitability_score += 1  # Positive net income
-        if financials['operating_cash_flow'] > 0:
-            profitability_score += 1  # Positive operating cash flow
-        if financials['operating_cash_flow'] > financials['net_income']:
-            profitability_score += 1  # Operating cash flow > net income
-        if financials['roa_current'] > financials['roa_previous']:
-            profitability_score += 1  # ROA improvement
-
-        # Leverage, Liquidity, and Source of Funds signals
-        if financials['leverage_current'] < financials['leverage_previous']:
-            leverage_score += 1  # Decreased leverage
-        if financials['current_ratio_current'] > financials['current_ratio_previous']:
-            leverage_score += 1  # Improved current ratio
-        if financials['shares_outstanding_current'] <= financials['shares_outstanding_previous']:
-            leverage_score += 1  # No dilution of shares
-
-        # Operating Efficiency signals
-        if financials['gross_margin_current'] > financials['gross_margin_previous']:
-            operating_efficiency_score += 1  # Improved gross margin
-        if financials['asset_turnover_current'] > financials['asset_turnover_previous']:
-            operating_efficiency_score += 1  # Improved asset turnover ratio
-        
-        pe_ratio = financials['PE Ratio']
+        dict: Component scores, "PE Ratio" and "Piotroski Score" (range: 0 to 9 with the default signals)
+        """
+        scores = self.calculate_piotroski_scores(pd.DataFrame([financials]))
+        return {} if scores.empty else scores.astype(object).iloc[0].to_dict()
 
-        return {
-            "Profitablity": profitability_score,
-            "Leverage": leverage_score,
-            "Operating Efficiency": operating_efficiency_score,
-            "PE Ratio": pe_ratio,
-            "Piotroski Score" : profitability_score + leverage_score + operating_efficiency_score
-        }
+    def calculate_piotroski_scores(self, financials: pd.DataFrame) -> pd.DataFrame:
+        """
+        Calculate the Piotroski Score of every row of a fundamentals DataFrame at once.
+
+        Parameters:
+        financials (pd.DataFrame): One row per ticker, with the keys calculate_piotroski_score uses as columns.
+
+        Returns:
+        pd.DataFrame: Component scores, "PE Ratio" and "Piotroski Score" per row, scored
+        with self.signals, self.weights and self.na_policy.
+        """
+        return piotroski_scores(financials, self.signals, self.weights, self.na_policy)
     
     def calculate_piotroski_score_util(self) -> pd.DataFrame:
         """
@@ -94,14 +126,7 @@ class Fundamentals:
         Returns:
         pd.DataFrame: DataFrame containing the Piotroski Scores for the tickers.
         """
-        fundamentals = self.get_fundamentals()
-        piotroski_scores = {}
-        for ticker, financials in fundamentals.items():
-            piotroski_scores[ticker] = self.calculate_piotroski_score(financials)
-        
-        df = pd.DataFrame(piotroski_scores).T
-        df = df[['PE Ratio', 'Profitablity', 'Leverage', 'Operating Efficiency', 'Piotroski Score']]
-        return df
+        return self.calculate_piotroski_scores(self.fundamentals_frame())
 
     def preprocess_data(self, df):
         """
@@ -116,6 +141,8 @@ class Fundamentals:
         # Drop rows with missing values
         df = df.dropna()
 
+        from sklearn.preprocessing import StandardScaler
+
         # Scale numeric features
         numeric_features = df.select_dtypes(include=["float64", "int64"]).columns
         scaler = StandardScaler()
@@ -127,6 +154,9 @@ class Fundamentals:
         """
         Apply K-Means clustering to scaled data.
 
+        Uses MiniBatchKMeans when self.clustering is "minibatch", or when it is "auto"
+        and there are at least CLUSTER_MINIBATCH_ROWS rows.
+
         Parameters:
         data_scaled (pd.DataFrame): Scaled data.
         n_clusters (int): Number of clusters.
@@ -134,27 +164,94 @@ class Fundamentals:
         Returns:
         KMeans, array: Fitted KMeans model, cluster labels.
         """
-        kmeans = KMeans(n_clusters=n_clusters, random_state=42)
+        from sklearn.cluster import KMeans, MiniBatchKMeans
+
+        if self.clustering not in ("auto", "full", "minibatch"):
+            raise ValueError(f"Unknown clustering mode: {self.clustering}")
+        minibatch = self.clustering == "minibatch" or (
+            self.clustering == "auto" and len(data_scaled) >= CLUSTER_MINIBATCH_ROWS
+        )
+        if minibatch:
+            kmeans = MiniBatchKMeans(n_clusters=n_clusters, batch_size=CLUSTER_BATCH_SIZE, n_init=3, random_state=42)
+        else:
+            kmeans = KMeans(n_clusters=n_clusters, random_state=42)
         clusters = kmeans.fit_predict(data_scaled)
         return kmeans, clusters
-    
-    def compute_k_means_cluster_metrics(self) -> dict:
+
+    def select_n_clusters(self, data_scaled, k_range=CLUSTER_K_RANGE):
         """
-        Compute cluster metrics for each cluster.
+        Choose the number of clusters with the highest silhouette score.
+
+        Every k is fitted on its own thread. The silhouette score is computed on at most
+        CLUSTER_SILHOUETTE_SAMPLE rows, so large universes stay fast.
 
         Parameters:
-        raw_data (pd.DataFrame): Raw data with financial metrics and cluster labels.
+        data_scaled (pd.DataFrame): Scaled data.
+        k_range (iterable): Cluster counts to try; those not below the number of rows are skipped.
 
         Returns:
-        pd.DataFrame: Cluster metrics.
+        int, pd.DataFrame: Chosen number of clusters, and inertia and silhouette score per k.
         """
+        from sklearn.metrics import silhouette_score
 
-        # Fetch financial data
-        financial_data = self.get_fundamentals()
+        ks = [k for k in k_range if 2 <= k < len(data_scaled)]
+        if not ks:
+            raise ValueError(f"Choosing the number of clusters needs at least 3 tickers with complete data, got {len(data_scaled)}")
 
-        # set key as ticker
+        def evaluate(k):
+            model, labels = self.apply_kmeans(data_scaled, k)
+            silhouette = silhouette_score(
+                data_scaled, labels, sample_size=min(len(data_scaled), CLUSTER_SILHOUETTE_SAMPLE), random_state=42
+            ) if len(set(labels)) > 1 else float("nan")
+            return model.inertia_, silhouette
 
-        financial_data = pd.DataFrame(financial_data).T
+        with ThreadPoolExecutor(min(len(ks), CLUSTER_MAX_WORKERS)) as executor:
+            results = list(executor.map(evaluate, ks))
+        selection = pd.DataFrame(results, index=pd.Index(ks, name="n_clusters"), columns=["inertia", "silhouette"])
+        return int(selection["silhouette"].idxmax()), selection
+
+    def cluster_statistics(self, raw_data):
+        """
+        Last price statistics of every cluster, aggregated in one groupby pass.
+
+        Parameters:
+        raw_data (pd.DataFrame): Data with "ticker", "cluster" and "Last Price" columns.
+
+        Returns:
+        pd.DataFrame: Mean, median, count, highest and lowest last price per cluster,
+        and the tickers with the highest and lowest last price.
+        """
+        raw_data = raw_data.reset_index(drop=True)
+        prices = pd.to_numeric(raw_data["Last Price"], errors="coerce").dropna()
+        cluster_metrics = prices.groupby(raw_data["cluster"][prices.index]).agg(
+            mean_last_price="mean",
+            median_last_price="median",
+            num_stocks="count",
+            highest_last_price="max",
+            lowest_last_price="min",
+            ticker_highest_last_price="idxmax",
+            ticker_lowest_last_price="idxmin",
+        )
+        # idxmax/idxmin give row positions after the reset_index above
+        tickers = raw_data["ticker"].to_numpy()
+        for column in ("ticker_highest_last_price", "ticker_lowest_last_price"):
+            cluster_metrics[column] = tickers[cluster_metrics[column].to_numpy(dtype=int)]
+        # clusters without any last price get empty rows
+        return cluster_metrics.reindex(sorted(raw_data["cluster"].unique()))
+    
+    def compute_k_means_cluster_metrics(self) -> dict:
+        """
+        Compute cluster metrics for each cluster.
+
+        With n_clusters "auto" the number of clusters is chosen by select_n_clusters.
+
+        Returns:
+        dict: "raw_data" with cluster labels, "cluster_metrics", "n_components",
+        "cluster_labels", "n_clusters" and "k_selection" (None unless n_clusters is "auto").
+        """
+
+        # Fetch financial data, one row per ticker
+        financial_data = self.fundamentals_frame().copy()
         financial_data['ticker'] = financial_data.index
 
         # store last price and ticker
@@ -172,8 +269,11 @@ class Fundamentals:
         raw_data["ticker"] = financial_data.index
 
         # Apply K-Means clustering
-        
-        kmeans_model, cluster_labels = self.apply_kmeans(scaled_data, n_clusters=self.n_clusters)
+        n_clusters, k_selection = self.n_clusters, None
+        if n_clusters == "auto":
+            n_clusters, k_selection = self.select_n_clusters(scaled_data)
+
+        kmeans_model, cluster_labels = self.apply_kmeans(scaled_data, n_clusters=n_clusters)
 
         # Add clusters to original data
         raw_data["cluster"] = cluster_labels
@@ -181,25 +281,13 @@ class Fundamentals:
         # join the last price and ticker to the raw data
         raw_data = raw_data.merge(last_price, left_on = 'ticker', right_on = 'ticker')
 
-        cluster_metrics = pd.DataFrame()
-
-        # get mean last price for each cluster, median last price for each cluster, number of stocks in each cluster, highest last price for each cluster, and lowest last price for each cluster
-        cluster_metrics['mean_last_price'] = raw_data.groupby('cluster')['Last Price'].mean()
-        cluster_metrics['median_last_price'] = raw_data.groupby('cluster')['Last Price'].median()
-        cluster_metrics['num_stocks'] = raw_data.groupby('cluster')['Last Price'].count()
-        cluster_metrics['highest_last_price'] = raw_data.groupby('cluster')['Last Price'].max()
-        cluster_metrics['lowest_last_price'] = raw_data.groupby('cluster')['Last Price'].min()
-
-        # get ticker with lowest last price for each cluster, ticker with highest last price for each cluster
-
-        cluster_metrics['ticker_highest_last_price'] = raw_data.groupby('cluster')['Last Price'].idxmax().apply(lambda x: raw_data.loc[x, 'ticker'])
-        cluster_metrics['ticker_lowest_last_price'] = raw_data.groupby('cluster')['Last Price'].idxmin().apply(lambda x: raw_data.loc[x, 'ticker'])
-
         return {
             "raw_data": raw_data,
-            "cluster_metrics": cluster_metrics,
+            "cluster_metrics": self.cluster_statistics(raw_data),
             "n_components": self.n_components,
-            "cluster_labels": cluster_labels
+            "cluster_labels": cluster_labels,
+            "n_clusters": n_clusters,
+            "k_selection": k_selection,
         }
 
     
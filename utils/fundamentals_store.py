@@ -0,0 +1,203 @@
+# persistent fundamentals
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from itertools import groupby
+from operator import itemgetter
+import numpy as np
+import pandas as pd
+from .providers import STATEMENTS
+
+# tickers per query when reading many tickers
+_QUERY_CHUNK_SIZE = 500
+
+
+def _json_value(value):
+    # NumPy scalars as their Python value, anything else JSON cannot encode as text
+    return value.item() if hasattr(value, "item") else str(value)
+
+
+def fiscal_period(info: dict, statements: dict = None):
+    """
+    Fiscal period a ticker's fundamentals belong to: the date of info["mostRecentQuarter"],
+    or without it the newest period of the statements.
+
+    Returns:
+        str | None: "YYYY-MM-DD", or None when neither is available.
+    """
+    quarter = info.get("mostRecentQuarter")
+    if quarter:
+        return pd.Timestamp(quarter, unit="s").strftime("%Y-%m-%d")
+    periods = [column for frame in (statements or {}).values() for column in frame.columns]
+    if periods:
+        return max(pd.Timestamp(period) for period in periods).strftime("%Y-%m-%d")
+    return None
+
+
+class FundamentalsStore:
+    """
+    SQLite backed store of company statements and info fields.
+
+    Statements are kept in long form, one row per (ticker, fiscal period, statement,
+    statement period, line item), and info as one JSON value per field, so every
+    fiscal period a ticker went through stays available. For each ticker the store
+    remembers its latest fiscal period, when it was last checked against the provider
+    and the last price seen then; reads return the latest fiscal period.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(sqlite3.connect(self.path)) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS filings ("
+                "ticker TEXT PRIMARY KEY, fiscal_period TEXT NOT NULL, checked_at REAL NOT NULL, last_price REAL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS statements ("
+                "ticker TEXT NOT NULL, fiscal_period TEXT NOT NULL, statement TEXT NOT NULL, "
+                "period TEXT NOT NULL, item TEXT NOT NULL, value REAL, "
+                "PRIMARY KEY (ticker, fiscal_period, statement, period, item)) WITHOUT ROWID"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS info ("
+                "ticker TEXT NOT NULL, fiscal_period TEXT NOT NULL, field TEXT NOT NULL, value TEXT, "
+                "PRIMARY KEY (ticker, fiscal_period, field)) WITHOUT ROWID"
+            )
+
+    def status(self, ticker: str):
+        """
+        Latest stored fiscal period of a ticker and when it was last checked.
+
+        Returns:
+            tuple | None: (fiscal_period, checked_at as a Unix time), or None if the ticker was never stored.
+        """
+        with closing(sqlite3.connect(self.path)) as conn:
+            return conn.execute(
+                "SELECT fiscal_period, checked_at FROM filings WHERE ticker = ?", (ticker,)
+            ).fetchone()
+
+    def checked_at(self, tickers: list) -> dict:
+        """
+        When each stored ticker was last checked, as a Unix time.
+
+        Returns:
+            dict: ticker -> checked_at, for the stored tickers only.
+        """
+        tickers = list(tickers)
+        checked = {}
+        with closing(sqlite3.connect(self.path)) as conn:
+            for i in range(0, len(tickers), _QUERY_CHUNK_SIZE):
+                chunk = tickers[i:i + _QUERY_CHUNK_SIZE]
+                checked.update(conn.execute(
+                    f"SELECT ticker, checked_at FROM filings WHERE ticker IN ({', '.join('?' for _ in chunk)})",
+                    chunk,
+                ).fetchall())
+        return checked
+
+    def write(self, ticker: str, period: str, info: dict, statements: dict = None, last_price: float = None):
+        """
+        Store info, and statements when given, as the ticker's latest fiscal period.
+
+        Without statements only the info fields, the check time and the last price are
+        updated, for a check that found the fiscal period unchanged.
+        """
+        info_rows = [(ticker, period, field, json.dumps(value, default=_json_value)) for field, value in info.items()]
+        statement_rows = []
+        for statement, frame in (statements or {}).items():
+            for period_date, column in frame.items():
+                period_date = pd.Timestamp(period_date).strftime("%Y-%m-%d")
+                statement_rows.extend(
+                    (ticker, period, statement, period_date, str(item), None if pd.isna(value) else float(value))
+                    for item, value in column.items()
+                )
+
+        with self._lock, closing(sqlite3.connect(self.path)) as conn, conn:
+            conn.execute("DELETE FROM info WHERE ticker = ? AND fiscal_period = ?", (ticker, period))
+            conn.executemany("INSERT INTO info (ticker, fiscal_period, field, value) VALUES (?, ?, ?, ?)", info_rows)
+            if statements is not None:
+                conn.execute("DELETE FROM statements WHERE ticker = ? AND fiscal_period = ?", (ticker, period))
+                conn.executemany(
+                    "INSERT INTO statements (ticker, fiscal_period, statement, period, item, value) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    statement_rows,
+                )
+            conn.execute(
+                "INSERT OR REPLACE INTO filings (ticker, fiscal_period, checked_at, last_price) VALUES (?, ?, ?, ?)",
+                (ticker, period, time.time(), last_price),
+            )
+
+    def read(self, ticker: str):
+        """
+        Statements and info of the ticker's latest fiscal period.
+
+        Returns:
+            tuple | None: (statements, info, last_price), statements shaped as the providers
+            return them; None if the ticker was never stored.
+        """
+        return self.read_many([ticker]).get(ticker)
+
+    def read_many(self, tickers: list = None) -> dict:
+        """
+        Statements and info of the latest fiscal period of many tickers, in one query per
+        table and chunk of tickers.
+
+        Parameters:
+            tickers (list): Tickers to read. None reads every stored ticker.
+
+        Returns:
+            dict: ticker -> (statements, info, last_price), for the stored tickers only.
+        """
+        join = "JOIN filings f ON t.ticker = f.ticker AND t.fiscal_period = f.fiscal_period"
+        queries = {
+            "filings": ("SELECT f.ticker, f.last_price FROM filings f", ""),
+            "statements": (
+                f"SELECT t.ticker, t.statement, t.period, t.item, t.value FROM statements t {join}",
+                " ORDER BY t.ticker, t.statement",
+            ),
+            "info": (f"SELECT t.ticker, t.field, t.value FROM info t {join}", ""),
+        }
+        tickers = None if tickers is None else list(tickers)
+        chunks = [None] if tickers is None else [
+            list(tickers[i:i + _QUERY_CHUNK_SIZE]) for i in range(0, len(tickers), _QUERY_CHUNK_SIZE)
+        ]
+        rows = {name: [] for name in queries}
+        with closing(sqlite3.connect(self.path)) as conn:
+            for chunk in chunks:
+                where, parameters = "", ()
+                if chunk is not None:
+                    where, parameters = f" WHERE f.ticker IN ({', '.join('?' for _ in chunk)})", tuple(chunk)
+                for name, (query, order) in queries.items():
+                    rows[name].extend(conn.execute(query + where + order, parameters).fetchall())
+
+        infos = {}
+        for ticker, field, value in rows["info"]:
+            infos.setdefault(ticker, {})[field] = json.loads(value)
+        statements = {ticker: {statement: pd.DataFrame() for statement in STATEMENTS} for ticker, _ in rows["filings"]}
+        # fill each statement's array directly, a pivot per statement costs more than the query
+        for (ticker, statement), lines in groupby(rows["statements"], key=itemgetter(0, 1)):
+            lines = list(lines)
+            periods = sorted({line[2] for line in lines}, reverse=True)
+            items = list(dict.fromkeys(line[3] for line in lines))
+            column = {period: j for j, period in enumerate(periods)}
+            row = {item: i for i, item in enumerate(items)}
+            values = np.full((len(items), len(periods)), np.nan)
+            for _, _, period, item, value in lines:
+                if value is not None:
+                    values[row[item], column[period]] = value
+            statements[ticker][statement] = pd.DataFrame(values, index=items, columns=pd.DatetimeIndex(periods))
+        return {
+            ticker: (statements[ticker], infos.get(ticker, {}), last_price)
+            for ticker, last_price in rows["filings"]
+        }
+
+    def tickers(self) -> list:
+        with closing(sqlite3.connect(self.path)) as conn:
+            return [row[0] for row in conn.execute("SELECT ticker FROM filings ORDER BY ticker")]
@@ -1,15 +1,60 @@
 # cache data
 
-from functools import cache
-import yfinance as yf
 import time
+import numpy as np
 import pandas as pd
+from config import (
+    PRICE_STORE_PATH,
+    FUNDAMENTALS_STORE_PATH,
+    FUNDAMENTALS_CHECK_INTERVAL,
+    PRICE_CACHE_MAX_BYTES,
+    FUNDAMENTALS_CACHE_MAX_BYTES,
+    HISTORY_TTL,
+    QUOTE_TTL,
+    FUNDAMENTALS_TTL,
+)
+from .price_store import PriceStore
+from .fundamentals_store import FundamentalsStore, fiscal_period
+from .cache import TTLCache, cached
+from .providers import get_provider
+
+price_store = PriceStore(PRICE_STORE_PATH)
+fundamentals_store = FundamentalsStore(FUNDAMENTALS_STORE_PATH)
+
+price_cache = TTLCache(PRICE_CACHE_MAX_BYTES, default_ttl=HISTORY_TTL)
+fundamentals_cache = TTLCache(FUNDAMENTALS_CACHE_MAX_BYTES, default_ttl=FUNDAMENTALS_TTL)
+
+def _history_ttl(provider_key, tickers, start, end) -> float:
+    # ranges reaching today still change during the session
+    if pd.Timestamp(end).normalize() >= pd.Timestamp.today().normalize():
+        return QUOTE_TTL
+    return HISTORY_TTL
+
+def cache_stats() -> dict:
+    """
+    Hit, miss and eviction counters of the in-memory data caches.
+    """
+    return {"prices": price_cache.stats(), "fundamentals": fundamentals_cache.stats()}
+
+# tickers per batched download request
+DOWNLOAD_CHUNK_SIZE = 50
+
+def _to_download_frame(ticker: str, data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Shape stored bars like yf.download does: columns indexed by (Price, Ticker).
+    """
+    data = data.copy()
+    data.columns = pd.MultiIndex.from_product([data.columns, [ticker]], names=["Price", "Ticker"])
+    return data
 
-@cache
 def load_stock_data(ticker: str, start: str, end: str) -> pd.DataFrame:
     """
     Load stock data for a given ticker.
 
+    History is read through the active market data provider. For providers that
+    download (yfinance) it is served from the local price store, and only the part of
+    the range that has not been downloaded before is fetched.
+
     Parameters:
         ticker (str): The stock ticker symbol (e.g., "AAPL" for Apple).
         start (str): The start date in "YYYY-MM-DD" format.
@@ -18,12 +63,23 @@ def load_stock_data(ticker: str, start: str, end: str) -> pd.DataFrame:
     Returns:
         pd.DataFrame: A DataFrame containing the stock data.
     """
-    return yf.download(ticker, start, end)
+    return _load_stock_data(get_provider().cache_key, ticker, start, end).copy()
+
+@cached(price_cache, ttl=_history_ttl)
+def _load_stock_data(provider_key: str, ticker: str, start, end) -> pd.DataFrame:
+    provider = get_provider()
+    if not provider.cache_on_disk:
+        data = provider.history([ticker], start, end).get(ticker, pd.DataFrame())
+        return _to_download_frame(ticker, data)
+
+    for missing_start, missing_end in price_store.missing_ranges(ticker, start, end):
+        data = provider.history([ticker], missing_start, missing_end).get(ticker)
+        price_store.write(ticker, data, missing_start, missing_end)
+    return _to_download_frame(ticker, price_store.read(ticker, start, end))
 
-@cache
 def fetch_financial_data(ticker):
     """
-    Fetch financial data for a given ticker using yfinance.
+    Fetch financial data for a given ticker from the active market data provider.
 
     Parameters:
     ticker (str): The stock ticker symbol (e.g., "AAPL" for Apple).
@@ -31,13 +87,90 @@ def fetch_financial_data(ticker):
     Returns:
     dict: A dictionary containing the financial metrics required for Piotroski Score.
     """
+    return _fetch_financial_data(get_provider().cache_key, ticker)
+
+@cached(fundamentals_cache)
+def _fetch_financial_data(provider_key, ticker):
     # Fetch the company data
-    stock = yf.Ticker(ticker)
+    provider = get_provider()
+    if provider.cache_on_disk:
+        statements, info, last_price = _stored_fundamentals(provider, ticker)
+    else:
+        statements = provider.statements(ticker)
+        info = provider.info(ticker)
+        last_price = round(provider.last_price(ticker), 2)
+    return financial_metrics(statements, info, last_price)
 
-    last_price = round(stock.history(period='1d')['Close'].iloc[0], 2)
-    
+def _stored_fundamentals(provider, ticker: str):
+    """
+    Statements, info and last price of a ticker, served from the fundamentals store.
+
+    Within FUNDAMENTALS_CHECK_INTERVAL of the last check nothing is downloaded, the last
+    price included. After it the last price and info are downloaded, and the statements
+    only when its mostRecentQuarter has advanced past the stored fiscal period.
+    """
+    stored = fundamentals_store.status(ticker)
+    if stored is not None and time.time() - stored[1] < FUNDAMENTALS_CHECK_INTERVAL:
+        statements, info, last_price = fundamentals_store.read(ticker)
+        if last_price is not None:
+            return statements, info, last_price
+
+    last_price = round(provider.last_price(ticker), 2)
+    info = provider.info(ticker)
+    period = fiscal_period(info)
+    if stored is not None and period is not None and period == stored[0]:
+        fundamentals_store.write(ticker, period, info, last_price=last_price)
+        statements, _, _ = fundamentals_store.read(ticker)
+        return statements, info, last_price
+
+    statements = provider.statements(ticker)
+    period = period or fiscal_period(info, statements)
+    if period is not None:
+        fundamentals_store.write(ticker, period, info, statements, last_price)
+    return statements, info, last_price
+
+def fundamentals_due(tickers: list) -> list:
+    """
+    Tickers whose fundamentals are not stored yet or are due for a check, in the given order.
+    """
+    checked = fundamentals_store.checked_at(tickers)
+    now = time.time()
+    return [ticker for ticker in tickers if now - checked.get(ticker, -np.inf) >= FUNDAMENTALS_CHECK_INTERVAL]
+
+def fundamentals_snapshot(tickers: list = None) -> pd.DataFrame:
+    """
+    Financial metrics of many tickers from the fundamentals store, without downloading.
+
+    Parameters:
+    tickers (list): Tickers to include. None includes every stored ticker.
+
+    Returns:
+    pd.DataFrame: One row per ticker with the fields of fetch_financial_data, "Last Price"
+    as of the ticker's last check. Tickers that are not stored or whose statements lack
+    the needed periods are left out and listed in df.attrs["failed_tickers"].
+    """
+    stored = fundamentals_store.read_many(tickers)
+    metrics, failed = {}, []
+    for ticker in (stored if tickers is None else tickers):
+        if ticker not in stored:
+            failed.append(ticker)
+            continue
+        statements, info, last_price = stored[ticker]
+        try:
+            metrics[ticker] = financial_metrics(statements, info, last_price)
+        except (IndexError, KeyError, ZeroDivisionError, TypeError):
+            failed.append(ticker)
+    df = pd.DataFrame.from_dict(metrics, orient="index")
+    df.attrs["failed_tickers"] = failed
+    return df
+
+def financial_metrics(statements: dict, info: dict, last_price: float) -> dict:
+    """
+    Financial metrics required for the Piotroski Score and clustering, from a company's
+    statements and info as the providers return them.
+    """
     # Income statement
-    income_stmt = stock.financials
+    income_stmt = statements["financials"]
     # print(income_stmt.T.columns)
     net_income = income_stmt.loc["Net Income"].iloc[0] if "Net Income" in income_stmt.index else 0
     net_income_prev = income_stmt.loc["Net Income"].iloc[1]  if "Net Income" in income_stmt.index else 0
@@ -47,13 +180,13 @@ def fetch_financial_data(ticker):
     total_revenue_prev = income_stmt.loc["Total Revenue"].iloc[1] if "Total Revenue" in income_stmt.index else 0
     
     # Cash flow statement
-    cashflow = stock.cashflow
+    cashflow = statements["cashflow"]
     # print(cashflow.T.columns)
     operating_cash_flow = cashflow.loc["Cash Flow From Continuing Operating Activities"].iloc[0] if "Cash Flow From Continuing Operating Activities" in cashflow.index else 0
     operating_cash_flow_prev = cashflow.loc["Cash Flow From Continuing Operating Activities"].iloc[1] if "Cash Flow From Continuing Operating Activities" in cashflow.index else 0
     
     # Balance sheet
-    balance_sheet = stock.balance_sheet
+    balance_sheet = statements["balance_sheet"]
     # print(balance_sheet.T.columns)
     total_assets = balance_sheet.loc["Total Assets"].iloc[0] if "Total Assets" in balance_sheet.index else 0
     total_assets_prev = balance_sheet.loc["Total Assets"].iloc[1]  if "Total Assets" in balance_sheet.index else 0
@@ -63,12 +196,10 @@ def fetch_financial_data(ticker):
     current_liabilities = balance_sheet.loc["Current Liabilities"].iloc[0] if "Current Liabilities" in balance_sheet.index else 0
     current_assets_prev = balance_sheet.loc["Current Assets"].iloc[1] if "Current Assets" in balance_sheet.index else 0
     current_liabilities_prev = balance_sheet.loc["Current Liabilities"].iloc[1] if "Current Liabilities" in balance_sheet.index else 0
-    shares_outstanding = stock.info['sharesOutstanding'] if 'sharesOutstanding' in stock.info.keys() else 0
+    shares_outstanding = info['sharesOutstanding'] if 'sharesOutstanding' in info.keys() else 0
 
     # Fetch Important ratios
 
-    info = stock.info
-
     pb_ratio = info['priceToBook'] if 'priceToBook' in info.keys() else 0
     pe_ratio = info['trailingPE'] if 'trailingPE' in info.keys() else 0
     ps_ratio = info['priceToSalesTrailing12Months'] if 'priceToSalesTrailing12Months' in info.keys() else 0
@@ -125,29 +256,74 @@ def fetch_financial_data(ticker):
     }
     return financials
 
+def _close_panel(histories: dict, tickers: tuple) -> pd.DataFrame:
+    """
+    Closing prices of several tickers, filled into one preallocated panel.
+    """
+    dates = pd.DatetimeIndex([], name="Date")
+    for history in histories.values():
+        dates = dates.union(history.index)
+    values = np.full((len(dates), len(tickers)), np.nan)
+    for j, ticker in enumerate(tickers):
+        if ticker in histories:
+            values[dates.get_indexer(histories[ticker].index), j] = histories[ticker]["Close"].to_numpy()
+    return pd.DataFrame(values, index=dates, columns=list(tickers))
+
+@cached(price_cache, ttl=_history_ttl)
+def _load_close_panel(provider_key: str, tickers: tuple, start, end) -> pd.DataFrame:
+    provider = get_provider()
+    if not provider.cache_on_disk:
+        df = _close_panel(provider.history(tickers, start, end), tickers)
+        return _drop_failed(df, tickers)
+
+    # group tickers by the range they are missing, so every group is one batched download
+    download_failed = set()
+    pending = {}
+    for ticker in tickers:
+        for missing_range in price_store.missing_ranges(ticker, start, end):
+            pending.setdefault(missing_range, []).append(ticker)
+
+    for (missing_start, missing_end), group in pending.items():
+        for i in range(0, len(group), DOWNLOAD_CHUNK_SIZE):
+            chunk = group[i:i + DOWNLOAD_CHUNK_SIZE]
+            try:
+                histories = provider.history(chunk, missing_start, missing_end)
+            except Exception:
+                # the stored bars of these tickers do not cover the range: report them as failed
+                download_failed.update(chunk)
+                continue
+            for ticker in chunk:
+                price_store.write(ticker, histories.get(ticker), missing_start, missing_end)
+
+    df = price_store.read_field(list(tickers), start, end, "Close")
+    return _drop_failed(df, tickers, download_failed)
+
+def _drop_failed(df: pd.DataFrame, tickers: tuple, download_failed=()) -> pd.DataFrame:
+    # remove columns with missing data, and those of tickers whose download failed
+    failed = [
+        ticker for ticker in tickers
+        if ticker in download_failed or df.empty or df[ticker].isna().any()
+    ]
+    df = df.drop(columns=failed)
+    df.attrs["failed_tickers"] = failed
+    return df
+
 def load_stocks_data(tickers: list, start: str, end: str) -> pd.DataFrame:
     """
     Load stock data for a list of tickers.
 
+    Tickers missing from the local price store are downloaded together, in chunks of
+    DOWNLOAD_CHUNK_SIZE, and the closing prices are read back as one panel.
+
     Parameters:
         tickers (list): A list of stock ticker symbols.
         start (str): The start date in "YYYY-MM-DD" format.
         end (str): The end date in "YYYY-MM-DD" format.
     
     Returns:
-        pd.DataFrame: A DataFrame containing the closing prices of the stocks.
+        pd.DataFrame: A DataFrame containing the closing prices of the stocks. Tickers
+        with missing data or a failed download are dropped and listed in
+        df.attrs["failed_tickers"].
     """
-
-    df = pd.DataFrame()
-    for ticker in tickers:
-        try:
-            temp_df = (load_stock_data(ticker, start, end)["Close"])
-        except:
-            temp_df = pd.DataFrame()
-        df = pd.concat([df, temp_df], axis=1)
-    
-    # remove columns with missing data
-    df.dropna(axis=1, inplace=True)
-    
-    return df
-
+    tickers = tuple(dict.fromkeys(tickers))
+    return _load_close_panel(get_provider().cache_key, tickers, start, end).copy()
@@ -1,140 +1,84 @@
 from .portfolio_optimizer import PortfolioOptimizer
+from .performance import performance_metrics
+from .rolling import rolling_metrics
+from config import ROLLING_WINDOWS
 import numpy as np
 import pandas as pd
-import statsmodels.api as sm
-from scipy.stats import skew, kurtosis
 import streamlit as st
 import plotly.express as px
 
 
 class MetricsCalculator(PortfolioOptimizer):
     def __init__(
-        self, stocks, start, end, optimization_criterion, riskFreeRate=0.07024
+        self, stocks, start, end, optimization_criterion, riskFreeRate=0.07024, context=None
     ):
-        super().__init__(stocks, start, end, optimization_criterion, riskFreeRate)
+        super().__init__(stocks, start, end, optimization_criterion, riskFreeRate, context)
         self.portfolioDaily = self.portfolioReturnsDaily()
-        self.annual_return = self.MMeanReturn("annual") / 100
+        self.statistics = self.performanceMetrics().iloc[0]
+        self.annual_return = self.statistics["annualReturn"]
+
+    def performanceMetrics(self):
+        if self.context.performance is not None:
+            return self.context.performance
+        # portfolio and benchmark returns on the dates both have in common
+        engine = self.objectiveEngine
+        portfolio = engine.activeReturns @ np.asarray(self.optimized_allocation, dtype="float64")
+        self.context.update(
+            performance=performance_metrics(portfolio, engine.benchmark, self.riskFreeRate, index=["Portfolio"])
+        )
+        return self.context.performance
 
     def MMeanReturn(self, frequency):
         if frequency == "monthly":
-            return self.portfolioDaily.mean() * 21 * 100
+            return self.statistics["meanDaily"] * 21 * 100
         if frequency == "annual":
-            return self.portfolioDaily.mean() * 252 * 100
+            return self.statistics["annualReturn"] * 100
 
     def MStandardDeviation(self, frequency):
         if frequency == "monthly":
-            return self.portfolioDaily.std(ddof=1) * np.sqrt(21) * 100
+            return self.statistics["stdDaily"] * np.sqrt(21) * 100
         if frequency == "annual":
-            return self.portfolioDaily.std(ddof=1) * np.sqrt(252) * 100
+            return self.statistics["annualStd"] * 100
 
     def MDownsideDeviation(self):
-        downsideChanges = self.portfolioDaily[self.portfolioDaily < 0]
-        return downsideChanges.std(ddof=1) * np.sqrt(252) * 100
+        return self.statistics["downsideDeviation"] * 100
 
     def MMaxDrawdown(self):
-        returns = np.array(self.portfolioDaily)
-        cumulative_returns = np.cumprod(1 + returns) - 1
-        running_max = np.maximum.accumulate(cumulative_returns)
-        drawdown = cumulative_returns - running_max
-        print(drawdown)
-        max_drawdown = np.min(drawdown) * 100
-
-        ## Fix this calculation
-
-        return max_drawdown
+        return self.statistics["maxDrawdown"] * 100
 
     def MBeta(self):
-        portfolio = np.array(self.portfolioDaily).flatten()
-        benchmark = np.array(self.benchmark).flatten()
-        portfolio_dates = pd.date_range(
-            start=self.start, periods=len(portfolio), freq="D"
-        )
-        benchmark_dates = pd.date_range(
-            start=self.start, periods=len(benchmark), freq="D"
-        )
-
-        portfolio_series = pd.Series(portfolio, index=portfolio_dates)
-        benchmark_series = pd.Series(benchmark, index=benchmark_dates)
-
-        common_dates = portfolio_series.index.intersection(benchmark_series.index)
-
-        aligned_portfolio = portfolio_series[common_dates]
-        aligned_benchmark = benchmark_series[common_dates]
-
-        portfolio = aligned_portfolio.tolist()
-        benchmark = aligned_benchmark.tolist()
-
-        returns_data = pd.DataFrame(
-            {"Portfolio": portfolio, "Benchmark": benchmark}
-        ).dropna()
-        X = sm.add_constant(returns_data["Benchmark"])
-        model = sm.OLS(returns_data["Portfolio"], X).fit()
-        beta = model.params["Benchmark"]
-
-        return beta
+        return self.statistics["beta"]
 
     def MAlpha(self):
-        market_return = self.benchmark.mean() * 252
-        alpha = (self.annual_return) - (
-            self.riskFreeRate + self.MBeta() * (market_return - self.riskFreeRate)
-        )
-        return alpha * 100
+        return self.statistics["alpha"] * 100
 
     def MSharpeRatio(self):
-        annual_std = self.MStandardDeviation("annual") / 100
-        sharpe = (self.annual_return - self.riskFreeRate) / annual_std
-
-        ## fix sharpe ratio
-        return sharpe
+        return self.statistics["sharpe"]
 
     def MSortinoRatio(self):
-        downside_std = self.MDownsideDeviation() / 100
-        sortino = (self.annual_return - self.riskFreeRate) / downside_std
-        return sortino
+        return self.statistics["sortino"]
 
     def MTrackingError(self):
-        portfolioDailyReturns = np.array(self.portfolioReturnsDaily())
-        benchmarkReturns = np.array(self.benchmark)
-
-        print(portfolioDailyReturns.shape, benchmarkReturns.shape)
-        difference_array = portfolioDailyReturns - benchmarkReturns
-        trackingError = difference_array.std(ddof=1) * np.sqrt(252)
-
-        return trackingError
+        return self.statistics["trackingError"]
 
     def MInformationRatio(self):
-        trackingError = self.MTrackingError()
-        portfolioDailyReturns = np.array(self.portfolioReturnsDaily())
-        benchmarkReturns = np.array(self.benchmark)
-
-        mean_portfolio = portfolioDailyReturns.mean() * 252
-        mean_benchmark = benchmarkReturns.mean() * 252
-
-        information_ratio = (mean_portfolio - mean_benchmark) / trackingError
-
-        return information_ratio
+        return self.statistics["informationRatio"]
 
     def MTreynorRatio(self):
-        treynor = (self.annual_return - self.riskFreeRate) / self.MBeta()
-        return treynor
+        return self.statistics["treynor"]
 
     def MCalmarRatio(self):
-        calmar = (self.annual_return - self.riskFreeRate) / (-self.MMaxDrawdown() / 100)
-        return calmar
+        return self.statistics["calmar"]
 
     def MSkewness(self):
-        skewness = skew(self.portfolioDaily)[0]
-        return skewness
+        return self.statistics["skewness"]
 
     def MKurtosis(self):
-        kurtos = kurtosis(self.portfolioDaily)[0]
-        return 3 - kurtos
+        return 3 - self.statistics["kurtosis"]
 
     def MPositivePeriods(self):
-        positive = self.portfolioDaily[self.portfolioDaily > 0]
-        total = len(self.portfolioDaily)
-
-        positive_periods = len(positive)
+        positive_periods = int(self.statistics["positivePeriods"])
+        total = int(self.statistics["periods"])
         ratio = round((positive_periods / (total)) * 100, 2)
 
         return f"{positive_periods} out of {total} ({ratio}%)"
@@ -196,6 +140,46 @@ class MetricsCalculator(PortfolioOptimizer):
         st.markdown(f'**SP500 Returns**: {round(cumulative_returns_b.values[-1], 2)}% ')
         st.plotly_chart(fig)
 
+    def rollingMetrics(self, windows=ROLLING_WINDOWS):
+        key = tuple(windows)
+        if key not in self.context.rolling_results:
+            engine = self.objectiveEngine
+            portfolio = engine.activeReturns @ np.asarray(self.optimized_allocation, dtype="float64")
+            self.context.add("rolling_results", key, rolling_metrics(
+                portfolio, engine.benchmark, windows, self.riskFreeRate, index=engine.activeDates
+            ))
+        return self.context.rolling_results[key]
+
+    def rollingMetricsGraph(self, metric, windows=ROLLING_WINDOWS):
+        labels = {
+            "volatility": "Volatility (%)",
+            "sharpe": "Sharpe Ratio",
+            "sortino": "Sortino Ratio",
+            "beta": "Beta",
+            "drawdown": "Drawdown (%)",
+        }
+        rolling = self.rollingMetrics(windows)[metric]
+        if metric in ("volatility", "drawdown"):
+            rolling = rolling * 100
+        rolling.columns = [f"{window} days" for window in rolling.columns]
+        rolling = rolling.dropna(how="all")
+
+        fig = px.line(
+            rolling,
+            x=rolling.index,
+            y=rolling.columns,
+            labels={"value": labels[metric], "variable": "Window", "x": "Date"},
+        )
+        if metric in ("volatility", "drawdown"):
+            fig.update_yaxes(tickformat=".0f", ticksuffix="%")
+        fig.update_layout(
+            legend_title_text="",
+            legend=dict(
+                orientation="h", yanchor="bottom", y=-0.3, xanchor="center", x=0.5
+            ),
+        )
+        st.plotly_chart(fig)
+
     def metricDf(self):
         metric_df = {
                     "Mean Return (Monthly)": f'{round(self.MMeanReturn("monthly"), 2)}%',
@@ -0,0 +1,195 @@
+import numpy as np
+import pandas as pd
+from .value_at_risk import parametric_var
+from config import BATCH_MAX_ELEMENTS
+
+BATCH_METRICS = ["return", "volatility", "sharpe", "sortino", "trackingError", "informationRatio", "cvar"]
+
+
+class ObjectiveEngine:
+    """
+    Path-dependent optimizer objectives evaluated against one precomputed returns matrix.
+
+    The daily asset returns are held as a single C-contiguous float64 array
+    (days x assets) and the benchmark as a vector on the dates both have in common,
+    so an objective evaluation is one matrix-vector product plus a few reductions.
+
+    Parameters:
+        returns (pd.DataFrame): Daily returns per asset; rows with missing values are dropped.
+        benchmark (pd.Series): Daily benchmark returns, matched to the asset returns by date.
+        riskFreeRate (float): Annual risk free rate.
+        confidence (float): Confidence level of the CVaR objective. Its tail starts at the
+            parametric VaR of the Risk Analysis tab (value_at_risk.parametric_var).
+    """
+
+    def __init__(self, returns, benchmark=None, riskFreeRate=0.07024, confidence=0.95):
+        returns = returns.dropna()
+        self.assets = returns.columns
+        self.dates = returns.index
+        self.returns = np.ascontiguousarray(returns.to_numpy(dtype="float64"))
+        self.assetMeans = self.returns.mean(axis=0)
+        self.covariance = np.cov(self.returns, rowvar=False)
+        self.riskFreeRate = riskFreeRate
+        self.confidence = confidence
+
+        self.benchmark = None
+        self.activeDates = None
+        if benchmark is not None:
+            common = self.dates.intersection(benchmark.index)
+            if len(common) == 0:
+                raise ValueError("Benchmark and portfolio returns have no dates in common!")
+            self.activeDates = common
+            if len(common) == len(self.dates):
+                self.activeReturns = self.returns
+            else:
+                self.activeReturns = np.ascontiguousarray(self.returns[self.dates.get_indexer(common)])
+            self.benchmark = np.ascontiguousarray(benchmark.loc[common].to_numpy(dtype="float64"))
+            self.activeMeans = self.activeReturns.mean(axis=0)
+
+        # SLSQP asks for the objective and its gradient at the same weights
+        self._last = (None, None, None)
+
+    def _product(self, matrix, weights):
+        lastMatrix, lastWeights, lastProduct = self._last
+        if lastMatrix is matrix and lastWeights is not None and np.array_equal(lastWeights, weights):
+            return lastProduct
+        product = matrix @ weights
+        self._last = (matrix, np.array(weights, dtype="float64"), product)
+        return product
+
+    def portfolioReturns(self, weights):
+        """
+        Daily portfolio returns for weights of shape (assets,) or (assets, k).
+        """
+        return self.returns @ np.asarray(weights, dtype="float64")
+
+    def evaluate(self, weights, paths=True, chunkSize=None) -> pd.DataFrame:
+        """
+        Metrics of many portfolios at once.
+
+        Parameters:
+            weights (array-like): Weight matrix, one portfolio per row (portfolios x assets).
+            paths (bool): Also compute the metrics that need the daily return paths (Sortino,
+                tracking error, information ratio, CVaR). Return, volatility and Sharpe only
+                need the mean vector and covariance matrix.
+            chunkSize (int): Portfolios per chunk. By default chunks hold at most
+                config.BATCH_MAX_ELEMENTS daily returns.
+
+        Returns:
+            pd.DataFrame: One row per portfolio with the BATCH_METRICS columns, annualised
+            like the single portfolio objectives; cvar is the expected daily loss beyond the
+            VaR, as a positive number.
+        """
+        weights = np.atleast_2d(np.asarray(weights, dtype="float64"))
+        numPortfolios = len(weights)
+        columns = BATCH_METRICS if paths else BATCH_METRICS[:3]
+        if chunkSize is None:
+            chunkSize = max(1, BATCH_MAX_ELEMENTS // max(len(self.returns) if paths else 0, weights.shape[1]))
+        results = {name: np.full(numPortfolios, np.nan) for name in columns}
+
+        for first in range(0, numPortfolios, chunkSize):
+            chunk = slice(first, min(first + chunkSize, numPortfolios))
+            w = weights[chunk]
+            annualReturn = w @ self.assetMeans * 252
+            volatility = np.sqrt(np.einsum("ij,ij->i", w @ self.covariance, w) * 252)
+            results["return"][chunk] = annualReturn
+            results["volatility"][chunk] = volatility
+            results["sharpe"][chunk] = (annualReturn - self.riskFreeRate) / volatility
+            if not paths:
+                continue
+
+            portfolioDailyReturns = self.returns @ w.T
+            with np.errstate(divide="ignore", invalid="ignore"):
+                downside = portfolioDailyReturns < 0
+                downsideCount = downside.sum(axis=0)
+                downsideMean = np.where(downside, portfolioDailyReturns, 0).sum(axis=0) / downsideCount
+                downsideVariance = (
+                    np.where(downside, (portfolioDailyReturns - downsideMean) ** 2, 0).sum(axis=0)
+                    / (downsideCount - 1)
+                )
+                results["sortino"][chunk] = (annualReturn - self.riskFreeRate) / (np.sqrt(downsideVariance) * np.sqrt(252))
+
+                var = parametric_var(
+                    portfolioDailyReturns.mean(axis=0), portfolioDailyReturns.std(axis=0, ddof=1), self.confidence
+                )
+                tail = portfolioDailyReturns < -var
+                results["cvar"][chunk] = -np.where(tail, portfolioDailyReturns, 0).sum(axis=0) / tail.sum(axis=0)
+
+                if self.benchmark is not None:
+                    if self.activeReturns is not self.returns:
+                        portfolioDailyReturns = self.activeReturns @ w.T
+                    difference_array = portfolioDailyReturns - self.benchmark[:, None]
+                    trackingError = difference_array.std(axis=0, ddof=1) * np.sqrt(252)
+                    results["trackingError"][chunk] = trackingError
+                    results["informationRatio"][chunk] = difference_array.mean(axis=0) * 252 / trackingError
+
+        return pd.DataFrame(results, columns=columns)
+
+    def sortino(self, weights):
+        portfolioDailyReturns = self._product(self.returns, weights)
+        downsideChanges = portfolioDailyReturns[portfolioDailyReturns < 0]
+        downside_deviation = downsideChanges.std(ddof=1) * np.sqrt(252)
+        meanReturns = portfolioDailyReturns.mean() * 252
+        return -(meanReturns - self.riskFreeRate) / downside_deviation
+
+    def sortinoGradient(self, weights):
+        # the set of down days is held fixed, which makes this a subgradient at the kinks
+        portfolioDailyReturns = self._product(self.returns, weights)
+        downside = portfolioDailyReturns < 0
+        downsideChanges = portfolioDailyReturns[downside]
+        downsideStd = downsideChanges.std(ddof=1)
+        downside_deviation = downsideStd * np.sqrt(252)
+        meanReturns = portfolioDailyReturns.mean() * 252
+
+        deviationGradient = (
+            self.returns[downside].T @ (downsideChanges - downsideChanges.mean())
+            / ((len(downsideChanges) - 1) * downsideStd) * np.sqrt(252)
+        )
+        return -(
+            self.assetMeans * 252 * downside_deviation - (meanReturns - self.riskFreeRate) * deviationGradient
+        ) / downside_deviation**2
+
+    def _active(self, weights):
+        if self.benchmark is None:
+            raise ValueError("A benchmark is required for tracking error and information ratio!")
+        difference_array = self._product(self.activeReturns, weights) - self.benchmark
+        trackingError = difference_array.std(ddof=1) * np.sqrt(252)
+        return difference_array, trackingError
+
+    def trackingError(self, weights):
+        return self._active(weights)[1]
+
+    def trackingErrorGradient(self, weights):
+        difference_array, trackingError = self._active(weights)
+        return (
+            self.activeReturns.T @ (difference_array - difference_array.mean())
+            / (len(difference_array) - 1) * 252 / trackingError
+        )
+
+    def informationRatio(self, weights):
+        difference_array, trackingError = self._active(weights)
+        return -difference_array.mean() * 252 / trackingError
+
+    def informationRatioGradient(self, weights):
+        difference_array, trackingError = self._active(weights)
+        activePerformance = difference_array.mean() * 252
+        trackingErrorGradient = self.trackingErrorGradient(weights)
+        return -(
+            self.activeMeans * 252 * trackingError - activePerformance * trackingErrorGradient
+        ) / trackingError**2
+
+    def _tail(self, weights):
+        portfolioDailyReturns = self._product(self.returns, weights)
+        var = parametric_var(portfolioDailyReturns.mean(), portfolioDailyReturns.std(ddof=1), self.confidence)
+        return portfolioDailyReturns, portfolioDailyReturns < -var
+
+    def conditionalVar(self, weights):
+        portfolioDailyReturns, tail = self._tail(weights)
+        return -np.mean(portfolioDailyReturns[tail])
+
+    def conditionalVarGradient(self, weights):
+        # the tail days are held fixed: the gradient of the tail mean is the mean of the tail rows
+        portfolioDailyReturns, tail = self._tail(weights)
+        if not tail.any():
+            return np.zeros(self.returns.shape[1])
+        return -self.returns[tail].mean(axis=0)
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+
+METRICS = [
+    "periods",
+    "meanDaily",
+    "stdDaily",
+    "annualReturn",
+    "annualStd",
+    "downsideDeviation",
+    "maxDrawdown",
+    "beta",
+    "alpha",
+    "sharpe",
+    "sortino",
+    "treynor",
+    "calmar",
+    "trackingError",
+    "informationRatio",
+    "skewness",
+    "kurtosis",
+    "positivePeriods",
+]
+
+
+def performance_metrics(portfolio, benchmark, riskFreeRate=0.07024, index=None) -> pd.DataFrame:
+    """
+    Every portfolio statistic of the Metrics tab in one vectorized pass.
+
+    Parameters:
+        portfolio (array-like): Daily portfolio returns, shape (days,) or (days, portfolios).
+        benchmark (array-like): Daily benchmark returns on the same days, shape (days,).
+        riskFreeRate (float): Annual risk free rate.
+        index (list): Row labels, one per portfolio.
+
+    Returns:
+        pd.DataFrame: One row per portfolio with the METRICS columns. Returns, deviations
+        and the drawdown are annualised fractions; beta is cov(p, b) / var(b), the slope of
+        the OLS fit of portfolio on benchmark returns; skewness and kurtosis are the biased
+        (population) estimates, kurtosis as excess kurtosis.
+    """
+    p = np.asarray(portfolio, dtype="float64")
+    p = p.reshape(len(p), -1)
+    b = np.asarray(benchmark, dtype="float64").ravel()
+    if len(b) != len(p):
+        raise ValueError("Portfolio and benchmark returns must cover the same days!")
+    periods = len(p)
+
+    meanDaily = p.mean(axis=0)
+    deviations = p - meanDaily
+    squared = deviations**2
+    m2 = squared.mean(axis=0)
+    m3 = (squared * deviations).mean(axis=0)
+    m4 = (squared * squared).mean(axis=0)
+    stdDaily = np.sqrt(m2 * periods / (periods - 1))
+
+    downside = p < 0
+    downsideCount = downside.sum(axis=0)
+    downsideMean = np.where(downside, p, 0).sum(axis=0) / downsideCount
+    downsideStd = np.sqrt(
+        np.where(downside, (p - downsideMean) ** 2, 0).sum(axis=0) / (downsideCount - 1)
+    )
+
+    # drawdown of the cumulative return, measured in return points from its running peak
+    cumulative = np.cumprod(1 + p, axis=0) - 1
+    maxDrawdown = np.min(cumulative - np.maximum.accumulate(cumulative, axis=0), axis=0)
+
+    benchmarkMean = b.mean()
+    benchmarkDeviations = b - benchmarkMean
+    beta = (benchmarkDeviations @ deviations) / (benchmarkDeviations @ benchmarkDeviations)
+
+    active = p - b[:, None]
+    trackingError = active.std(axis=0, ddof=1) * np.sqrt(252)
+
+    annualReturn = meanDaily * 252
+    annualStd = stdDaily * np.sqrt(252)
+    downsideDeviation = downsideStd * np.sqrt(252)
+    excessReturn = annualReturn - riskFreeRate
+
+    return pd.DataFrame(
+        {
+            "periods": periods,
+            "meanDaily": meanDaily,
+            "stdDaily": stdDaily,
+            "annualReturn": annualReturn,
+            "annualStd": annualStd,
+            "downsideDeviation": downsideDeviation,
+            "maxDrawdown": maxDrawdown,
+            "beta": beta,
+            "alpha": annualReturn - (riskFreeRate + beta * (benchmarkMean * 252 - riskFreeRate)),
+            "sharpe": excessReturn / annualStd,
+            "sortino": excessReturn / downsideDeviation,
+            "treynor": excessReturn / beta,
+            "calmar": excessReturn / -maxDrawdown,
+            "trackingError": trackingError,
+            "informationRatio": (annualReturn - benchmarkMean * 252) / trackingError,
+            "skewness": m3 / m2**1.5,
+            "kurtosis": m4 / m2**2 - 3,
+            "positivePeriods": (p > 0).sum(axis=0),
+        },
+        index=index,
+        columns=METRICS,
+    )
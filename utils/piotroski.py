@@ -0,0 +1,103 @@
+# columnar Piotroski F-score
+
+import operator
+import numpy as np
+import pandas as pd
+
+_OPERATORS = {">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le}
+
+# signal -> (component, column, comparison, column or constant it is compared with)
+PIOTROSKI_SIGNALS = {
+    "positive_net_income": ("Profitablity", "net_income", ">", 0),
+    "positive_operating_cash_flow": ("Profitablity", "operating_cash_flow", ">", 0),
+    "cash_flow_above_net_income": ("Profitablity", "operating_cash_flow", ">", "net_income"),
+    "improved_roa": ("Profitablity", "roa_current", ">", "roa_previous"),
+    "decreased_leverage": ("Leverage", "leverage_current", "<", "leverage_previous"),
+    "improved_current_ratio": ("Leverage", "current_ratio_current", ">", "current_ratio_previous"),
+    "no_dilution": ("Leverage", "shares_outstanding_current", "<=", "shares_outstanding_previous"),
+    "improved_gross_margin": ("Operating Efficiency", "gross_margin_current", ">", "gross_margin_previous"),
+    "improved_asset_turnover": ("Operating Efficiency", "asset_turnover_current", ">", "asset_turnover_previous"),
+}
+
+NA_POLICIES = ("zero", "nan", "drop")
+
+
+def _column(frame: pd.DataFrame, column) -> np.ndarray:
+    # numeric values of a column, NaN where it is missing or not a number; constants pass through
+    if not isinstance(column, str):
+        return column
+    if column not in frame.columns:
+        return np.full(len(frame), np.nan)
+    return pd.to_numeric(frame[column], errors="coerce").to_numpy(dtype=float)
+
+
+def piotroski_signals(frame: pd.DataFrame, signals: dict = PIOTROSKI_SIGNALS) -> pd.DataFrame:
+    """
+    Evaluate every signal for every row at once.
+
+    Parameters:
+        frame (pd.DataFrame): One row per ticker, with the columns the signals use.
+        signals (dict): Signal name -> (component, column, comparison, column or constant),
+            comparisons being ">", ">=", "<" or "<=".
+
+    Returns:
+        pd.DataFrame: 1.0 where a signal holds, 0.0 where it does not, NaN where one of
+        its inputs is missing. Indexed like frame, one column per signal.
+    """
+    values = {}
+    for name, (_, left, comparison, right) in signals.items():
+        if comparison not in _OPERATORS:
+            raise ValueError(f"Unknown comparison for signal {name}: {comparison}")
+        a, b = _column(frame, left), _column(frame, right)
+        with np.errstate(invalid="ignore"):
+            holds = _OPERATORS[comparison](a, b).astype(float)
+        holds[np.isnan(a) | np.isnan(b)] = np.nan
+        values[name] = holds
+    return pd.DataFrame(values, index=frame.index)
+
+
+def piotroski_scores(frame: pd.DataFrame, signals: dict = PIOTROSKI_SIGNALS, weights: dict = None,
+                     na_policy: str = "zero") -> pd.DataFrame:
+    """
+    Piotroski score of every row, by component and in total.
+
+    Parameters:
+        frame (pd.DataFrame): One row per ticker, with the columns the signals use and
+            optionally "PE Ratio".
+        signals (dict): Signals to score, see piotroski_signals.
+        weights (dict): Signal name -> points it adds when it holds; 1 for signals not listed.
+        na_policy (str): What a signal with a missing input scores.
+            "zero": nothing, as if it did not hold.
+            "nan": the signal's component and the total are NaN.
+            "drop": rows with any missing input are left out.
+
+    Returns:
+        pd.DataFrame: "PE Ratio", one column per component and "Piotroski Score".
+        attrs["missing_signals"] counts the signals of each row with missing inputs.
+    """
+    if na_policy not in NA_POLICIES:
+        raise ValueError(f"Unknown NA policy: {na_policy}, expected one of {', '.join(NA_POLICIES)}")
+    weights = weights or {}
+    holds = piotroski_signals(frame, signals)
+    missing = holds.isna()
+    if na_policy == "drop":
+        keep = ~missing.any(axis=1)
+        frame, holds, missing = frame[keep], holds[keep], missing[keep]
+
+    points = holds.to_numpy() * np.array([weights.get(name, 1) for name in signals], dtype=float)
+    if na_policy == "zero":
+        points = np.nan_to_num(points, nan=0.0)
+
+    components = list(dict.fromkeys(component for component, *_ in signals.values()))
+    component_of = np.array([component for component, *_ in signals.values()])
+    scores = pd.DataFrame(index=frame.index)
+    scores["PE Ratio"] = _column(frame, "PE Ratio")
+    for component in components:
+        # a plain sum, so a missing signal makes its component NaN under the "nan" policy
+        scores[component] = points[:, component_of == component].sum(axis=1)
+    scores["Piotroski Score"] = scores[components].sum(axis=1, skipna=False)
+
+    if na_policy != "nan" and all(float(weight).is_integer() for weight in weights.values()):
+        scores[components + ["Piotroski Score"]] = scores[components + ["Piotroski Score"]].astype(int)
+    scores.attrs["missing_signals"] = missing.sum(axis=1)
+    return scores
@@ -0,0 +1,87 @@
+# staged execution of one analysis run
+
+import multiprocessing
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from config import ANALYSIS_THREADS, ANALYSIS_PROCESSES
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def process_pool(max_workers: int = ANALYSIS_PROCESSES):
+    """
+    Process pool shared by every session, created on first use.
+
+    Workers are spawned rather than forked, since the app server runs threads.
+    Returns None when max_workers is 0.
+    """
+    global _process_pool
+    if max_workers <= 0:
+        return None
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers, mp_context=multiprocessing.get_context("spawn"))
+        return _process_pool
+
+
+class StagePipeline:
+    """
+    Named stages run on worker pools as soon as the stages they depend on have finished.
+
+    Stages of kind "thread" run on a thread pool of the pipeline; use it for I/O and for
+    NumPy work that releases the GIL. Stages of kind "process" run on the shared
+    process pool, so their function and arguments must be picklable (module-level
+    functions, arrays, frames). With no process pool they run on the threads too.
+
+    Parameters:
+        threads (int): Thread pool size.
+        processes (int): Size of the shared process pool when it is first created; 0
+            runs process stages on threads.
+    """
+
+    def __init__(self, threads: int = ANALYSIS_THREADS, processes: int = ANALYSIS_PROCESSES):
+        self.threads = threads
+        self.processes = processes
+        self._stages = {}  # name -> (func, args, after, kind)
+
+    def add(self, name: str, func, *args, after=(), kind: str = "thread"):
+        """
+        Add a stage calling func(*args, *results of the after stages).
+        """
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown stage kind: {kind}")
+        unknown = [stage for stage in after if stage not in self._stages]
+        if unknown:
+            raise ValueError(f"Stages must be added after their dependencies: {', '.join(unknown)}")
+        self._stages[name] = (func, args, tuple(after), kind)
+        return self
+
+    def run(self):
+        """
+        Run every stage and yield (name, result) in the order the stages finish.
+
+        The caller renders between yields while the remaining stages keep running. An
+        exception in a stage is raised from the generator and cancels the stages that
+        have not started.
+        """
+        results = {}
+        running = {}
+        waiting = dict(self._stages)
+        pool = process_pool(self.processes)
+        threads = ThreadPoolExecutor(self.threads, thread_name_prefix="analysis")
+        try:
+            while waiting or running:
+                for name, (func, args, after, kind) in list(waiting.items()):
+                    if all(stage in results for stage in after):
+                        executor = pool if kind == "process" and pool is not None else threads
+                        future = executor.submit(func, *args, *(results[stage] for stage in after))
+                        running[future] = name
+                        del waiting[name]
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    results[name] = future.result()
+                    yield name, results[name]
+        finally:
+            threads.shutdown(wait=False, cancel_futures=True)
@@ -1,5 +1,4 @@
 
-import yfinance as yf
 import numpy as np
 import scipy.optimize as sc
 import pandas as pd
@@ -8,52 +7,111 @@ import matplotlib.pyplot as plt
 import plotly.express as px
 from scipy.stats import norm
 from .load_data import *
+from .analysis import AnalysisContext
+from .frontier import efficient_frontier
+from .objectives import ObjectiveEngine
 
 class PortfolioOptimizer:
 
+    # rows of random weights evaluated at once by simulations()
+    simulationChunkSize = 50000
+
     def __init__(
-        self, stocks, start, end, optimization_criterion, riskFreeRate=0.07024):
-        self.stocks = [stock for stock in stocks]  
-        self.start = start
-        self.end = end
-        self.optimization_criterion = optimization_criterion
-        self.riskFreeRate = riskFreeRate
+        self, stocks, start, end, optimization_criterion, riskFreeRate=0.07024, context=None, frontier=True,
+        stockData=None, benchmarkData=None):
+        # stockData / benchmarkData: frames already returned by load_stocks_data and
+        # load_stock_data("^GSPC") for this range, used instead of loading them again
+        self.stockData, self.benchmarkData = stockData, benchmarkData
+        if context is None:
+            context = AnalysisContext(stocks, start, end, optimization_criterion, riskFreeRate)
+        self.context = context
+        self.stocks = context.stocks
+        self.start = context.start
+        self.end = context.end
+        self.optimization_criterion = context.optimization_criterion
+        self.riskFreeRate = context.riskFreeRate
+
+        if context.is_computed:
+            self.meanReturns, self.covMatrix = context.meanReturns, context.covMatrix
+            self.benchmark = context.benchmark
+            self.optimized_returns = context.optimized_returns
+            self.optimized_std = context.optimized_std
+            self.optimized_allocation = context.optimized_allocation
+            self.efficientList = context.efficientList
+            self.targetReturns = context.targetReturns
+            return
+
         self.meanReturns, self.covMatrix = self.getData()
         self.benchmark = self.benchmarkReturns()
         (
             self.optimized_returns,
             self.optimized_std,
             self.optimized_allocation,
-            self.efficientList,
-            self.targetReturns,
-        ) = self.calculatedResults()
+        ) = self.optimizedResults()
+
+        context.meanReturns, context.covMatrix = self.meanReturns, self.covMatrix
+        context.benchmark = self.benchmark
+        context.optimized_returns = self.optimized_returns
+        context.optimized_std = self.optimized_std
+        context.optimized_allocation = self.optimized_allocation
+
+        # frontier=False leaves the efficient frontier to a later frontierResults() call
+        self.efficientList, self.targetReturns = None, None
+        if frontier:
+            self.frontierResults()
+
+    @classmethod
+    def from_context(cls, context):
+        """
+        Build the view on an already computed AnalysisContext without recomputing it.
+        """
+        return cls(
+            context.stocks,
+            context.start,
+            context.end,
+            context.optimization_criterion,
+            context.riskFreeRate,
+            context=context,
+        )
 
     def basicMetrics(self):
+        if self.context.returns is not None:
+            return self.context.returns, self.context.stdIndividual
+
         if not all(s.isupper() for s in self.stocks):
             raise ValueError("Enter ticker names in Capital Letters!")
         if len(self.stocks) <= 1:
             raise ValueError("More than 1 ticker input required!")
-        stockData = load_stocks_data(self.stocks, self.start, self.end)
+        stockData = self.stockData
+        if stockData is None:
+            stockData = load_stocks_data(self.stocks, self.start, self.end)
 
-        if len(stockData.columns) != len(self.stocks):
+        if stockData.attrs.get("failed_tickers"):
             print("Data for the following tickers could not be retrieved:")
-            print(set(self.stocks) - set(stockData.columns))
+            print(set(stockData.attrs["failed_tickers"]))
 
         returns = stockData.pct_change()
         stdIndividual = returns.std()
 
+        self.context.returns, self.context.stdIndividual = returns, stdIndividual
         return returns, stdIndividual
 
+    @property
+    def objectiveEngine(self):
+        # built once per analysis, on first use, and shared through the context
+        if self.context.objectiveEngine is None:
+            returns, stdIndividual = self.basicMetrics()
+            self.context.objectiveEngine = ObjectiveEngine(returns, self.benchmark, self.riskFreeRate)
+        return self.context.objectiveEngine
+
     def portfolioReturnsDaily(self):
-        dailyIndividualReturns, dailyIndividualStd = self.basicMetrics()
-        portfolioDailyReturns = np.dot(
-            dailyIndividualReturns.dropna(), self.optimized_allocation
-        )
-        return portfolioDailyReturns
+        return self.objectiveEngine.portfolioReturns(self.optimized_allocation)
 
     def benchmarkReturns(self):
-        benchmark_data = load_stock_data("^GSPC", self.start, self.end)
-        benchmark_returns = benchmark_data["Close"].pct_change().dropna()
+        benchmark_data = self.benchmarkData
+        if benchmark_data is None:
+            benchmark_data = load_stock_data("^GSPC", self.start, self.end)
+        benchmark_returns = benchmark_data["Close"]["^GSPC"].pct_change().dropna()
         return benchmark_returns
 
     def getData(self):
@@ -74,110 +132,105 @@ class PortfolioOptimizer:
         return (-(pReturns - self.riskFreeRate) / pStd)  
 
     def sortino(self, weights):
-        dailyIndividualReturns, dailyIndividualStd = self.basicMetrics()
-        portfolioDailyReturns = np.dot(dailyIndividualReturns.dropna(), weights)
-        downsideChanges = portfolioDailyReturns[portfolioDailyReturns < 0]
-        downside_deviation = downsideChanges.std(ddof=1) * np.sqrt(252)
-        meanReturns = portfolioDailyReturns.mean() * 252
-        sortino_ratio = (meanReturns - self.riskFreeRate) / downside_deviation
-
-        return -sortino_ratio
+        return self.objectiveEngine.sortino(weights)
 
     def portfolioVariance(self, weights):  
         return self.portfolioPerformance(weights)[1]
 
     def trackingError(self, weights):
-        dailyIndividualReturns, dailyIndividualStd = self.basicMetrics()
-        portfolioDailyReturns = np.array(np.dot(dailyIndividualReturns.dropna(), weights))
-        benchmarkReturns = np.array(self.benchmark)
-
-        difference_array = portfolioDailyReturns - benchmarkReturns
-        trackingError = difference_array.std(ddof=1) * np.sqrt(252)
-
-        return trackingError
+        return self.objectiveEngine.trackingError(weights)
 
     def informationRatio(self, weights):
-        dailyIndividualReturns, dailyIndividualStd = self.basicMetrics()
-        portfolioDailyReturns = np.array(np.dot(dailyIndividualReturns.dropna(), weights))
-        benchmarkReturns = np.array(self.benchmark)
-        difference_array = portfolioDailyReturns - benchmarkReturns
-        portfolioPerformance = portfolioDailyReturns.mean() * 252
-        benchmarkPerformance = benchmarkReturns.mean() * 252
-        trackingError = difference_array.std(ddof=1) * np.sqrt(252)
-
-        information = (portfolioPerformance - benchmarkPerformance) / trackingError
-
-        return -information
+        return self.objectiveEngine.informationRatio(weights)
 
     def conditionalVar(self, weights):
-        dailyIndividualReturns, dailyIndividualStd = self.basicMetrics()
-        portfolioDailyReturns = np.array(np.dot(dailyIndividualReturns.dropna(), weights))
-        mu = portfolioDailyReturns.mean()
-        sigma = portfolioDailyReturns.std(ddof=1)
-        var = mu + sigma * norm.ppf(0.95)
-        loss = portfolioDailyReturns[portfolioDailyReturns < -var]
-        cvar = np.mean(loss)
+        return self.objectiveEngine.conditionalVar(weights)
+
+    def portfolioPerformanceGradient(self, weights):
+        returns, std = self.portfolioPerformance(weights)
+        returnsGradient = np.asarray(self.meanReturns) * 252
+        stdGradient = np.dot(self.covMatrix, weights) * 252 / std
+        return returns, std, returnsGradient, stdGradient
+
+    def sharpeGradient(self, weights):
+        pReturns, pStd, returnsGradient, stdGradient = self.portfolioPerformanceGradient(weights)
+        return -(returnsGradient * pStd - (pReturns - self.riskFreeRate) * stdGradient) / pStd**2
+
+    def portfolioVarianceGradient(self, weights):
+        return self.portfolioPerformanceGradient(weights)[3]
+
+    def sortinoGradient(self, weights):
+        return self.objectiveEngine.sortinoGradient(weights)
+
+    def trackingErrorGradient(self, weights):
+        return self.objectiveEngine.trackingErrorGradient(weights)
+
+    def informationRatioGradient(self, weights):
+        return self.objectiveEngine.informationRatioGradient(weights)
+
+    def conditionalVarGradient(self, weights):
+        return self.objectiveEngine.conditionalVarGradient(weights)
+
+    # optimization criterion -> (objective, gradient)
+    objectives = {
+        "Maximize Sharpe Ratio": ("sharpe", "sharpeGradient"),
+        "Minimize Volatility": ("portfolioVariance", "portfolioVarianceGradient"),
+        "Maximize Sortino Ratio": ("sortino", "sortinoGradient"),
+        "Minimize Tracking Error": ("trackingError", "trackingErrorGradient"),
+        "Maximize Information Ratio": ("informationRatio", "informationRatioGradient"),
+        "Minimize Conditional Value-at-Risk": ("conditionalVar", "conditionalVarGradient"),
+    }
+
+    def checkGradients(self, weights=None, epsilon=1e-7):
+        """
+        Compare every analytic gradient with a forward difference approximation.
+
+        Parameters:
+            weights (np.ndarray): Point to check at. Defaults to a random long-only portfolio.
+            epsilon (float): Finite difference step.
+
+        Returns:
+            pd.DataFrame: Max absolute and relative difference per optimization criterion.
+        """
+        numAssets = len(self.meanReturns)
+        if weights is None:
+            weights = np.random.default_rng(0).random(numAssets)
+            weights /= weights.sum()
+
+        rows = {}
+        for criterion, (objective, gradient) in self.objectives.items():
+            analytic = getattr(self, gradient)(weights)
+            numerical = sc.approx_fprime(weights, getattr(self, objective), epsilon)
+            error = np.max(np.abs(analytic - numerical))
+            rows[criterion] = {
+                "max_abs_error": error,
+                "max_rel_error": error / max(np.max(np.abs(numerical)), 1e-12),
+            }
+        return pd.DataFrame.from_dict(rows, orient="index")
 
-        return -cvar
+    def optimization_function(self, constraintSet=(0, 1), useGradients=True):
 
-    def optimization_function(self, constraintSet=(0, 1)):
+        if self.optimization_criterion not in self.objectives:
+            return None
+        objective, gradient = self.objectives[self.optimization_criterion]
 
         numAssets = len(self.meanReturns)  ## gets the number of stocks in the portfolio
         constraints = {
             "type": "eq",
             "fun": lambda x: np.sum(x) - 1,
+            "jac": lambda x: np.ones_like(x),
         }  
         bound = constraintSet  
         bounds = tuple(bound for asset in range(numAssets)) 
 
-        if self.optimization_criterion == "Maximize Sharpe Ratio":
-            return sc.minimize(
-                self.sharpe,
-                numAssets * [1.0 / numAssets],  
-                method="SLSQP",
-                bounds=bounds,
-                constraints=constraints,
-            )
-        elif self.optimization_criterion == "Minimize Volatility":
-            return sc.minimize(
-                self.portfolioVariance,
-                numAssets * [1.0 / numAssets],  
-                method="SLSQP",
-                bounds=bounds,
-                constraints=constraints,
-            )
-        elif self.optimization_criterion == "Maximize Sortino Ratio":
-            return sc.minimize(
-                self.sortino,
-                numAssets * [1.0 / numAssets],  
-                method="SLSQP",
-                bounds=bounds,
-                constraints=constraints,
-            )
-        elif self.optimization_criterion == "Minimize Tracking Error":
-            return sc.minimize(
-                self.trackingError,
-                numAssets * [1.0 / numAssets],  
-                method="SLSQP",
-                bounds=bounds,
-                constraints=constraints,
-            )
-        elif self.optimization_criterion == "Maximize Information Ratio":
-            return sc.minimize(
-                self.informationRatio,
-                numAssets * [1.0 / numAssets],
-                method="SLSQP",
-                bounds=bounds,
-                constraints=constraints,
-            )
-        elif self.optimization_criterion == "Minimize Conditional Value-at-Risk":
-            return sc.minimize(
-                self.conditionalVar,
-                numAssets * [1.0 / numAssets],  
-                method="SLSQP",
-                bounds=bounds,
-                constraints=constraints,
-            )
+        return sc.minimize(
+            getattr(self, objective),
+            numAssets * [1.0 / numAssets],  
+            jac=getattr(self, gradient) if useGradients else None,
+            method="SLSQP",
+            bounds=bounds,
+            constraints=constraints,
+        )
 
     def portfolioReturn(self, weights):  
         return self.portfolioPerformance(weights)[0]
@@ -203,6 +256,17 @@ class PortfolioOptimizer:
         return effOpt
 
     def calculatedResults(self):
+        optimized_returns, optimized_std, optimized_allocation = self.optimizedResults()
+        efficientList, targetReturns = self.frontierResults()
+        return (
+            optimized_returns,
+            optimized_std,
+            optimized_allocation,
+            efficientList,
+            targetReturns,
+        )
+
+    def optimizedResults(self):
         optimized_portfolio = (self.optimization_function())  
         optimized_returns, optimized_std = self.portfolioPerformance(
             optimized_portfolio["x"]
@@ -213,48 +277,100 @@ class PortfolioOptimizer:
             columns=["allocation"],
         )  #
 
-        # Efficient Frontier
-        std, ret, shar = self.simulations()
-        efficientList = (
-            []
-        )  
-        targetReturns = np.linspace(
-            min(ret), max(ret), 100
-        )  
-        for target in targetReturns:
-            efficientList.append(
-                self.efficientOpt(target)["fun"]
-            )  
-
         optimized_returns, optimized_std = round(optimized_returns * 100, 2), round(
             optimized_std * 100, 2
         )
+        return optimized_returns, optimized_std, optimized_allocation
 
-        return (
-            optimized_returns,
-            optimized_std,
-            optimized_allocation,
-            efficientList,
-            targetReturns,
+    def frontierTargets(self):
+        # target returns spanning the simulated portfolio cloud
+        std, ret, shar = self.simulations()
+        return np.linspace(
+            min(ret), max(ret), 100
         )
 
-    def simulations(self):  
-        noOfPortfolios = 10000
+    def frontierResults(self, frontier=None):
+        """
+        Efficient frontier over frontierTargets(), stored on the optimizer and its context.
+
+        Parameters:
+            frontier (dict): Output of efficient_frontier for frontierTargets(), when it
+                was computed elsewhere (e.g. on a worker process).
+
+        Returns:
+            list, np.ndarray: Frontier volatilities and their target returns.
+        """
+        targetReturns = self.frontierTargets()
+        if frontier is None:
+            frontier = efficient_frontier(self.meanReturns, self.covMatrix, targetReturns)
+        self.efficientList = list(frontier["volatility"])
+        self.targetReturns = targetReturns
+        self.context.frontierWeights = pd.DataFrame(
+            frontier["weights"], index=targetReturns, columns=self.meanReturns.index
+        )
+        self.context.efficientList, self.context.targetReturns = self.efficientList, self.targetReturns
+        return self.efficientList, self.targetReturns
+
+    def simulations(self, noOfPortfolios=10000, seed=None):
+        """
+        Random long-only portfolios for the efficient frontier plot.
+
+        All weights are drawn as one (noOfPortfolios x assets) matrix and evaluated with
+        matrix products, in chunks of simulationChunkSize rows. The cloud is memoized on
+        the analysis context per (noOfPortfolios, seed), so the frontier bounds and the
+        plot use the same portfolios.
+
+        Returns:
+            np.ndarray, np.ndarray, np.ndarray: Annualised volatility, return and Sharpe ratio.
+        """
+        key = (noOfPortfolios, seed)
+        if key in self.context.simulated_portfolios:
+            return self.context.simulated_portfolios[key]
+
+        rng = np.random.default_rng(seed)
         numAssets = len(self.meanReturns)
-        weight = np.zeros((noOfPortfolios, numAssets))
-        expectedReturn = np.zeros(noOfPortfolios)
-        expectedVolatility = np.zeros(noOfPortfolios)
-        sharpeRatio = np.zeros(noOfPortfolios)  
-
-        for k in range(noOfPortfolios):
-            w = np.array(np.random.random(numAssets))  
-            w = w / np.sum(w) 
-            weight[k, :] = w  
-            expectedReturn[k], expectedVolatility[k] = self.portfolioPerformance(weight[k].T)  
-            sharpeRatio[k] = (expectedReturn[k] - self.riskFreeRate) / expectedVolatility[k]  
-
+        expectedReturn = np.empty(noOfPortfolios)
+        expectedVolatility = np.empty(noOfPortfolios)
+        sharpeRatio = np.empty(noOfPortfolios)
+
+        for first in range(0, noOfPortfolios, self.simulationChunkSize):
+            last = min(first + self.simulationChunkSize, noOfPortfolios)
+            weight = rng.random((last - first, numAssets))
+            weight /= weight.sum(axis=1, keepdims=True)
+            batch = self.objectiveEngine.evaluate(weight, paths=False)
+            expectedReturn[first:last] = batch["return"]
+            expectedVolatility[first:last] = batch["volatility"]
+            sharpeRatio[first:last] = batch["sharpe"]
+
+        self.context.add("simulated_portfolios", key, (expectedVolatility, expectedReturn, sharpeRatio))
         return expectedVolatility, expectedReturn, sharpeRatio
 
+    def evaluatePortfolios(self, weights, paths=True, chunkSize=None):
+        """
+        Return, volatility, Sharpe, Sortino, tracking error, information ratio and CVaR of
+        many candidate allocations at once, e.g. uploaded portfolios or a grid search.
+
+        Parameters:
+            weights (pd.DataFrame | np.ndarray): One allocation per row. DataFrame columns are
+                tickers (missing tickers get no weight); array columns follow self.meanReturns.
+            paths (bool): Include the metrics that need the daily return paths.
+            chunkSize (int): Portfolios evaluated per chunk, see ObjectiveEngine.evaluate.
+
+        Returns:
+            pd.DataFrame: One row per allocation, indexed like weights.
+        """
+        index = None
+        if isinstance(weights, pd.DataFrame):
+            unknown = set(weights.columns) - set(self.meanReturns.index)
+            if unknown:
+                raise ValueError(f"No returns for tickers: {', '.join(sorted(map(str, unknown)))}")
+            index = weights.index
+            weights = weights.reindex(columns=self.meanReturns.index, fill_value=0)
+        result = self.objectiveEngine.evaluate(weights, paths=paths, chunkSize=chunkSize)
+        if index is not None:
+            result.index = index
+        return result
+
     def EF_graph(self):
 
         fig, ax = plt.subplots(figsize=(10, 7))
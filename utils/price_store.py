@@ -0,0 +1,207 @@
+# persistent price history
+
+import os
+import sqlite3
+import threading
+from contextlib import closing
+import numpy as np
+import pandas as pd
+
+PRICE_FIELDS = ["Open", "High", "Low", "Close", "Adj Close", "Volume"]
+_COLUMNS = ["open", "high", "low", "close", "adj_close", "volume"]
+
+
+def _day(value) -> pd.Timestamp:
+    return pd.Timestamp(value).normalize()
+
+
+def _has_business_days(start: pd.Timestamp, end: pd.Timestamp) -> bool:
+    # any weekday in [start, end)
+    return start < end and len(pd.bdate_range(start, end - pd.Timedelta(days=1))) > 0
+
+
+class PriceStore:
+    """
+    SQLite backed store of daily OHLCV history.
+
+    Rows are clustered by (ticker, date), so every ticker is stored as its own
+    contiguous partition. For each ticker the store also remembers the date range
+    that has already been downloaded, which lets callers fetch only the missing
+    head or tail of a requested range instead of the whole range.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(sqlite3.connect(self.path)) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS prices ("
+                "ticker TEXT NOT NULL, date TEXT NOT NULL, "
+                "open REAL, high REAL, low REAL, close REAL, adj_close REAL, volume REAL, "
+                "PRIMARY KEY (ticker, date)) WITHOUT ROWID"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS coverage ("
+                "ticker TEXT PRIMARY KEY, start TEXT NOT NULL, end TEXT NOT NULL)"
+            )
+
+    def coverage(self, ticker: str):
+        """
+        Date range already downloaded for a ticker.
+
+        Returns:
+            tuple | None: (start, end) timestamps, end exclusive, or None if the ticker was never stored.
+        """
+        with closing(sqlite3.connect(self.path)) as conn:
+            row = conn.execute(
+                "SELECT start, end FROM coverage WHERE ticker = ?", (ticker,)
+            ).fetchone()
+        if row is None:
+            return None
+        return pd.Timestamp(row[0]), pd.Timestamp(row[1])
+
+    def missing_ranges(self, ticker: str, start, end) -> list:
+        """
+        Ranges that have to be downloaded to serve [start, end).
+
+        Parameters:
+            ticker (str): The stock ticker symbol.
+            start: Start date of the request.
+            end: End date of the request (exclusive, as in yfinance).
+
+        Returns:
+            list: (start, end) tuples. A range is extended up to the stored coverage so that
+            the coverage of a ticker always stays contiguous.
+        """
+        start, end = _day(start), _day(end)
+        stored = self.coverage(ticker)
+        if stored is None:
+            return [(start, end)]
+
+        covered_start, covered_end = stored
+        ranges = []
+        if start < covered_start:
+            ranges.append((start, covered_start))
+        if end > covered_end:
+            ranges.append((covered_end, end))
+        return ranges
+
+    def write(self, ticker: str, frame: pd.DataFrame, start, end):
+        """
+        Store downloaded history for [start, end) and extend the ticker's coverage.
+
+        Coverage only grows over what the download actually returned: up to the day after
+        its last bar, or up to end when no business day follows that bar. An empty
+        download only counts when [start, end) has no business days, so a throttled or
+        failed download is asked for again instead of being remembered as covered.
+        Coverage that would not join the stored coverage is not recorded, so it always
+        stays contiguous. The coverage never includes today, since the current session's
+        bar is not final yet.
+        """
+        start, end = _day(start), _day(end)
+        end = min(end, _day(pd.Timestamp.today()))
+
+        rows = []
+        if frame is not None and not frame.empty:
+            frame = frame.reindex(columns=PRICE_FIELDS)
+            dates = pd.DatetimeIndex(frame.index).strftime("%Y-%m-%d")
+            values = frame.astype("float64").to_numpy()
+            rows = [
+                (ticker, date, *[None if pd.isna(v) else float(v) for v in row])
+                for date, row in zip(dates, values)
+            ]
+
+        covered = None
+        if rows:
+            after_last = _day(pd.DatetimeIndex(frame.index).max()) + pd.Timedelta(days=1)
+            covered = (start, end if not _has_business_days(after_last, end) else min(after_last, end))
+        elif not _has_business_days(start, end):
+            covered = (start, end)
+
+        with self._lock, closing(sqlite3.connect(self.path)) as conn, conn:
+            stored = conn.execute(
+                "SELECT start, end FROM coverage WHERE ticker = ?", (ticker,)
+            ).fetchone()
+            if not rows and stored is None:
+                return
+            conn.executemany(
+                f"INSERT OR REPLACE INTO prices (ticker, date, {', '.join(_COLUMNS)}) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            if covered is None:
+                return
+            start, end = covered
+            if stored is not None:
+                stored_start, stored_end = pd.Timestamp(stored[0]), pd.Timestamp(stored[1])
+                if end < stored_start or start > stored_end:
+                    return
+                start = min(start, stored_start)
+                end = max(end, stored_end)
+            if start < end:
+                conn.execute(
+                    "INSERT OR REPLACE INTO coverage (ticker, start, end) VALUES (?, ?, ?)",
+                    (ticker, start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")),
+                )
+
+    def read(self, ticker: str, start, end) -> pd.DataFrame:
+        """
+        Read stored history for [start, end).
+
+        Returns:
+            pd.DataFrame: Daily bars indexed by date with the columns of PRICE_FIELDS
+            that hold data. Empty if nothing is stored for the range.
+        """
+        start, end = _day(start), _day(end)
+        with closing(sqlite3.connect(self.path)) as conn:
+            rows = conn.execute(
+                f"SELECT date, {', '.join(_COLUMNS)} FROM prices "
+                "WHERE ticker = ? AND date >= ? AND date < ? ORDER BY date",
+                (ticker, start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")),
+            ).fetchall()
+
+        frame = pd.DataFrame(
+            [row[1:] for row in rows],
+            index=pd.DatetimeIndex([row[0] for row in rows], name="Date"),
+            columns=PRICE_FIELDS,
+            dtype="float64",
+        )
+        return frame.dropna(axis=1, how="all")
+
+    def read_field(self, tickers: list, start, end, field: str = "Close") -> pd.DataFrame:
+        """
+        Read one price field for many tickers with a single query.
+
+        Parameters:
+            tickers (list): Ticker symbols, used as the column order.
+            start: Start date of the request.
+            end: End date of the request (exclusive).
+            field (str): One of PRICE_FIELDS.
+
+        Returns:
+            pd.DataFrame: Dates (union over tickers) by tickers, NaN where a ticker has no bar.
+        """
+        start, end = _day(start), _day(end)
+        column = _COLUMNS[PRICE_FIELDS.index(field)]
+        placeholders = ", ".join("?" for _ in tickers)
+        with closing(sqlite3.connect(self.path)) as conn:
+            rows = conn.execute(
+                f"SELECT ticker, date, {column} FROM prices "
+                f"WHERE ticker IN ({placeholders}) AND date >= ? AND date < ?",
+                (*tickers, start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")),
+            ).fetchall()
+
+        dates = sorted({row[1] for row in rows})
+        date_position = {date: i for i, date in enumerate(dates)}
+        ticker_position = {ticker: j for j, ticker in enumerate(tickers)}
+
+        # fill a preallocated panel instead of aligning one series per ticker
+        values = np.full((len(dates), len(tickers)), np.nan)
+        for ticker, date, value in rows:
+            if value is not None:
+                values[date_position[date], ticker_position[ticker]] = value
+
+        return pd.DataFrame(values, index=pd.DatetimeIndex(dates, name="Date"), columns=list(tickers))
@@ -0,0 +1,328 @@
+# market data providers
+
+import json
+import os
+import zlib
+from abc import ABC, abstractmethod
+import numpy as np
+import pandas as pd
+import yfinance as yf
+from config import DATA_PROVIDER, LOCAL_DATA_DIR, SYNTHETIC_SEED
+
+PRICE_FIELDS = ["Open", "High", "Low", "Close", "Adj Close", "Volume"]
+STATEMENTS = ["financials", "cashflow", "balance_sheet"]
+
+
+class MarketDataProvider(ABC):
+    """
+    Source of prices and company data used by every data path of the dashboard.
+
+    Subclasses implement:
+        history(tickers, start, end): dict of ticker -> daily bars (PRICE_FIELDS columns,
+            Date index) for [start, end). Tickers without data are left out.
+        last_price(ticker): latest traded price.
+        info(ticker): dict of company fields, keyed like yfinance's Ticker.info.
+        statements(ticker): dict of STATEMENTS -> DataFrame with line items as rows and
+            fiscal periods as columns, newest first, as yfinance returns them.
+
+    cache_on_disk tells the loaders whether downloads are worth keeping in the local price store.
+    cache_key identifies the data the provider serves in the in-memory caches; providers
+    whose data depends on their settings (a root directory, a seed) include them.
+    """
+
+    name = "base"
+    cache_on_disk = False
+
+    @property
+    def cache_key(self) -> str:
+        return self.name
+
+    @abstractmethod
+    def history(self, tickers: list, start, end) -> dict:
+        ...
+
+    @abstractmethod
+    def last_price(self, ticker: str) -> float:
+        ...
+
+    @abstractmethod
+    def info(self, ticker: str) -> dict:
+        ...
+
+    @abstractmethod
+    def statements(self, ticker: str) -> dict:
+        ...
+
+
+class YFinanceProvider(MarketDataProvider):
+    """
+    Live data from Yahoo Finance.
+    """
+
+    name = "yfinance"
+    cache_on_disk = True
+
+    def history(self, tickers: list, start, end) -> dict:
+        tickers = list(tickers)
+        data = yf.download(tickers, start, end, group_by="column")
+        if data.empty:
+            return {}
+        if not isinstance(data.columns, pd.MultiIndex):
+            data.columns = pd.MultiIndex.from_product([data.columns, tickers])
+
+        histories = {}
+        for ticker in tickers:
+            if ticker not in data.columns.get_level_values(1):
+                continue
+            history = data.xs(ticker, axis=1, level=1).dropna(how="all")
+            if not history.empty:
+                histories[ticker] = history
+        return histories
+
+    def last_price(self, ticker: str) -> float:
+        return float(yf.Ticker(ticker).history(period="1d")["Close"].iloc[-1])
+
+    def info(self, ticker: str) -> dict:
+        return yf.Ticker(ticker).info
+
+    def statements(self, ticker: str) -> dict:
+        stock = yf.Ticker(ticker)
+        return {
+            "financials": stock.financials,
+            "cashflow": stock.cashflow,
+            "balance_sheet": stock.balance_sheet,
+        }
+
+
+class LocalFileProvider(MarketDataProvider):
+    """
+    Data read from files under a root directory, one folder per ticker:
+
+        <root>/<TICKER>/prices.parquet or prices.csv
+        <root>/<TICKER>/info.json
+        <root>/<TICKER>/financials.csv, cashflow.csv, balance_sheet.csv
+
+    Use record() to snapshot another provider into this layout.
+    """
+
+    name = "local"
+
+    def __init__(self, root: str = LOCAL_DATA_DIR):
+        self.root = root
+
+    @property
+    def cache_key(self) -> str:
+        return f"{self.name}:{os.path.abspath(self.root)}"
+
+    def _read_frame(self, ticker: str, name: str) -> pd.DataFrame:
+        base = os.path.join(self.root, ticker, name)
+        if os.path.exists(base + ".parquet"):
+            return pd.read_parquet(base + ".parquet")
+        if os.path.exists(base + ".csv"):
+            return pd.read_csv(base + ".csv", index_col=0)
+        return pd.DataFrame()
+
+    def _prices(self, ticker: str) -> pd.DataFrame:
+        prices = self._read_frame(ticker, "prices")
+        prices.index = pd.DatetimeIndex(pd.to_datetime(prices.index), name="Date")
+        return prices.sort_index()
+
+    def history(self, tickers: list, start, end) -> dict:
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        histories = {}
+        for ticker in tickers:
+            prices = self._prices(ticker)
+            prices = prices[(prices.index >= start) & (prices.index < end)]
+            if not prices.empty:
+                histories[ticker] = prices
+        return histories
+
+    def last_price(self, ticker: str) -> float:
+        return float(self._prices(ticker)["Close"].iloc[-1])
+
+    def info(self, ticker: str) -> dict:
+        with open(os.path.join(self.root, ticker, "info.json")) as f:
+            return json.load(f)
+
+    def statements(self, ticker: str) -> dict:
+        statements = {}
+        for statement in STATEMENTS:
+            frame = self._read_frame(ticker, statement)
+            frame.columns = pd.to_datetime(frame.columns)
+            statements[statement] = frame
+        return statements
+
+    def record(self, source: MarketDataProvider, tickers: list, start, end, fundamentals: bool = False):
+        """
+        Save data from another provider so it can be replayed offline.
+
+        Parameters:
+            source (MarketDataProvider): Provider to copy from.
+            tickers (list): Tickers to save.
+            start, end: Price history range.
+            fundamentals (bool): Also save info and financial statements.
+        """
+        histories = source.history(tickers, start, end)
+        for ticker in tickers:
+            directory = os.path.join(self.root, ticker)
+            os.makedirs(directory, exist_ok=True)
+            if ticker in histories:
+                histories[ticker].to_csv(os.path.join(directory, "prices.csv"))
+            if fundamentals:
+                with open(os.path.join(directory, "info.json"), "w") as f:
+                    json.dump(source.info(ticker), f, default=str)
+                for statement, frame in source.statements(ticker).items():
+                    frame.to_csv(os.path.join(directory, statement + ".csv"))
+
+
+class SyntheticProvider(MarketDataProvider):
+    """
+    Deterministic generated data for offline benchmarks and regression runs.
+
+    Daily returns follow a one-factor model: every ticker loads on a common market
+    factor (index tickers such as ^GSPC are the factor itself) plus its own noise.
+    Paths are generated from a fixed epoch with a random stream per ticker, so a given
+    (seed, ticker, date) always yields the same bar whatever range is requested.
+    """
+
+    name = "synthetic"
+    EPOCH = pd.Timestamp("2000-01-03")
+    SECTORS = ["Information Technology", "Health Care", "Financials", "Industrials", "Energy", "Utilities"]
+
+    def __init__(self, seed: int = SYNTHETIC_SEED):
+        self.seed = seed
+
+    @property
+    def cache_key(self) -> str:
+        return f"{self.name}:{self.seed}"
+
+    def _rng(self, ticker: str, stream: int) -> np.random.Generator:
+        return np.random.default_rng([self.seed, zlib.crc32(ticker.encode()), stream])
+
+    def _bars(self, ticker: str, end) -> pd.DataFrame:
+        dates = pd.bdate_range(self.EPOCH, pd.Timestamp(end) - pd.Timedelta(days=1), name="Date")
+        n = len(dates)
+        market = np.random.default_rng([self.seed, 0]).normal(0.0003, 0.011, n)
+
+        params = self._rng(ticker, 0)
+        if ticker.startswith("^"):
+            returns = market
+            start_price = 1000.0
+        else:
+            beta = params.uniform(0.5, 1.5)
+            alpha = params.normal(0.0, 0.0002)
+            volatility = params.uniform(0.008, 0.025)
+            start_price = params.uniform(20, 500)
+            returns = alpha + beta * market + volatility * self._rng(ticker, 1).normal(size=n)
+
+        close = start_price * np.cumprod(1 + returns)
+        open_ = np.concatenate([[start_price], close[:-1]]) * (1 + self._rng(ticker, 2).normal(0, 0.002, n))
+        spread = np.abs(self._rng(ticker, 3).normal(0, 0.005, n))
+        return pd.DataFrame(
+            {
+                "Open": open_,
+                "High": np.maximum(open_, close) * (1 + spread),
+                "Low": np.minimum(open_, close) * (1 - spread),
+                "Close": close,
+                "Adj Close": close,
+                "Volume": self._rng(ticker, 4).integers(100_000, 10_000_000, n).astype("float64"),
+            },
+            index=dates,
+        )
+
+    def history(self, tickers: list, start, end) -> dict:
+        start = pd.Timestamp(start)
+        histories = {}
+        for ticker in tickers:
+            bars = self._bars(ticker, end)
+            bars = bars[bars.index >= start]
+            if not bars.empty:
+                histories[ticker] = bars
+        return histories
+
+    def last_price(self, ticker: str) -> float:
+        return float(self._bars(ticker, pd.Timestamp.today().normalize())["Close"].iloc[-1])
+
+    def info(self, ticker: str) -> dict:
+        rng = self._rng(ticker, 5)
+        quarter_end = pd.Timestamp.today().normalize() - pd.offsets.QuarterEnd(1)
+        return {
+            "symbol": ticker,
+            "shortName": f"{ticker} Synthetic Inc.",
+            "sector": self.SECTORS[zlib.crc32(ticker.encode()) % len(self.SECTORS)],
+            "sharesOutstanding": int(rng.integers(50_000_000, 5_000_000_000)),
+            "priceToBook": rng.uniform(0.5, 15),
+            "trailingPE": rng.uniform(5, 60),
+            "priceToSalesTrailing12Months": rng.uniform(0.5, 20),
+            "enterpriseToEbitda": rng.uniform(3, 40),
+            "enterpriseToRevenue": rng.uniform(0.5, 20),
+            "trailingEps": rng.uniform(-2, 15),
+            "dividendYield": rng.uniform(0, 0.05),
+            "quickRatio": rng.uniform(0.3, 3),
+            "currentRatio": rng.uniform(0.5, 4),
+            "debtToEquity": rng.uniform(0, 300),
+            "mostRecentQuarter": int(quarter_end.timestamp()),
+        }
+
+    def statements(self, ticker: str) -> dict:
+        rng = self._rng(ticker, 6)
+        year_end = pd.Timestamp.today().normalize() - pd.offsets.YearEnd(1)
+        periods = [year_end - pd.DateOffset(years=i) for i in range(4)]
+
+        def line(base, spread):
+            return base * (1 + rng.normal(0, spread, len(periods)))
+
+        revenue = line(rng.uniform(1e9, 1e11), 0.1)
+        assets = revenue * rng.uniform(0.5, 3, len(periods))
+        net_income = revenue * rng.uniform(-0.05, 0.25, len(periods))
+        current_liabilities = assets * rng.uniform(0.1, 0.3, len(periods))
+        return {
+            "financials": pd.DataFrame(
+                [net_income, revenue * rng.uniform(0.2, 0.6, len(periods)), revenue],
+                index=["Net Income", "Gross Profit", "Total Revenue"],
+                columns=periods,
+            ),
+            "cashflow": pd.DataFrame(
+                [net_income * rng.uniform(0.6, 1.6, len(periods))],
+                index=["Cash Flow From Continuing Operating Activities"],
+                columns=periods,
+            ),
+            "balance_sheet": pd.DataFrame(
+                [
+                    assets,
+                    assets * rng.uniform(0.3, 0.8, len(periods)),
+                    current_liabilities * rng.uniform(0.8, 2.5, len(periods)),
+                    current_liabilities,
+                ],
+                index=["Total Assets", "Total Liabilities Net Minority Interest", "Current Assets", "Current Liabilities"],
+                columns=periods,
+            ),
+        }
+
+
+_PROVIDERS = {
+    "yfinance": YFinanceProvider,
+    "local": LocalFileProvider,
+    "synthetic": SyntheticProvider,
+}
+
+_provider = None
+
+
+def get_provider() -> MarketDataProvider:
+    """
+    Provider every loader goes through, chosen by the QUANT_DATA_PROVIDER
+    environment variable (yfinance, local or synthetic) unless set_provider() was called.
+    """
+    global _provider
+    if _provider is None:
+        _provider = _PROVIDERS[DATA_PROVIDER]()
+    return _provider
+
+
+def set_provider(provider: MarketDataProvider):
+    """
+    Route all data loading through the given provider.
+    """
+    global _provider
+    _provider = provider
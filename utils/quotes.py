@@ -0,0 +1,126 @@
+# shared spot quotes
+
+import threading
+import time
+from .providers import get_provider
+from config import SPOT_QUOTE_TTL, SPOT_QUOTE_MAX_AGE
+
+
+class QuoteService:
+    """
+    Latest prices shared by every session of the app.
+
+    A price is downloaded at most once per ttl seconds per ticker. Callers that ask for a
+    ticker while its download is running wait for that download instead of starting
+    another, and a failed download falls back to the last good price while it is
+    younger than max_age seconds. A failure is remembered for retry_after seconds, during
+    which the fallback, or the failure itself without a usable last good price, is served
+    without trying the download again.
+
+    Parameters:
+        provider (MarketDataProvider): Source of prices. None uses get_provider() at fetch time.
+        ttl (float): Seconds a price is served without downloading it again.
+        max_age (float): Seconds a last good price may stand in for a failed download.
+            None keeps it indefinitely.
+        retry_after (float): Seconds after a failed download before the ticker is downloaded again.
+    """
+
+    def __init__(self, provider=None, ttl: float = SPOT_QUOTE_TTL, max_age: float = SPOT_QUOTE_MAX_AGE,
+                 retry_after: float = SPOT_QUOTE_TTL):
+        self.provider = provider
+        self.ttl = ttl
+        self.max_age = max_age
+        self.retry_after = retry_after
+        self.fetches = 0
+        self.failures = 0
+        self._quotes = {}  # ticker -> (price, fetched_at)
+        self._failed = {}  # ticker -> (exception, failed_at) of the last failed download
+        self._fetch_locks = {}
+        self._lock = threading.Lock()
+
+    def last_price(self, ticker: str) -> float:
+        return self.quote(ticker)["price"]
+
+    def quote(self, ticker: str) -> dict:
+        """
+        Latest price of a ticker.
+
+        Returns:
+            dict: "price", "age" in seconds since it was downloaded, and "stale", True when
+            the download failed and the last good price was served instead.
+
+        Raises the download's exception when there is no usable last good price.
+        """
+        quote = self._cached(ticker)
+        if quote is not None:
+            return quote
+
+        with self._lock:
+            fetch_lock = self._fetch_locks.setdefault(ticker, threading.Lock())
+        with fetch_lock:
+            # another session may have downloaded it, or failed to, while we waited
+            quote = self._cached(ticker)
+            if quote is not None:
+                return quote
+            try:
+                self.fetches += 1
+                price = float((self.provider or get_provider()).last_price(ticker))
+            except Exception as e:
+                self.failures += 1
+                with self._lock:
+                    self._failed[ticker] = (e, time.monotonic())
+                return self._fallback(ticker, e)
+            with self._lock:
+                self._quotes[ticker] = (price, time.monotonic())
+                self._failed.pop(ticker, None)
+            return {"price": price, "age": 0.0, "stale": False}
+
+    def invalidate(self, ticker: str = None):
+        """
+        Forget one ticker's price, or every price when called without a ticker.
+        """
+        with self._lock:
+            if ticker is None:
+                self._quotes.clear()
+                self._failed.clear()
+            else:
+                self._quotes.pop(ticker, None)
+                self._failed.pop(ticker, None)
+
+    def _cached(self, ticker):
+        # a fresh price, or the fallback for a recent failure; None when a download is due
+        with self._lock:
+            entry = self._quotes.get(ticker)
+            failed = self._failed.get(ticker)
+        now = time.monotonic()
+        if entry is not None and now - entry[1] < self.ttl:
+            return {"price": entry[0], "age": now - entry[1], "stale": False}
+        if failed is not None and now - failed[1] < self.retry_after:
+            return self._fallback(ticker, failed[0])
+        return None
+
+    def _fallback(self, ticker, error):
+        # the last good price in place of a failed download, or the failure when there is none
+        with self._lock:
+            last_good = self._quotes.get(ticker)
+        if last_good is None:
+            raise error
+        age = time.monotonic() - last_good[1]
+        if self.max_age is not None and age > self.max_age:
+            raise error
+        return {"price": last_good[0], "age": age, "stale": True}
+
+
+_quote_service = None
+_quote_service_lock = threading.Lock()
+
+
+def get_quote_service() -> QuoteService:
+    """
+    Quote service shared by every session of the process.
+    """
+    global _quote_service
+    with _quote_service_lock:
+        if _quote_service is None:
+            _quote_service = QuoteService()
+        return _quote_service
@@ -0,0 +1,127 @@
+# reference fundamentals dataset
+
+import datetime as dt
+import json
+import os
+import threading
+import pandas as pd
+from config import REFERENCE_SOURCE, REFERENCE_PATH, REFERENCE_TEXT_MIN_LENGTH
+
+
+def _schema_path(path: str) -> str:
+    return os.path.splitext(path)[0] + ".json"
+
+
+def build_reference(source: str = REFERENCE_SOURCE, path: str = REFERENCE_PATH,
+                    text_min_length: int = REFERENCE_TEXT_MIN_LENGTH) -> dict:
+    """
+    Convert the reference CSV to Parquet and write its schema sidecar (<name>.json).
+
+    Column types are inferred once here and kept by Parquet, so readers do not parse
+    text. String columns whose values average text_min_length characters or more
+    (business summaries, officer lists) are marked as text in the schema.
+
+    Returns:
+        dict: The schema written to the sidecar.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    frame = pd.read_csv(source)
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    strings = [
+        field.name for field in table.schema
+        if pa.types.is_string(field.type) or pa.types.is_large_string(field.type)
+    ]
+    text = [column for column in strings if frame[column].dropna().str.len().mean() >= text_min_length]
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    pq.write_table(table, path)
+    schema = {
+        "version": dt.date.today().isoformat(),
+        "source": os.path.basename(source),
+        "rows": len(frame),
+        "index": "symbol",
+        "columns": {field.name: str(field.type) for field in table.schema},
+        "text_columns": text,
+    }
+    with open(_schema_path(path), "w") as f:
+        json.dump(schema, f, indent=2)
+    return schema
+
+
+class ReferenceDataset:
+    """
+    Reference fundamentals stored as Parquet with a JSON schema sidecar.
+
+    The schema is read once and answers column questions without touching the data.
+    Data is read from a memory-mapped file, only the requested columns, and each
+    projection is kept for the life of the process; text columns are left out unless
+    asked for.
+
+    Parameters:
+        path (str): Parquet file; its schema sidecar sits next to it.
+    """
+
+    def __init__(self, path: str = REFERENCE_PATH):
+        self.path = path
+        self._schema = None
+        self._frames = {}  # tuple of columns -> frame
+        self._lock = threading.Lock()
+
+    @property
+    def schema(self) -> dict:
+        if self._schema is None:
+            with open(_schema_path(self.path)) as f:
+                self._schema = json.load(f)
+        return self._schema
+
+    def columns(self, text: bool = True) -> list:
+        """
+        Column names, without the index column and, unless text is True, the text columns.
+        """
+        skip = {self.schema["index"]} | (set() if text else set(self.schema["text_columns"]))
+        return [column for column in self.schema["columns"] if column not in skip]
+
+    def frame(self, columns: list = None, text: bool = False) -> pd.DataFrame:
+        """
+        Reference data indexed by symbol.
+
+        Parameters:
+            columns (list): Columns to read. None reads every column, text columns only
+                when text is True.
+            text (bool): Include text columns when columns is None.
+
+        Returns:
+            pd.DataFrame: Shared between callers; copy it before modifying it.
+        """
+        columns = tuple(self.columns(text) if columns is None else columns)
+        with self._lock:
+            if columns not in self._frames:
+                import pyarrow.parquet as pq
+
+                index = self.schema["index"]
+                table = pq.read_table(self.path, columns=[index, *columns], memory_map=True)
+                self._frames[columns] = table.to_pandas().set_index(index)
+            return self._frames[columns]
+
+
+_reference = None
+_reference_lock = threading.Lock()
+
+
+def get_reference() -> ReferenceDataset:
+    """
+    Reference dataset shared by every session of the process.
+    """
+    global _reference
+    with _reference_lock:
+        if _reference is None:
+            _reference = ReferenceDataset()
+        return _reference
+
+
+if __name__ == "__main__":
+    # python -m utils.reference rebuilds the dataset after sample.csv changes
+    schema = build_reference()
+    print(f"Wrote {REFERENCE_PATH}: {schema['rows']} rows, {len(schema['columns'])} columns, "
+          f"text columns {', '.join(schema['text_columns'])}")
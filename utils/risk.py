@@ -1,16 +1,31 @@
 from .portfolio_optimizer import PortfolioOptimizer
 import numpy as np
-from scipy.stats import norm
 import pandas as pd
 import plotly.express as px
 import streamlit as st
+from .value_at_risk import cornish_fisher, filtered_bootstrap, horizon_returns, monte_carlo, parametric_var, tail_risk
+from config import VAR_CHUNK_SIZE, VAR_SCENARIOS, VAR_SEED
+
+
+VAR_METHODS = {
+    "parametric": "Parametric (Normal)",
+    "historical": "Historical",
+    "cornish-fisher": "Cornish-Fisher",
+    "bootstrap": "Filtered Historical Bootstrap",
+    "monte-carlo": "Monte Carlo",
+}
 
 
 class RiskMetrics(PortfolioOptimizer):
-    def __init__(self, stocks, start, end, optimization_criterion, riskFreeRate=0.07024):
-        super().__init__(stocks, start, end, optimization_criterion, riskFreeRate)
+
+    confidenceLevels = [0.9, 0.95, 0.99]
+
+    def __init__(self, stocks, start, end, optimization_criterion, riskFreeRate=0.07024, context=None):
+        super().__init__(stocks, start, end, optimization_criterion, riskFreeRate, context)
         self.portfolioDaily = np.array(self.portfolioReturnsDaily())
         self.mu, self.sigma = self.muSigma()
+        # (method, horizon) -> VaR and CVaR per confidence level, shared through the context
+        self.varResults = self.context.var_results
 
     def muSigma(self):
         mu = self.portfolioDaily.mean()
@@ -18,46 +33,70 @@ class RiskMetrics(PortfolioOptimizer):
 
         return mu, sigma
 
-    def Rvar(self):
-        confidence_levels = [0.9, 0.95, 0.99]
-        var_values = []
-        for lvl in confidence_levels:
-            var = self.mu + self.sigma * norm.ppf(lvl)
-            var_values.append(var)
-
-        return var_values
-
-    def RCvar(self):
-        var_values = self.Rvar()
-        cvar_values = []
-        for var in var_values:
-            loss = self.portfolioDaily[self.portfolioDaily < -var]
-            cvar = np.mean(loss)
-            cvar_values.append(-cvar)
-
-        return cvar_values
-
-    def riskTable(self):
-        var_values = self.Rvar()
-        cvar_values = self.RCvar()
-
-        var_dict = {
-            "90%": [
-                "90%",
-                f"{round(var_values[0]*100, 2)}%",
-                f"{round(cvar_values[0]*100, 2)}%",
-            ],
-            "95%": [
-                "95%",
-                f"{round(var_values[1]*100, 2)}%",
-                f"{round(cvar_values[1]*100, 2)}%",
-            ],
-            "99%": [
-                "99%",
-                f"{round(var_values[2]*100, 2)}%",
-                f"{round(cvar_values[2]*100, 2)}%",
-            ],
-        }
+    def varCvar(self, method="parametric", horizon=1):
+        """
+        VaR and CVaR at every confidence level for one method.
+
+        Parameters:
+            method (str): One of VAR_METHODS. "parametric" is the normal VaR,
+                -(mu + sigma * z) at the 1 - c quantile, with the CVaR taken from the
+                observed returns.
+            horizon (int): Holding period in trading days.
+
+        Returns:
+            np.ndarray, np.ndarray: VaR and CVaR per confidence level, as positive losses
+            for every method.
+        """
+        key = (method, horizon)
+        if key in self.varResults:
+            return self.varResults[key]
+
+        levels = np.array(self.confidenceLevels)
+        portfolio = self.portfolioDaily.ravel()
+        if method == "parametric":
+            var = parametric_var(self.mu, self.sigma, levels, horizon)
+            # mean of the observed returns below -VaR, from one sort for all levels
+            observed = np.sort(horizon_returns(portfolio, horizon))
+            counts = np.searchsorted(observed, -var, side="left")
+            with np.errstate(divide="ignore", invalid="ignore"):
+                cvar = -np.concatenate([[0.0], np.cumsum(observed)])[counts] / counts
+            cvar[counts == 0] = np.nan
+        elif method == "historical":
+            var, cvar = tail_risk(horizon_returns(portfolio, horizon), levels)
+        elif method == "cornish-fisher":
+            var, cvar = cornish_fisher(portfolio, levels, horizon)
+        elif method == "bootstrap":
+            sample = filtered_bootstrap(portfolio, horizon, VAR_SCENARIOS, VAR_CHUNK_SIZE, seed=VAR_SEED)
+            var, cvar = tail_risk(sample, levels)
+        elif method == "monte-carlo":
+            sample = monte_carlo(
+                self.meanReturns, self.covMatrix, self.optimized_allocation,
+                horizon, VAR_SCENARIOS, VAR_CHUNK_SIZE, seed=VAR_SEED,
+            )
+            var, cvar = tail_risk(sample, levels)
+        else:
+            raise ValueError(f"Unknown VaR method: {method}")
+
+        self.context.add("var_results", key, (var, cvar))
+        return var, cvar
+
+    def Rvar(self, method="parametric", horizon=1):
+        return list(self.varCvar(method, horizon)[0])
+
+    def RCvar(self, method="parametric", horizon=1):
+        return list(self.varCvar(method, horizon)[1])
+
+    def riskTable(self, method="parametric", horizon=1):
+        var_values, cvar_values = self.varCvar(method, horizon)
+
+        var_dict = {}
+        for lvl, var, cvar in zip(self.confidenceLevels, var_values, cvar_values):
+            label = f"{round(lvl * 100)}%"
+            var_dict[label] = [
+                label,
+                f"{round(var*100, 2)}%",
+                f"{round(cvar*100, 2)}%",
+            ]
 
         var_df = pd.DataFrame(
             var_dict, index=["Confidence Level", "VaR(%)", "CVaR(%)"]
@@ -65,7 +104,7 @@ class RiskMetrics(PortfolioOptimizer):
 
         return var_df
 
-    def varXReturns(self):
+    def varXReturns(self, method="parametric"):
         portfolio = np.array(self.portfolioDaily).flatten()
         ret, std = self.basicMetrics()
         portfolio_dates = ret.index
@@ -89,8 +128,8 @@ class RiskMetrics(PortfolioOptimizer):
         ymin = np.min(portfolio_series.values * 100)
         ymax = np.max(portfolio_series.values * 100)
 
-        var_list = self.Rvar()
-        var_95 = var_list[1]
+        var_list = self.Rvar(method)
+        var_95 = var_list[self.confidenceLevels.index(0.95)]
 
         breach_points = daily_returns_df[
             daily_returns_df["Daily Return (%)"] < -var_95 * 100
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+
+ROLLING_METRICS = ["volatility", "sharpe", "sortino", "beta", "drawdown"]
+
+
+def _window_sums(prefix, window):
+    # sum over the trailing window ending at every row, NaN until the window is full
+    sums = np.full(len(prefix) - 1, np.nan)
+    sums[window - 1:] = prefix[window:] - prefix[:-window]
+    return sums
+
+
+def rolling_max(values, window):
+    """
+    Trailing maximum over a window in O(n) (van Herk / Gil-Werman).
+
+    The series is cut into blocks of the window length; the maximum of any window is the
+    larger of a suffix maximum of one block and a prefix maximum of the next, both of
+    which are a single accumulate over the blocks. The first window - 1 values use the
+    shorter history that is available.
+    """
+    values = np.asarray(values, dtype="float64")
+    n = len(values)
+    if n == 0:
+        raise ValueError("Cannot take a rolling maximum of an empty series!")
+    if window < 1:
+        raise ValueError(f"Rolling window must be at least 1, got {window}")
+    window = min(window, n)
+    blocks = -(-n // window)
+    padded = np.full(blocks * window, -np.inf)
+    padded[:n] = values
+    padded = padded.reshape(blocks, window)
+
+    prefix = np.maximum.accumulate(padded, axis=1).ravel()[:n]
+    suffix = np.maximum.accumulate(padded[:, ::-1], axis=1)[:, ::-1].ravel()[:n]
+
+    result = np.empty(n)
+    result[: window - 1] = prefix[: window - 1]
+    result[window - 1:] = np.maximum(suffix[: n - window + 1], prefix[window - 1:])
+    return result
+
+
+def rolling_metrics(portfolio, benchmark, windows, riskFreeRate=0.07024, index=None) -> pd.DataFrame:
+    """
+    Rolling volatility, Sharpe, Sortino, beta and drawdown for several windows at once.
+
+    Running sums of the returns, squares and cross products are built once; every window
+    then needs one difference per statistic, so the cost is O(n) per window whatever its
+    length. Returns (and the down days) are demeaned before the sums are taken to keep
+    the variance and covariance differences accurate over long histories.
+
+    Parameters:
+        portfolio (array-like): Daily portfolio returns.
+        benchmark (array-like): Daily benchmark returns on the same days.
+        windows (list): Window lengths in trading days.
+        riskFreeRate (float): Annual risk free rate.
+        index (pd.Index): Dates of the returns.
+
+    Returns:
+        pd.DataFrame: Columns (metric, window) for every metric in ROLLING_METRICS. Volatility
+        is annualised; drawdown is the fall of the portfolio value from its highest value
+        within the window. Windows longer than the history give all-NaN columns.
+    """
+    p = np.asarray(portfolio, dtype="float64").ravel()
+    b = np.asarray(benchmark, dtype="float64").ravel()
+    if len(b) != len(p):
+        raise ValueError("Portfolio and benchmark returns must cover the same days!")
+    if len(p) == 0:
+        raise ValueError("No returns to compute rolling metrics from!")
+    short = [window for window in windows if window < 2]
+    if short:
+        raise ValueError(f"Rolling windows must be at least 2 days, got {short}")
+
+    def prefix(values):
+        return np.concatenate([[0.0], np.cumsum(values)])
+
+    pMean, bMean = p.mean(), b.mean()
+    pCentered, bCentered = p - pMean, b - bMean
+    downside = p < 0
+    downCentered = np.where(downside, p - (p[downside].mean() if downside.any() else 0), 0)
+    sums = {
+        "p": prefix(pCentered),
+        "pp": prefix(pCentered**2),
+        "b": prefix(bCentered),
+        "bb": prefix(bCentered**2),
+        "pb": prefix(pCentered * bCentered),
+        "downCount": prefix(downside),
+        "down": prefix(downCentered),
+        "downSquared": prefix(downCentered**2),
+    }
+    wealth = np.cumprod(1 + p)
+
+    columns = {}
+    for window in windows:
+        s = {name: _window_sums(values, window) for name, values in sums.items()}
+        mean = s["p"] / window + pMean
+        variance = np.maximum((s["pp"] - s["p"] ** 2 / window) / (window - 1), 0)
+        benchmarkVariance = (s["bb"] - s["b"] ** 2 / window) / (window - 1)
+        covariance = (s["pb"] - s["p"] * s["b"] / window) / (window - 1)
+
+        downCount = s["downCount"]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            downsideVariance = (s["downSquared"] - s["down"] ** 2 / downCount) / (downCount - 1)
+            downsideDeviation = np.sqrt(np.maximum(downsideVariance, 0)) * np.sqrt(252)
+            volatility = np.sqrt(variance) * np.sqrt(252)
+            excessReturn = mean * 252 - riskFreeRate
+            columns[("volatility", window)] = volatility
+            columns[("sharpe", window)] = excessReturn / volatility
+            columns[("sortino", window)] = excessReturn / downsideDeviation
+            columns[("beta", window)] = covariance / benchmarkVariance
+
+        drawdown = wealth / rolling_max(wealth, window) - 1
+        drawdown[: window - 1] = np.nan
+        columns[("drawdown", window)] = drawdown
+
+    order = pd.MultiIndex.from_product([ROLLING_METRICS, list(windows)], names=["metric", "window"])
+    return pd.DataFrame({column: columns[column] for column in order}, index=index, columns=order)
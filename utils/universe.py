@@ -0,0 +1,190 @@
+# S&P 500 constituent list
+
+import datetime as dt
+import json
+import logging
+import os
+import threading
+import time
+import pandas as pd
+from config import UNIVERSE_SNAPSHOT, UNIVERSE_CACHE_PATH, UNIVERSE_URL, UNIVERSE_MAX_AGE, UNIVERSE_REFRESH
+
+COLUMNS = ["symbol", "name", "sector"]
+
+logger = logging.getLogger(__name__)
+
+
+def _metadata_path(path: str) -> str:
+    return os.path.splitext(path)[0] + ".json"
+
+
+def read_snapshot(path: str):
+    """
+    Constituent snapshot and its metadata sidecar (<name>.json next to the CSV).
+
+    Returns:
+        pd.DataFrame, dict: Constituents with COLUMNS, and metadata with at least "version".
+    """
+    frame = pd.read_csv(path, dtype=str, keep_default_na=False)
+    with open(_metadata_path(path)) as f:
+        metadata = json.load(f)
+    missing = set(COLUMNS) - set(frame.columns)
+    if missing or frame.empty:
+        raise ValueError(f"Invalid constituent snapshot {path}: missing {sorted(missing)} or empty")
+    return frame[COLUMNS], metadata
+
+
+def write_snapshot(frame: pd.DataFrame, metadata: dict, path: str):
+    """
+    Save a snapshot and its sidecar, each replaced atomically.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    for target, write in (
+        (path, lambda f: frame[COLUMNS].to_csv(f, index=False)),
+        (_metadata_path(path), lambda f: json.dump(metadata, f, indent=2)),
+    ):
+        temporary = f"{target}.{os.getpid()}.tmp"
+        with open(temporary, "w", newline="") as f:
+            write(f)
+        os.replace(temporary, target)
+
+
+def fetch_wikipedia_constituents(url: str = UNIVERSE_URL) -> pd.DataFrame:
+    """
+    Current constituents from the Wikipedia list of S&P 500 companies.
+    """
+    table = pd.read_html(url)[0]
+    frame = table.rename(columns={"Symbol": "symbol", "Security": "name", "GICS Sector": "sector"})
+    return frame[COLUMNS].astype(str).sort_values("symbol").reset_index(drop=True)
+
+
+class UniverseService:
+    """
+    S&P 500 constituents with their GICS sector, loaded once per process.
+
+    The newest of the snapshot shipped with the repo and the last refreshed copy is
+    served. When it is older than max_age a refresh is started on a background thread,
+    so a page render never waits for the network; the refreshed list is saved next to
+    the price store and served from then on. A failed refresh keeps the current list,
+    is logged and kept in last_error, and is retried after retry_after seconds.
+
+    Parameters:
+        snapshot_path (str): Snapshot shipped with the repo, the offline fallback.
+        cache_path (str): Where refreshed snapshots are saved.
+        max_age (float): Seconds after the snapshot's version date that trigger a refresh.
+        refresh (bool): Allow background refreshes.
+        fetcher (callable): Returns the current constituents as a DataFrame with COLUMNS.
+        retry_after (float): Seconds between refresh attempts after a failure.
+    """
+
+    def __init__(self, snapshot_path: str = UNIVERSE_SNAPSHOT, cache_path: str = UNIVERSE_CACHE_PATH,
+                 max_age: float = UNIVERSE_MAX_AGE, refresh: bool = UNIVERSE_REFRESH,
+                 fetcher=fetch_wikipedia_constituents, retry_after: float = 60 * 60):
+        self.snapshot_path = snapshot_path
+        self.cache_path = cache_path
+        self.max_age = max_age
+        self.refresh_enabled = refresh
+        self.fetcher = fetcher
+        self.retry_after = retry_after
+        self.metadata = None
+        self.last_error = None
+        self._frame = None
+        self._last_attempt = None
+        self._refresh_thread = None
+        self._lock = threading.Lock()
+
+    def constituents(self) -> pd.DataFrame:
+        """
+        Constituents with COLUMNS, sorted by symbol. Starts a background refresh when stale.
+        """
+        with self._lock:
+            if self._frame is None:
+                self._frame, self.metadata = self._load()
+            frame = self._frame
+        if self.refresh_enabled and self.age() > self.max_age:
+            self.refresh_in_background()
+        return frame
+
+    def symbols(self) -> list:
+        return self.constituents()["symbol"].tolist()
+
+    @property
+    def version(self) -> str:
+        self.constituents()
+        return self.metadata["version"]
+
+    def age(self) -> float:
+        """
+        Seconds since the served snapshot's version date.
+        """
+        version = dt.datetime.fromisoformat(self.metadata["version"])
+        return (dt.datetime.now() - version).total_seconds()
+
+    def refresh(self) -> bool:
+        """
+        Fetch the current constituents, save them and serve them. Blocks; returns success.
+        """
+        with self._lock:
+            self._last_attempt = time.monotonic()
+        try:
+            frame = self.fetcher()
+            missing = set(COLUMNS) - set(frame.columns)
+            if missing or frame.empty:
+                raise ValueError(f"Fetched constituents are missing {sorted(missing)} or empty")
+            metadata = {
+                "version": dt.date.today().isoformat(),
+                "source": getattr(self.fetcher, "__name__", "fetcher"),
+                "columns": COLUMNS,
+                "rows": len(frame),
+            }
+            write_snapshot(frame, metadata, self.cache_path)
+        except Exception as e:
+            self.last_error = e
+            logger.warning("Constituent refresh failed: %s", e)
+            return False
+        with self._lock:
+            self._frame, self.metadata = frame[COLUMNS].reset_index(drop=True), metadata
+            self.last_error = None
+        return True
+
+    def refresh_in_background(self):
+        """
+        Start refresh() on a daemon thread unless one is running or the last failed recently.
+        """
+        with self._lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return
+            if self._last_attempt is not None and time.monotonic() - self._last_attempt < self.retry_after:
+                return
+            self._last_attempt = time.monotonic()
+            self._refresh_thread = threading.Thread(target=self.refresh, name="universe-refresh", daemon=True)
+            self._refresh_thread.start()
+
+    def _load(self):
+        # the newer of the refreshed copy and the shipped snapshot
+        candidates = []
+        for path in (self.cache_path, self.snapshot_path):
+            if not os.path.exists(path):
+                continue
+            try:
+                candidates.append(read_snapshot(path))
+            except Exception as e:
+                logger.warning("Ignoring constituent snapshot %s: %s", path, e)
+        if not candidates:
+            raise FileNotFoundError(f"No constituent snapshot found at {self.snapshot_path}")
+        return max(candidates, key=lambda candidate: candidate[1]["version"])
+
+
+_universe = None
+_universe_lock = threading.Lock()
+
+
+def get_universe() -> UniverseService:
+    """
+    Universe service shared by every session of the process.
+    """
+    global _universe
+    with _universe_lock:
+        if _universe is None:
+            _universe = UniverseService()
+        return _universe
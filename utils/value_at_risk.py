@@ -0,0 +1,127 @@
+import numpy as np
+from scipy.stats import norm
+
+
+def horizon_returns(returns, horizon=1):
+    """
+    Overlapping compounded returns over a number of trading days.
+    """
+    returns = np.asarray(returns, dtype="float64").ravel()
+    if horizon == 1:
+        return returns
+    wealth = np.concatenate([[1.0], np.cumprod(1 + returns)])
+    return wealth[horizon:] / wealth[:-horizon] - 1
+
+
+def parametric_var(mu, sigma, confidence_levels, horizon=1):
+    """
+    Normal VaR as a positive loss, -(mu + sigma * z) at the 1 - c quantile, with the
+    daily mean and volatility scaled to the horizon as for independent days.
+
+    mu and sigma may be arrays (one value per portfolio), as may the confidence levels.
+    """
+    z = norm.ppf(1 - np.asarray(confidence_levels, dtype="float64"))
+    return -(mu * horizon + sigma * np.sqrt(horizon) * z)
+
+
+def tail_risk(sample, confidence_levels):
+    """
+    VaR and CVaR of a return sample for several confidence levels from one partition.
+
+    The sample is partitioned once around the largest tail needed and only that tail is
+    sorted; the VaR at level c is the loss at the ceil((1 - c) * n)-th worst outcome and
+    the CVaR the mean loss over those outcomes, read off one cumulative sum.
+
+    Returns:
+        np.ndarray, np.ndarray: VaR and CVaR per confidence level, as positive losses.
+    """
+    sample = np.asarray(sample, dtype="float64").ravel()
+    levels = np.asarray(confidence_levels, dtype="float64")
+    counts = np.maximum(np.ceil((1 - levels) * len(sample)).astype(int), 1)
+    largest = counts.max()
+    tail = np.partition(sample, largest - 1)[:largest] if largest < len(sample) else sample.copy()
+    tail.sort()
+    tailSums = np.cumsum(tail)
+    return -tail[counts - 1], -tailSums[counts - 1] / counts
+
+
+def cornish_fisher(returns, confidence_levels, horizon=1, grid=2000):
+    """
+    VaR and CVaR from the Cornish-Fisher expansion of the return distribution.
+
+    Daily mean, volatility, skewness and excess kurtosis are scaled to the horizon as for
+    independent days; the CVaR averages the expanded quantile over the tail.
+    """
+    returns = np.asarray(returns, dtype="float64").ravel()
+    mu, sigma = returns.mean() * horizon, returns.std(ddof=1) * np.sqrt(horizon)
+    deviations = returns - returns.mean()
+    m2 = np.mean(deviations**2)
+    skewness = np.mean(deviations**3) / m2**1.5 / np.sqrt(horizon)
+    excessKurtosis = (np.mean(deviations**4) / m2**2 - 3) / horizon
+
+    def quantile(z):
+        return (
+            z
+            + (z**2 - 1) * skewness / 6
+            + (z**3 - 3 * z) * excessKurtosis / 24
+            - (2 * z**3 - 5 * z) * skewness**2 / 36
+        )
+
+    levels = np.asarray(confidence_levels, dtype="float64")
+    var = -(mu + sigma * quantile(norm.ppf(1 - levels)))
+    # midpoints of an even grid over each tail probability (0, 1 - c)
+    probabilities = (1 - levels)[:, None] * (np.arange(grid) + 0.5)[None, :] / grid
+    cvar = -(mu + sigma * quantile(norm.ppf(probabilities)).mean(axis=1))
+    return var, cvar
+
+
+def filtered_bootstrap(returns, horizon=1, scenarios=1_000_000, chunkSize=250_000, decay=0.94, seed=0):
+    """
+    Filtered historical simulation of horizon returns.
+
+    Returns are standardised by an EWMA volatility (RiskMetrics decay); scenarios resample
+    the standardised residuals and rescale them with the volatility forecast, which is
+    updated along every simulated path.
+    """
+    returns = np.asarray(returns, dtype="float64").ravel()
+    variance = np.empty(len(returns) + 1)
+    variance[0] = returns.var()
+    for t, r in enumerate(returns):
+        variance[t + 1] = decay * variance[t] + (1 - decay) * r**2
+    residuals = returns / np.sqrt(variance[:-1])
+    forecast = variance[-1]
+
+    rng = np.random.default_rng(seed)
+    sample = np.empty(scenarios)
+    for first in range(0, scenarios, chunkSize):
+        size = min(chunkSize, scenarios - first)
+        pathVariance = np.full(size, forecast)
+        wealth = np.ones(size)
+        for day in range(horizon):
+            dailyReturn = residuals[rng.integers(0, len(residuals), size)] * np.sqrt(pathVariance)
+            wealth *= 1 + dailyReturn
+            pathVariance = decay * pathVariance + (1 - decay) * dailyReturn**2
+        sample[first:first + size] = wealth - 1
+    return sample
+
+
+def monte_carlo(meanReturns, covMatrix, weights, horizon=1, scenarios=1_000_000, chunkSize=250_000, seed=0):
+    """
+    Monte Carlo horizon returns from the fitted multivariate normal of the asset returns.
+
+    The portfolio is rebalanced to its weights daily, so each simulated day's portfolio
+    return is w'r with r ~ N(mu, Sigma): one normal draw scaled by sqrt(w' Sigma w) has
+    that exact distribution and spares drawing every asset. Days are compounded over
+    the horizon.
+    """
+    weights = np.asarray(weights, dtype="float64").ravel()
+    mu = float(np.asarray(meanReturns, dtype="float64") @ weights)
+    sigma = float(np.sqrt(weights @ np.asarray(covMatrix, dtype="float64") @ weights))
+
+    rng = np.random.default_rng(seed)
+    sample = np.empty(scenarios)
+    for first in range(0, scenarios, chunkSize):
+        size = min(chunkSize, scenarios - first)
+        daily = mu + sigma * rng.standard_normal((size, horizon))
+        sample[first:first + size] = np.prod(1 + daily, axis=1) - 1 if horizon > 1 else daily[:, 0]
+    return sample